@@ -3,13 +3,28 @@
 import json
 from pathlib import Path
 import boto3
+from botocore.config import Config
+import botocore.exceptions
 import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from dotenv import load_dotenv
 from app.usage_tracker import check_and_log_polly
+from app.log import get_logger
+from app.metrics import POLLY_CHARS_PER_SEC
+from app.resilience import get_upstream, is_transient
+from app.mp3_utils import build_id3v2_header, concat_mp3_files, copy_file_span, scan_mp3
+from urllib.parse import urlparse
 from contextlib import closing
 import html
 from datetime import datetime
 
+logger = get_logger("polly")
+
 # Sanitize text for SSML
 def sanitize_for_ssml(text: str) -> str:
     return html.escape(text, quote=True).replace("\n", " ")
@@ -17,6 +32,252 @@ def sanitize_for_ssml(text: str) -> str:
 # Max Polly Characters Length (UTF8)
 MAX_POLLY_CHAR_LENGTH = 3000
 
+# start_speech_synthesis_task accepts up to 100,000 billed characters per task
+MAX_POLLY_TASK_CHAR_LENGTH = 100000
+
+# Long-text handling in summaries_to_mp3:
+#   "chunk" – split into <= MAX_POLLY_CHAR_LENGTH pieces, synthesize concurrently, stitch
+#   "task"  – use Polly's asynchronous synthesis task (output goes through S3)
+#   "skip"  – previous behaviour: drop the article
+POLLY_LONG_TEXT_MODE = os.getenv("POLLY_LONG_TEXT_MODE", "chunk")
+POLLY_OUTPUT_S3_BUCKET = os.getenv("POLLY_OUTPUT_S3_BUCKET", "")
+POLLY_TASK_POLL_SEC = float(os.getenv("POLLY_TASK_POLL_SEC", "2"))
+# Give up on a synthesis task still scheduled / in progress after this long
+POLLY_TASK_TIMEOUT_SEC = float(os.getenv("POLLY_TASK_TIMEOUT_SEC", "900"))
+
+# Parallel synthesis settings
+POLLY_MAX_CONCURRENCY = int(os.getenv("POLLY_MAX_CONCURRENCY", "4"))
+
+# Audio streams are copied to disk in fixed-size chunks
+AUDIO_CHUNK_SIZE = 64 * 1024
+
+# Shared "polly" upstream policy (app/resilience.py): token-bucket rate limit
+# (POLLY_MAX_TPS / POLLY_RATE_PER_SEC, default 8 = Polly's default SynthesizeSpeech
+# quota), AIMD concurrency, circuit breaker and budgeted retries.
+polly_upstream = get_upstream("polly")
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (botocore.exceptions.ConnectionError, botocore.exceptions.HTTPClientError)):
+        return True
+    return is_transient(error)
+
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n|\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_oversized(unit: str, limit: int) -> list:
+    """Split a single sentence that exceeds `limit` on word boundaries (hard cut as a last resort)."""
+    pieces, current, current_len = [], [], 0  # type: ignore
+    for word in unit.split():
+        word_len = len(sanitize_for_ssml(word))
+        if word_len > limit and current:
+            # Flush the buffered words first so the narration keeps its order
+            pieces.append(" ".join(current))
+            current, current_len = [], 0
+        while word_len > limit:
+            # A single "word" longer than the limit (e.g. a URL blob): cut it
+            cut = word[:limit // 6]  # worst-case escape expansion is 6x ("&quot;")
+            pieces.append(cut)
+            word = word[len(cut):]
+            word_len = len(sanitize_for_ssml(word))
+        extra = word_len + (1 if current else 0)
+        if current and current_len + extra > limit:
+            pieces.append(" ".join(current))
+            current, current_len = [], 0
+            extra = word_len
+        current.append(word)
+        current_len += extra
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def split_text_for_polly(text: str, limit: int = MAX_POLLY_CHAR_LENGTH) -> list:
+    """
+    Split `text` into chunks whose SSML-escaped length stays within `limit`.
+
+    Chunks break on paragraph and sentence boundaries; only a sentence that is
+    longer than `limit` on its own is split between words.
+
+    Args:
+        text (str): Plain text to narrate.
+        limit (int): Maximum escaped characters per chunk.
+
+    Returns:
+        list[str]: Plain-text chunks in reading order.
+    """
+    units = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        for sentence in _SENTENCE_RE.split(paragraph.strip()):
+            if not sentence:
+                continue
+            if len(sanitize_for_ssml(sentence)) > limit:
+                units.extend(_split_oversized(sentence, limit))
+            else:
+                units.append(sentence)
+
+    # Greedily pack units; escaping is per character so lengths add up
+    chunks, current, current_len = [], [], 0  # type: ignore
+    for unit in units:
+        unit_len = len(sanitize_for_ssml(unit))
+        extra = unit_len + (1 if current else 0)
+        if current and current_len + extra > limit:
+            chunks.append(" ".join(current))
+            current, current_len = [], 0
+            extra = unit_len
+        current.append(unit)
+        current_len += extra
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def wrap_ssml(safe_text: str, rate: str) -> str:
+    # Wrap with <speak> and <prosody>
+    return f"<speak><prosody rate='{rate}'>{safe_text}</prosody></speak>"
+
+
+def _get_text(article: dict, text_key: str) -> str:
+    """Read a (possibly dotted) key such as "summary" or "fields.bodyText"."""
+    value = article
+    for part in text_key.split("."):
+        if not isinstance(value, dict):
+            return ""
+        value = value.get(part, "")
+    return value if isinstance(value, str) else ""
+
+
+def create_polly_client(max_pool_connections: int = POLLY_MAX_CONCURRENCY):
+    """
+    Create one boto3 Polly client whose connection pool fits `max_pool_connections`
+    worker threads (boto3 clients are thread-safe and meant to be shared).
+    """
+    load_dotenv()
+    return boto3.client(
+        "polly",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_DEFAULT_REGION"),
+        config=Config(
+            max_pool_connections=max(10, max_pool_connections),
+            # Retries are budgeted by polly_upstream instead of botocore
+            retries={"total_max_attempts": 1, "mode": "standard"},
+        ),
+    )
+
+
+def write_audio_stream(stream, output_path: Path, chunk_size: int = AUDIO_CHUNK_SIZE) -> None:
+    """
+    Copy a Polly AudioStream to `output_path` in `chunk_size` pieces.
+
+    The data goes to a temporary file in the same directory which is then renamed
+    over `output_path`, so readers never observe a half-written MP3.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            shutil.copyfileobj(stream, f, chunk_size)
+        os.replace(tmp_name, output_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def synthesize_ssml_to_file(
+    polly,
+    ssml: str,
+    output_path: Path,
+    voice_id: str,
+    engine: str,
+) -> None:
+    """Synthesize one SSML document and stream the MP3 to `output_path`."""
+
+    def request() -> None:
+        started = time.perf_counter()
+        response = polly.synthesize_speech(
+            Text=ssml,
+            TextType="ssml",
+            OutputFormat="mp3",
+            VoiceId=voice_id,
+            Engine=engine
+        )
+
+        # Streaming is part of the attempt: a dropped stream is retried as a whole
+        with closing(response["AudioStream"]) as stream:
+            write_audio_stream(stream, output_path)
+        POLLY_CHARS_PER_SEC.observe(len(ssml) / max(time.perf_counter() - started, 1e-6))
+
+    polly_upstream.call(request, retryable=_is_retryable)
+
+
+def synthesize_ssml_via_task(
+    polly,
+    s3,
+    ssml: str,
+    output_path: Path,
+    voice_id: str,
+    engine: str,
+    bucket: str = POLLY_OUTPUT_S3_BUCKET,
+    poll_interval: float = POLLY_TASK_POLL_SEC,
+    timeout: float = POLLY_TASK_TIMEOUT_SEC,
+) -> None:
+    """
+    Synthesize long SSML with Polly's asynchronous `start_speech_synthesis_task`.
+
+    Polly writes the MP3 to `bucket`; this polls the task (through the "polly"
+    upstream policy) until it completes and then streams the S3 object to
+    `output_path`. Raises TimeoutError if the task is not done within `timeout` seconds.
+    """
+    if not bucket:
+        raise RuntimeError("POLLY_OUTPUT_S3_BUCKET is not set (required for long_text_mode='task')")
+
+    task = polly_upstream.call(
+        lambda: polly.start_speech_synthesis_task(
+            Text=ssml,
+            TextType="ssml",
+            OutputFormat="mp3",
+            VoiceId=voice_id,
+            Engine=engine,
+            OutputS3BucketName=bucket,
+            OutputS3KeyPrefix="newslite/",
+        ),
+        retryable=_is_retryable,
+    )["SynthesisTask"]
+
+    task_id = task["TaskId"]
+    deadline = time.monotonic() + timeout
+    while task["TaskStatus"] not in ("completed", "failed"):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Polly task {task_id} still {task['TaskStatus']} after {timeout:.0f}s")
+        time.sleep(poll_interval)
+        task = polly_upstream.call(
+            lambda: polly.get_speech_synthesis_task(TaskId=task_id),
+            retryable=_is_retryable,
+        )["SynthesisTask"]
+
+    if task["TaskStatus"] == "failed":
+        raise RuntimeError(f"Polly task {task['TaskId']} failed: {task.get('TaskStatusReason', '')}")
+
+    # OutputUri looks like https://s3.<region>.amazonaws.com/<bucket>/<key>
+    path = urlparse(task["OutputUri"]).path.lstrip("/")
+    key = path[len(bucket) + 1:] if path.startswith(bucket + "/") else path
+
+    obj = s3.get_object(Bucket=bucket, Key=key)
+    with closing(obj["Body"]) as stream:
+        write_audio_stream(stream, output_path)
+
+
+def create_s3_client():
+    load_dotenv()
+    return boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_DEFAULT_REGION"),
+    )
+
 def save_polly_settings(folder: Path, rate: str, engine: str, voice_id: str):
     """
     Save Polly synthesis settings into a JSON file (settings.json)
@@ -38,136 +299,289 @@ def save_polly_settings(folder: Path, rate: str, engine: str, voice_id: str):
     with open(settings_path, "w", encoding="utf-8") as f:
         json.dump(settings, f, indent=2, ensure_ascii=False)
 
-    print(f"[INFO] Polly settings saved -> {settings_path}")
+    logger.info("Polly settings saved -> %s", settings_path)
 
-def summaries_to_mp3(
-    json_path: Path,
+def synthesize_articles(
+    items: list,
     output_dir: Path,
     voice_id: str = "Ruth",
-    engine: str = "neural"
-) -> None:
+    engine: str = "neural",
+    concurrency: int = POLLY_MAX_CONCURRENCY,
+    long_text_mode: str = POLLY_LONG_TEXT_MODE,
+    polly=None,
+    s3=None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> dict:
     """
-    Convert summaries from a JSON file to MP3 using Amazon Polly.
+    Synthesize `(index, text)` items into output_dir/article_<index>.mp3 in parallel.
+
+    Articles are synthesized by up to `concurrency` worker threads sharing one
+    Polly client; requests go through the shared `polly_upstream` policy, so
+    every caller in the process shares one rate limit and retry budget.
+
+    Texts longer than MAX_POLLY_CHAR_LENGTH are handled per `long_text_mode`:
+    "chunk" splits them on sentence/paragraph boundaries, synthesizes the chunks
+    concurrently and stitches the MP3 frames in order into one file; "task" uses
+    Polly's asynchronous synthesis task via S3; "skip" drops the article.
 
     Args:
-        json_path (Path): Path to the JSON file containing summaries.
+        items (list[tuple[int, str]]): 1-based article index and plain text.
         output_dir (Path): Directory to save MP3 files.
         voice_id (str): Amazon Polly VoiceId (default: "Ruth").
         engine (str): Polly engine ("neural" or "standard", default: "neural").
+        concurrency (int): Maximum number of parallel Polly requests.
+        long_text_mode (str): "chunk", "task" or "skip".
+        polly: Optional shared Polly client (created when omitted).
+        s3: Optional shared S3 client for "task" mode (created when omitted).
+        executor (ThreadPoolExecutor | None): Optional shared pool for the Polly
+            requests (left running); a pool of `concurrency` threads is created
+            and shut down per call when omitted. Callers that synthesize one
+            article at a time (the streaming daily job) pass all three.
+
+    Returns:
+        dict[int, bool]: Whether each non-empty article's MP3 was written.
     """
-    # Load environment variables
-    load_dotenv()
-
-    # Create Polly client
-    polly = boto3.client(
-        "polly",
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        region_name=os.getenv("AWS_DEFAULT_REGION")
-    )
-
-    # Load JSON data
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Create Polly client (shared by all worker threads)
+    polly = polly or create_polly_client(concurrency)
+    if long_text_mode == "task" and s3 is None:
+        s3 = create_s3_client()
 
     # Ensure output directory exists
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Process each article
-    for i, article in enumerate(data, 1):
-        summary = article.get("summary", "").strip()
-        safe_text = sanitize_for_ssml(summary)
+    rate = os.getenv("AWS_POLLY_RATE", "100%")
+
+    # One job per Polly request: (article index, chunk index, ssml, output path, use task API)
+    jobs = []
+    parts_by_article = {}
+    chunk_dir = None
+    results = {}
+
+    for i, text in items:
+        text = text.strip()
+        safe_text = sanitize_for_ssml(text)
 
         if not safe_text:
             continue
 
-        if len(safe_text) > MAX_POLLY_CHAR_LENGTH:
-            print(f"⚠️ Skipping article {i} – text too long ({len(safe_text)} characters)")
+        output_path = output_dir / f"article_{i:02}.mp3"
+
+        if len(safe_text) <= MAX_POLLY_CHAR_LENGTH:
+            jobs.append((i, 0, wrap_ssml(safe_text, rate), output_path, False))
+            continue
+
+        if long_text_mode == "skip":
+            logger.warning("⚠️ Skipping article %s – text too long (%d characters)", i, len(safe_text))
+            results[i] = False
             continue
 
-        rate = os.getenv("AWS_POLLY_RATE", "100%")
+        use_task = long_text_mode == "task"
+        limit = MAX_POLLY_TASK_CHAR_LENGTH if use_task else MAX_POLLY_CHAR_LENGTH
+        chunks = split_text_for_polly(text, limit)
 
-        # Wrap with <speak> and <prosody>
-        summary_ssml = f"<speak><prosody rate='{rate}'>{safe_text}</prosody></speak>"
+        if len(chunks) == 1:
+            jobs.append((i, 0, wrap_ssml(safe_text, rate), output_path, use_task))
+            continue
 
-        output_path = output_dir / f"article_{i:02}.mp3"
-        print(f"Generating audio for article {i}...")
+        if chunk_dir is None:
+            chunk_dir = Path(tempfile.mkdtemp(dir=output_dir, prefix=".chunks-"))
+        logger.info("✂️ Article %s: %d characters split into %d chunks", i, len(safe_text), len(chunks))
 
-        try:
-            # Synthesize speech
-            response = polly.synthesize_speech(
-                # Text=summary,
-                # SSML test with rate setting
-                Text=summary_ssml,
-                TextType="ssml",
-                OutputFormat="mp3",
-                VoiceId=voice_id,
-                Engine=engine
-            )
-
-            # Save the audio stream to a file
-            with closing(response["AudioStream"]) as stream:
-                with open(output_path, "wb") as f:
-                    f.write(stream.read())
+        parts = []
+        for k, chunk in enumerate(chunks):
+            part_path = chunk_dir / f"article_{i:02}_{k:03}.part"
+            parts.append(part_path)
+            jobs.append((i, k, wrap_ssml(sanitize_for_ssml(chunk), rate), part_path, use_task))
+        parts_by_article[i] = parts
+
+    def synthesize(job) -> bool:
+        i, k, ssml, path, use_task = job
+        if k == 0:
+            logger.debug("Generating audio for article %s...", i)
 
+        try:
+            if use_task:
+                synthesize_ssml_via_task(polly, s3, ssml, path, voice_id, engine)
+            else:
+                synthesize_ssml_to_file(polly, ssml, path, voice_id, engine)
 
             # check and log amazan polly usage
-            text_len = len(summary_ssml) # Initial sample data 500: 100 words x 5 chars on average
+            text_len = len(ssml) # Initial sample data 500: 100 words x 5 chars on average
             check_and_log_polly(text_len)
+            return True
 
         except Exception as e:
-            print(f"⚠️ Failed to generate audio for article {i}: {e}")
+            logger.warning("⚠️ Failed to generate audio for article %s (chunk %s): %s", i, k, e)
+            return False
 
-    print("✅ All summaries converted to audio.")
+    try:
+        if executor is not None:
+            job_results = list(executor.map(synthesize, jobs))
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                job_results = list(pool.map(synthesize, jobs))
 
-    # Add setting file in the daily directory
-    save_polly_settings(output_dir, rate="90%", engine=engine, voice_id=voice_id)
+        for job, ok in zip(jobs, job_results):
+            results[job[0]] = results.get(job[0], True) and ok
 
+        # Stitch chunked articles in order into a single MP3 each
+        for i, parts in parts_by_article.items():
+            if not results[i]:
+                logger.warning("⚠️ Article %s: not stitched because a chunk failed", i)
+                continue
+            concat_mp3_files(parts, output_dir / f"article_{i:02}.mp3")
+    finally:
+        if chunk_dir is not None:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
 
-if __name__ == "__main__":
-    # Example: Run standalone
-    example_json = Path("data/daily_summary_2025-09-14.json")
-    example_output_dir = Path("output/audio/work/2025-09-14")
+    return results
 
-    # Ensure output directory exists
-    example_output_dir.mkdir(parents=True, exist_ok=True)
 
-    summaries_to_mp3(
-        json_path=example_json,
-        output_dir=example_output_dir,
-        voice_id="Ruth",
-        engine="neural"
+def summaries_to_mp3(
+    json_path: Path,
+    output_dir: Path,
+    voice_id: str = "Ruth",
+    engine: str = "neural",
+    concurrency: int = POLLY_MAX_CONCURRENCY,
+    text_key: str = "summary",
+    long_text_mode: str = POLLY_LONG_TEXT_MODE,
+) -> None:
+    """
+    Convert summaries from a JSON file to MP3 using Amazon Polly.
+
+    See `synthesize_articles` for parallelism and long-text handling.
+
+    Args:
+        json_path (Path): Path to the JSON file containing summaries.
+        output_dir (Path): Directory to save MP3 files.
+        voice_id (str): Amazon Polly VoiceId (default: "Ruth").
+        engine (str): Polly engine ("neural" or "standard", default: "neural").
+        concurrency (int): Maximum number of parallel Polly requests.
+        text_key (str): Article key to narrate, dotted for nested fields
+            (e.g. "fields.bodyText" for full-article narration).
+        long_text_mode (str): "chunk", "task" or "skip".
+    """
+    # Load environment variables
+    load_dotenv()
+
+    # Load JSON data
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    items = [(i, _get_text(article, text_key)) for i, article in enumerate(data, 1)]
+    synthesize_articles(
+        items,
+        output_dir,
+        voice_id=voice_id,
+        engine=engine,
+        concurrency=concurrency,
+        long_text_mode=long_text_mode,
     )
 
-def merge_daily_audio_files(base_dir: Path = Path("output/audio")) -> None:
+    logger.info("✅ All summaries converted to audio.")
+
+    # Add setting file in the daily directory
+    save_polly_settings(output_dir, rate="90%", engine=engine, voice_id=voice_id)
+
+
+def merge_daily_audio_files(
+    base_dir: Path = Path("output/audio"),
+    day=None,
+    summary_json: Path = None,  # type: ignore
+) -> None:
     """
-    Merge all MP3 files for today's date into one full_day.mp3 file.
+    Merge all MP3 files of one day into full_day.mp3 plus a chapter index.
 
-    Equivalent to:
-        cat output/audio/$(date +%F)/*.mp3 > output/audio/$(date +%F)/full_day.mp3
+    Replaces a plain `cat *.mp3 > full_day.mp3`:
+    - each file's ID3 tags and Xing/Info header frame are stripped, and one
+      ID3v2 title header is written at the start of the merged file;
+    - audio frames are copied with copy_file_range/sendfile where available,
+      so the files are never loaded into memory;
+    - full_day.json records byte offset, length, start time and duration of
+      every article so players can seek straight to article N.
 
     Args:
         base_dir (Path): Base directory where dated subfolders exist.
+        day (date | str | None): Day to merge (default: today).
+        summary_json (Path | None): Daily summary JSON used for chapter titles
+            (default: data/daily_summary_<day>.json when it exists).
     """
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    daily_dir = base_dir / today_str
+    day_str = day.isoformat() if hasattr(day, "isoformat") else (day or datetime.now().strftime("%Y-%m-%d"))
+    daily_dir = base_dir / day_str
     merged_path = daily_dir / "full_day.mp3"
+    index_path = daily_dir / "full_day.json"
 
     if not daily_dir.exists():
-        print(f"⚠️ Directory not found: {daily_dir}")
+        logger.warning("⚠️ Directory not found: %s", daily_dir)
         return
 
     # Collect all .mp3 files except 'full_day.mp3'
     mp3_files = sorted(p for p in daily_dir.glob("*.mp3") if p.name != "full_day.mp3")
 
     if not mp3_files:
-        print(f"⚠️ No MP3 files found in {daily_dir}")
+        logger.warning("⚠️ No MP3 files found in %s", daily_dir)
         return
 
-    # Merge all MP3 files into one
-    with open(merged_path, "wb") as outfile:
-        for mp3_file in mp3_files:
-            with open(mp3_file, "rb") as infile:
-                outfile.write(infile.read())
+    titles = {}
+    summary_json = summary_json or Path(f"data/daily_summary_{day_str}.json")
+    if summary_json.exists():
+        with open(summary_json, "r", encoding="utf-8") as f:
+            titles = {f"article_{i:02}.mp3": a.get("title", "") for i, a in enumerate(json.load(f), 1)}
+
+    header = build_id3v2_header(f"NewsLite {day_str}")
+    chapters = []
+    offset = len(header)
+    elapsed = 0.0
+
+    fd, tmp_name = tempfile.mkstemp(dir=daily_dir, prefix=".full_day.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb", buffering=0) as outfile:
+            outfile.write(header)
+            for number, mp3_file in enumerate(mp3_files, 1):
+                span = scan_mp3(mp3_file)
+                with open(mp3_file, "rb") as infile:
+                    copy_file_span(infile.fileno(), outfile.fileno(), span["start"], span["length"])
+
+                chapters.append({
+                    "index": number,
+                    "file": mp3_file.name,
+                    "title": titles.get(mp3_file.name, ""),
+                    "byte_offset": offset,
+                    "byte_length": span["length"],
+                    "start_sec": round(elapsed, 3),
+                    "duration_sec": span["duration_sec"],
+                })
+                offset += span["length"]
+                elapsed += span["duration_sec"]
+        os.replace(tmp_name, merged_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    index = {
+        "date": day_str,
+        "file": merged_path.name,
+        "byte_length": offset,
+        "duration_sec": round(elapsed, 3),
+        "chapters": chapters,
+    }
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+
+    logger.info("✅ Merged %d MP3 files → %s (index: %s)", len(mp3_files), merged_path, index_path)
+
 
-    print(f"✅ Merged {len(mp3_files)} MP3 files → {merged_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    # Example: Run standalone
+    example_json = Path("data/daily_summary_2025-09-14.json")
+    example_output_dir = Path("output/audio/work/2025-09-14")
+
+    # Ensure output directory exists
+    example_output_dir.mkdir(parents=True, exist_ok=True)
+
+    summaries_to_mp3(
+        json_path=example_json,
+        output_dir=example_output_dir,
+        voice_id="Ruth",
+        engine="neural"
+    )
@@ -0,0 +1,248 @@
+# app/archive_store.py
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+ARCHIVE_DATA_DIR = Path(os.getenv("ARCHIVE_DATA_DIR", "data"))
+ARCHIVE_DB_PATH = Path(os.getenv("ARCHIVE_DB_PATH", "data/archive.sqlite3"))
+ARCHIVE_HOT_DAYS = int(os.getenv("ARCHIVE_HOT_DAYS", "14"))
+# Range queries rescan data_dir for new / changed days at most this often (the daily job ingests its own day)
+ARCHIVE_REFRESH_SEC = float(os.getenv("ARCHIVE_REFRESH_SEC", "60"))
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class ArchiveStore:
+    """
+    Indexed store for data/daily_summary_<date>.json files.
+
+    - Daily JSON files are ingested into SQLite (indexed by date, topic and url)
+      only when their mtime/size changes.
+    - Recently used days are kept in memory as ready-to-render views:
+      `articles` (file order, with audio_path) and `by_topic` (sorted by topic).
+    - A request costs one os.stat() to validate the hot entry; the JSON parser
+      only runs after the daily job rewrites a file.
+
+    Args:
+        data_dir (Path): Directory holding daily_summary_<date>.json files.
+        db_path (Path): SQLite database file.
+        hot_days (int): Number of day views kept in memory.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path = ARCHIVE_DATA_DIR,
+        db_path: Path = ARCHIVE_DB_PATH,
+        hot_days: int = ARCHIVE_HOT_DAYS,
+    ):
+        self.data_dir = Path(data_dir)
+        self.db_path = Path(db_path)
+        self.hot_days = hot_days
+        self._hot: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_refresh = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS archive_files (
+                    date TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS archive_articles (
+                    date TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    topic TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (date, position)
+                );
+                CREATE INDEX IF NOT EXISTS idx_archive_topic_date ON archive_articles(topic, date);
+                CREATE INDEX IF NOT EXISTS idx_archive_url ON archive_articles(url);
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def summary_path(self, day: str) -> Path:
+        return self.data_dir / f"daily_summary_{day}.json"
+
+    def ingest_day(self, day: str) -> bool:
+        """
+        (Re)load one day's JSON into SQLite if the file changed since the last ingest.
+
+        Returns:
+            bool: True if the day exists on disk (ingested now or already current).
+        """
+        if not DATE_RE.match(day):
+            return False
+        path = self.summary_path(day)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return False
+
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT mtime_ns, size FROM archive_files WHERE date = ?", (day,)
+            ).fetchone()
+            if row == (st.st_mtime_ns, st.st_size):
+                return True
+
+            with open(path, "r", encoding="utf-8") as f:
+                articles = json.load(f)
+
+            with conn:
+                conn.execute("DELETE FROM archive_articles WHERE date = ?", (day,))
+                conn.executemany(
+                    "INSERT INTO archive_articles (date, position, topic, title, url, summary, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            day, i, a.get("topic", ""), a.get("title", ""), a.get("url", ""),
+                            a.get("summary", ""), json.dumps(a, ensure_ascii=False),
+                        )
+                        for i, a in enumerate(articles, 1)  # article_01, 02, 03...
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO archive_files (date, mtime_ns, size) VALUES (?, ?, ?)",
+                    (day, st.st_mtime_ns, st.st_size),
+                )
+            self._hot.pop(day, None)
+            return True
+
+    def ingest_all(self) -> list:
+        """Ingest every daily summary file in data_dir; returns the dates found."""
+        days = []
+        for path in sorted(self.data_dir.glob("daily_summary_*.json")):
+            day = path.stem[len("daily_summary_"):]
+            if DATE_RE.match(day) and self.ingest_day(day):
+                days.append(day)
+        self._last_refresh = time.monotonic()
+        return days
+
+    def refresh_if_stale(self, max_age: float = ARCHIVE_REFRESH_SEC) -> None:
+        if time.monotonic() - self._last_refresh >= max_age:
+            self.ingest_all()
+
+    def get_day(self, day: str) -> Optional[dict]:
+        """
+        Return the pre-built view of one day, or None if there is no summary file.
+
+        The returned dict and its articles are shared between requests; treat them as read-only.
+        """
+        if not DATE_RE.match(day):
+            return None
+        try:
+            st = self.summary_path(day).stat()
+        except FileNotFoundError:
+            with self._lock:
+                self._hot.pop(day, None)
+            return None
+
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            hot = self._hot.get(day)
+            if hot is not None and hot[0] == stamp:
+                self._hot.move_to_end(day)
+                return hot[1]
+
+            if not self.ingest_day(day):
+                return None
+            view = self._build_view(day)
+            self._hot[day] = (stamp, view)
+            while len(self._hot) > self.hot_days:
+                self._hot.popitem(last=False)
+            return view
+
+    def _build_view(self, day: str) -> dict:
+        rows = self._connect().execute(
+            "SELECT position, data FROM archive_articles WHERE date = ? ORDER BY position", (day,)
+        ).fetchall()
+
+        articles = []
+        for position, data in rows:
+            article = json.loads(data)
+            article["audio_path"] = f"audio/{day}/article_{position:02}.mp3"
+            articles.append(article)
+
+        return {
+            "date": day,
+            "articles": articles,
+            # sort by topic (stable, same as the previous per-request sorted())
+            "by_topic": sorted(articles, key=lambda x: x.get("topic", "")),
+        }
+
+    def query(
+        self,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        topic: Optional[str] = None,
+        limit: int = 500,
+    ) -> list:
+        """
+        Range query over all ingested days (inclusive bounds, newest first).
+
+        Args:
+            from_date (str | None): First date (YYYY-MM-DD).
+            to_date (str | None): Last date (YYYY-MM-DD).
+            topic (str | None): Only articles of this topic.
+            limit (int): Maximum number of rows.
+
+        Returns:
+            list[dict]: Articles with date, position, topic, title, url, summary and audio_path.
+        """
+        self.refresh_if_stale()
+
+        clauses, params = [], []  # type: ignore
+        if from_date:
+            clauses.append("date >= ?")
+            params.append(from_date)
+        if to_date:
+            clauses.append("date <= ?")
+            params.append(to_date)
+        if topic:
+            clauses.append("topic = ?")
+            params.append(topic)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT date, position, topic, title, url, summary FROM archive_articles {where} "
+                "ORDER BY date DESC, position ASC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+
+        return [
+            {
+                "date": day,
+                "position": position,
+                "topic": topic_,
+                "title": title,
+                "url": url,
+                "summary": summary,
+                "audio_path": f"audio/{day}/article_{position:02}.mp3",
+            }
+            for day, position, topic_, title, url, summary in rows
+        ]
+
+
+# Shared instance used by app/main.py and routes/archive.py
+archive_store = ArchiveStore()
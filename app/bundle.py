@@ -0,0 +1,192 @@
+# app/bundle.py
+"""
+Compact binary bundle for one day's articles (*.nlb).
+
+Layout (little-endian):
+
+    header   magic "NLB1" | version u16 | flags u16 | count u32 | meta_len u32
+    meta     compact JSON object (date, created_at, ...), meta_len bytes
+    index    count x (offset u32, length u32) — absolute offset of each record
+    records  count x (length u32 | compact JSON article)
+
+Records are compact UTF-8 JSON, so a bundle is a fraction of the indent=2 file
+and exporting it gives back exactly the same articles. The index lets a reader
+decode one article without touching the others; the length prefixes let a
+reader stream records without the index.
+
+Usage:
+    python app/bundle.py pack data/daily_summary_2025-08-01.json
+    python app/bundle.py export data/daily_summary_2025-08-01.nlb > day.json
+    python app/bundle.py show data/daily_summary_2025-08-01.nlb 3
+"""
+
+import json
+import os
+import struct
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+MAGIC = b"NLB1"
+VERSION = 1
+BUNDLE_SUFFIX = ".nlb"
+
+_HEADER = struct.Struct("<4sHHII")
+_INDEX_ENTRY = struct.Struct("<II")
+_LENGTH = struct.Struct("<I")
+
+
+class BundleError(ValueError):
+    """Raised for files that are not valid bundles (bad magic, version or truncated)."""
+
+
+def _compact(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_bundle(articles: list, meta: Optional[dict] = None) -> bytes:
+    """
+    Encode `articles` (a day's list of article dicts) as a bundle.
+
+    Args:
+        articles (list): Article dicts, in the day's order.
+        meta (dict | None): Extra header fields (e.g. {"date": "2025-08-01"}).
+
+    Returns:
+        bytes: The encoded bundle.
+    """
+    meta_bytes = _compact({"created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"), **(meta or {})})
+    records = [_compact(article) for article in articles]
+
+    offset = _HEADER.size + len(meta_bytes) + _INDEX_ENTRY.size * len(records)
+    index, body = [], []
+    for record in records:
+        offset += _LENGTH.size
+        index.append(_INDEX_ENTRY.pack(offset, len(record)))
+        body.append(_LENGTH.pack(len(record)) + record)
+        offset += len(record)
+
+    header = _HEADER.pack(MAGIC, VERSION, 0, len(records), len(meta_bytes))
+    return b"".join([header, meta_bytes, *index, *body])
+
+
+def write_bundle(path: Path, articles: list, meta: Optional[dict] = None) -> Path:
+    """Encode `articles` and write the bundle to `path` atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(encode_bundle(articles, meta))
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _parse_header(data: bytes) -> tuple:
+    if len(data) < _HEADER.size:
+        raise BundleError("truncated bundle header")
+    magic, version, _flags, count, meta_len = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise BundleError(f"not a bundle (magic {magic!r})")
+    if version != VERSION:
+        raise BundleError(f"unsupported bundle version {version}")
+    return count, meta_len
+
+
+class Bundle:
+    """
+    Read-only view of an encoded bundle; articles are decoded on access.
+
+    Args:
+        data (bytes): The whole bundle (see `Bundle.load` for files).
+    """
+
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        count, meta_len = _parse_header(data)
+        meta_end = _HEADER.size + meta_len
+        index_end = meta_end + _INDEX_ENTRY.size * count
+        if len(data) < index_end:
+            raise BundleError("truncated bundle index")
+
+        self.meta = json.loads(bytes(self._data[_HEADER.size:meta_end]))
+        self._index = [
+            _INDEX_ENTRY.unpack_from(data, meta_end + i * _INDEX_ENTRY.size) for i in range(count)
+        ]
+        if self._index and sum(self._index[-1]) > len(data):
+            raise BundleError("truncated bundle records")
+
+    @classmethod
+    def load(cls, path: Path) -> "Bundle":
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, i: int) -> dict:
+        offset, length = self._index[i]
+        return json.loads(bytes(self._data[offset:offset + length]))
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self._index)):
+            yield self[i]
+
+    def articles(self) -> list:
+        return list(self)
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """Export the articles as the JSON list they were encoded from."""
+        if indent is None:
+            # Records are already compact JSON: join them without re-encoding
+            return "[" + ",".join(
+                bytes(self._data[o:o + n]).decode("utf-8") for o, n in self._index
+            ) + "]"
+        return json.dumps(self.articles(), ensure_ascii=False, indent=indent)
+
+
+def read_article(path: Path, i: int) -> dict:
+    """
+    Decode article `i` from the bundle at `path`, reading only its header, index entry and record.
+    """
+    with open(path, "rb") as f:
+        count, meta_len = _parse_header(f.read(_HEADER.size))
+        if not 0 <= i < count:
+            raise IndexError(f"article {i} out of range (bundle has {count})")
+        f.seek(_HEADER.size + meta_len + i * _INDEX_ENTRY.size)
+        entry = f.read(_INDEX_ENTRY.size)
+        if len(entry) < _INDEX_ENTRY.size:
+            raise BundleError("truncated bundle index")
+        offset, length = _INDEX_ENTRY.unpack(entry)
+        f.seek(offset)
+        record = f.read(length)
+        if len(record) < length:
+            raise BundleError("truncated bundle records")
+        return json.loads(record)
+
+
+def bundle_path_for(json_path: Path) -> Path:
+    """data/daily_summary_<date>.json -> data/daily_summary_<date>.nlb"""
+    return Path(json_path).with_suffix(BUNDLE_SUFFIX)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("pack", "export", "show"):
+        print(__doc__)
+        raise SystemExit(2)
+
+    command, path = sys.argv[1], Path(sys.argv[2])
+    if command == "pack":
+        articles = json.loads(path.read_text(encoding="utf-8"))
+        out = write_bundle(bundle_path_for(path), articles, {"source": path.name})
+        print(f"📦 {path} ({path.stat().st_size} bytes) → {out} ({out.stat().st_size} bytes)")
+    elif command == "export":
+        print(Bundle.load(path).to_json(indent=2))
+    else:
+        print(json.dumps(read_article(path, int(sys.argv[3]) if len(sys.argv) > 3 else 0),
+                         ensure_ascii=False, indent=2))
@@ -0,0 +1,138 @@
+# app/cache.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class LRUCache:
+    """
+    Small bounded LRU map with optional per-entry TTL.
+
+    Entries older than `ttl` seconds are still kept (until evicted) so callers
+    can decide to serve them stale; `get()` reports their age alongside the value.
+
+    Args:
+        max_entries (int): Maximum number of entries kept in memory.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable):
+        """Return (value, stored_at) or None, marking the entry as recently used."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (value, time.monotonic())
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def items(self, limit: int = 0) -> list:
+        """(key, value) pairs, most recently used first, without touching LRU order or stats."""
+        pairs = [(key, value) for key, (value, _) in reversed(self._data.items())]
+        return pairs[:limit] if limit > 0 else pairs
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class AsyncResponseCache:
+    """
+    TTL + LRU cache for async fetchers with single-flight and stale-while-revalidate.
+
+    - Fresh entries (age < ttl) are returned directly.
+    - Stale entries (ttl <= age < ttl + stale_ttl) are returned immediately while
+      one background task refreshes them.
+    - Concurrent misses for the same key share a single upstream call.
+
+    Args:
+        ttl (float): Seconds an entry is considered fresh.
+        stale_ttl (float): Extra seconds a stale entry may be served while revalidating.
+        max_entries (int): LRU bound on the number of cached keys.
+    """
+
+    def __init__(self, ttl: float = 60.0, stale_ttl: float = 300.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lru = LRUCache(max_entries)
+        self._inflight: dict = {}
+        self.stale_served = 0
+        self.coalesced = 0
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._lru.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_served += 1
+                if key not in self._inflight:
+                    self._start_fetch(key, fetch)
+                return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+        return await asyncio.shield(self._start_fetch(key, fetch))
+
+    def _start_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        async def run():
+            try:
+                value = await fetch()
+                self._lru.set(key, value)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(run())
+        # Background revalidation failures must not surface as "never retrieved" warnings
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self._lru.stats(),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "stale_served": self.stale_served,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
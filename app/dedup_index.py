@@ -0,0 +1,218 @@
+# app/dedup_index.py
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+DEDUP_DB_PATH = Path(os.getenv("DEDUP_DB_PATH", "data/dedup.sqlite3"))
+# Bodies whose SimHashes differ in at most this many bits are near-duplicates
+DEDUP_MAX_HAMMING = int(os.getenv("DEDUP_MAX_HAMMING", "7"))
+# Only articles recorded up to this many days before the day being processed are compared
+DEDUP_WINDOW_DAYS = int(os.getenv("DEDUP_WINDOW_DAYS", "7"))
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_MASK = (1 << SIMHASH_BITS) - 1
+
+
+def _shingles(text: str) -> Counter:
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        return Counter(tokens)
+    return Counter(
+        " ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    )
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash of `text` over word 3-shingles.
+
+    Texts that share most of their shingles get hashes a few bits apart, so a
+    re-syndicated story with a tweaked headline or extra paragraph still matches.
+    """
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in _shingles(text).items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            if h >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & _MASK).count("1")
+
+
+def _signed(value: int) -> int:
+    # SQLite INTEGER is signed 64-bit
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+class DedupIndex:
+    """
+    Persistent cross-day index of Guardian articles used to skip duplicates
+    before they are summarized and synthesized.
+
+    An article is a duplicate when its Guardian `id` was already recorded, or
+    when its bodyText SimHash is within `max_hamming` bits of a recorded one.
+    Near-duplicate lookup uses LSH banding: the 64-bit hash is split into
+    `max_hamming + 1` bands, so any hash within the threshold shares at least
+    one band exactly and only those candidates are compared.
+
+    Args:
+        db_path (Path): SQLite database file.
+        max_hamming (int): Near-duplicate threshold in bits.
+        window_days (int): Only compare against articles recorded this many days around `day`.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = DEDUP_DB_PATH,
+        max_hamming: int = DEDUP_MAX_HAMMING,
+        window_days: int = DEDUP_WINDOW_DAYS,
+    ):
+        self.db_path = Path(db_path)
+        self.max_hamming = max_hamming
+        self.window_days = window_days
+        self.bands = max(1, max_hamming + 1)
+        self.band_bits = -(-SIMHASH_BITS // self.bands)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS dedup_docs (
+                    guardian_id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    simhash INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS dedup_bands (
+                    band INTEGER NOT NULL,
+                    value INTEGER NOT NULL,
+                    guardian_id TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_dedup_bands ON dedup_bands(band, value);
+                CREATE INDEX IF NOT EXISTS idx_dedup_bands_id ON dedup_bands(guardian_id);
+                CREATE INDEX IF NOT EXISTS idx_dedup_docs_date ON dedup_docs(date);
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _band_values(self, value: int) -> list:
+        mask = (1 << self.band_bits) - 1
+        return [(band, value >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def _window(self, day: str) -> tuple:
+        # Only earlier days (and the day itself) can hold the original, so the
+        # outcome of a backfill does not depend on the order days are processed in
+        d = date.fromisoformat(day)
+        return (d - timedelta(days=self.window_days)).isoformat(), d.isoformat()
+
+    def find_duplicate(self, guardian_id: str, body: str, day: str) -> Optional[dict]:
+        """
+        Return the recorded article that `guardian_id` / `body` duplicates, or None.
+
+        The article's own record from an earlier run of the same day is ignored,
+        so resumed and forced runs do not reject their own articles. Only articles
+        recorded on `day` or up to `window_days` before it count as the original.
+
+        Args:
+            guardian_id (str): Guardian content id (e.g. "technology/2025/aug/08/...").
+            body (str): Article bodyText.
+            day (str): Day being processed (YYYY-MM-DD).
+
+        Returns:
+            dict | None: guardian_id, url, title, topic, date and hamming distance of the match.
+        """
+        value = simhash(body)
+        start, end = self._window(day)
+        columns = "guardian_id, url, title, topic, date, simhash"
+
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                f"SELECT {columns} FROM dedup_docs WHERE guardian_id = ?", (guardian_id,)
+            ).fetchone()
+            if row is not None and row[4] < day:
+                return self._match(row, 0)
+
+            # LSH: only articles sharing at least one band are compared
+            bands = self._band_values(value)
+            where = " OR ".join("(b.band = ? AND b.value = ?)" for _ in bands)
+            rows = conn.execute(
+                f"SELECT DISTINCT {', '.join('d.' + c for c in columns.split(', '))} "
+                "FROM dedup_bands b JOIN dedup_docs d ON d.guardian_id = b.guardian_id "
+                f"WHERE ({where}) AND d.guardian_id != ? AND d.date BETWEEN ? AND ?",
+                (*[v for pair in bands for v in pair], guardian_id, start, end),
+            ).fetchall()
+
+            best = None
+            for row in rows:
+                distance = hamming(value, row[5] & _MASK)
+                if distance <= self.max_hamming and (best is None or distance < best[1]):
+                    best = (row, distance)
+        return self._match(*best) if best else None
+
+    @staticmethod
+    def _match(row: tuple, distance: int) -> dict:
+        guardian_id, url, title, topic, day, _ = row
+        return {"guardian_id": guardian_id, "url": url, "title": title, "topic": topic,
+                "date": day, "hamming": distance}
+
+    def add(self, guardian_id: str, body: str, day: str, url: str = "", title: str = "", topic: str = "") -> None:
+        """Record an accepted article so later runs (and other topics) can dedup against it."""
+        value = simhash(body)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM dedup_bands WHERE guardian_id = ?", (guardian_id,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO dedup_docs (guardian_id, url, title, topic, date, simhash) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (guardian_id, url, title, topic, day, _signed(value)),
+                )
+                conn.executemany(
+                    "INSERT INTO dedup_bands (band, value, guardian_id) VALUES (?, ?, ?)",
+                    [(band, band_value, guardian_id) for band, band_value in self._band_values(value)],
+                )
+
+    def remove_day(self, day: str) -> int:
+        """Forget every article recorded for `day` (used when a day is redone with --force)."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "DELETE FROM dedup_bands WHERE guardian_id IN "
+                    "(SELECT guardian_id FROM dedup_docs WHERE date = ?)",
+                    (day,),
+                )
+                return conn.execute("DELETE FROM dedup_docs WHERE date = ?", (day,)).rowcount
+
+
+# Shared instance used by the daily job
+dedup_index = DedupIndex()
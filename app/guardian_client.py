@@ -1,11 +1,29 @@
 # app/guardian_client.py
 
+import asyncio
+import importlib.util
+import math
 import os
+import threading
+from typing import Optional
 import httpx
 from dotenv import load_dotenv
+from app.cache import AsyncResponseCache, LRUCache
+from app.log import get_logger
+from app.metrics import GUARDIAN_FILTERED
+from app.resilience import (
+    RetryableStatusError,
+    UpstreamConnectionError,
+    UpstreamError,
+    get_upstream,
+    is_transient,
+)
+from app.tracing import span
 
 load_dotenv()
 
+logger = get_logger("guardian")
+
 # ────────────────────────────────────────────────────────────────
 # Configuration loaded from .env
 # ────────────────────────────────────────────────────────────────
@@ -16,6 +34,218 @@ GUARDIAN_DEFAULT_FIELDS = os.getenv("GUARDIAN_DEFAULT_FIELDS", "headline,bodyTex
 GUARDIAN_DEFAULT_PAGE_SIZE = int(os.getenv("GUARDIAN_DEFAULT_PAGE_SIZE", "3"))
 GUARDIAN_MAX_PAGES = int(os.getenv("GUARDIAN_MAX_PAGES", "3"))
 
+# Connection pool settings for the shared AsyncClient
+GUARDIAN_MAX_CONNECTIONS = int(os.getenv("GUARDIAN_MAX_CONNECTIONS", "20"))
+GUARDIAN_MAX_KEEPALIVE = int(os.getenv("GUARDIAN_MAX_KEEPALIVE", "10"))
+GUARDIAN_TIMEOUT_SEC = float(os.getenv("GUARDIAN_TIMEOUT_SEC", "10"))
+
+# Response cache for AsyncGuardianClient (GUARDIAN_CACHE_TTL_SEC=0 disables it)
+GUARDIAN_CACHE_TTL_SEC = float(os.getenv("GUARDIAN_CACHE_TTL_SEC", "60"))
+GUARDIAN_CACHE_STALE_SEC = float(os.getenv("GUARDIAN_CACHE_STALE_SEC", "300"))
+GUARDIAN_CACHE_MAX_ENTRIES = int(os.getenv("GUARDIAN_CACHE_MAX_ENTRIES", "256"))
+
+# Query planner: push exclusions into the API query and over-fetch adaptively
+GUARDIAN_PUSHDOWN = os.getenv("GUARDIAN_PUSHDOWN", "true").lower() == "true"
+GUARDIAN_EXCLUDE_TAGS = os.getenv("GUARDIAN_EXCLUDE_TAGS", "tone/obituaries,tone/quizzes")
+GUARDIAN_REJECTION_ALPHA = float(os.getenv("GUARDIAN_REJECTION_ALPHA", "0.3"))
+# Rejection rates are tracked per query string (user input), so keep only the most recent
+GUARDIAN_PLANNER_MAX_QUERIES = int(os.getenv("GUARDIAN_PLANNER_MAX_QUERIES", "1024"))
+GUARDIAN_PLANNER_STATS_LIMIT = 20
+GUARDIAN_API_MAX_PAGE_SIZE = 50  # enforced by the Guardian API
+
+# Field projections: request only what an endpoint renders
+FIELDS_TRAIL = "trailText"
+FIELDS_BODY = "bodyText"
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+# Rate limit, adaptive concurrency, circuit breaker and retry budget (app/resilience.py)
+guardian_upstream = get_upstream("guardian")
+
+
+def _is_retryable(error: Exception) -> bool:
+    return isinstance(error, httpx.TransportError) or is_transient(error)
+
+
+def _get(url: str, params: dict) -> httpx.Response:
+    # Transport failures become UpstreamError, so once retries are exhausted
+    # the API answers 503 (see app/main.py) instead of a bare 500
+    try:
+        response = httpx.get(url, params=params)
+    except httpx.TransportError as e:
+        raise UpstreamConnectionError("guardian", e) from e
+    return _check_status(response)
+
+
+def _check_status(response: httpx.Response) -> httpx.Response:
+    # 429 / 5xx are retried by the upstream policy; other statuses are returned as-is
+    if response.status_code == 429 or response.status_code >= 500:
+        raise RetryableStatusError("guardian", response.status_code)
+    return response
+
+
+def _collect_valid_articles(results: list, seen: set, articles: list, page_size: int) -> int:
+    """
+    Append valid, unseen Guardian results to `articles` until `page_size` is reached.
+
+    Shared by the sync and async fetchers so both apply the same filtering rules
+    (kept as a safety net even when the QueryPlanner pushes them into the query).
+
+    Returns:
+        int: Number of results examined (accepted or rejected).
+    """
+    examined = 0
+    accepted_before = len(articles)
+    for item in results:
+        examined += 1
+        # Skip live blogs, Quizzes, and Obituaries
+        # id: unique idenfitiers of articles e.g.
+        # world/live/2025/aug/08/uk-election-live-updates
+        # sport/quiz/2025/aug/08/football-weekly
+
+        if (
+            "live" in item["id"] or
+            "quiz" in item["id"] or
+            "obituary" in item["webTitle"].lower()
+        ):
+            continue
+
+        key = (item["webTitle"], item["webUrl"])
+        if key in seen or item["id"] in seen:
+            continue
+        seen.add(key)
+        seen.add(item["id"])
+
+        articles.append({
+        "id": item["id"],
+        "title": item["webTitle"],
+        "url": item["webUrl"],
+        "content": item.get("fields", {}).get("trailText", ""),
+        "fields": item.get("fields", {}),
+        })
+
+        if len(articles) >= page_size:
+            break
+    GUARDIAN_FILTERED.observe(examined - (len(articles) - accepted_before))
+    return examined
+
+
+def _build_params(
+    query: str, page_size: int, fields: str, page: int,
+    from_date: Optional[str] = None, to_date: Optional[str] = None,
+) -> dict:
+    params = {
+        "api-key": GUARDIAN_API_KEY,
+        "q": query,
+        "page-size": page_size,
+        "show-fields": fields,
+        "page": page,
+        "order-by": "newest"
+    }
+    # Optional publication date window (YYYY-MM-DD), used for backfills
+    if from_date:
+        params["from-date"] = from_date
+    if to_date:
+        params["to-date"] = to_date
+    return params
+
+
+class QueryPlanner:
+    """
+    Plans Guardian search requests.
+
+    - Pushdown: `type=article` drops live blogs (and other non-article content)
+      and `tag=-tone/obituaries,-tone/quizzes` drops the rest of what
+      `_collect_valid_articles` would reject, so the API does the filtering.
+    - Adaptive over-fetch: an EWMA of the rejection rate observed per query
+      sizes the API page so one request usually yields `page_size` valid articles.
+      The start offset of `page` is preserved, so UI pagination is unchanged.
+
+    Args:
+        pushdown (bool): Add the type/tag filters to the API query.
+        exclude_tags (str): Comma-separated tags to exclude.
+        alpha (float): EWMA weight of the latest observation.
+        max_queries (int): LRU bound on the number of queries tracked.
+    """
+
+    def __init__(
+        self,
+        pushdown: bool = GUARDIAN_PUSHDOWN,
+        exclude_tags: str = GUARDIAN_EXCLUDE_TAGS,
+        alpha: float = GUARDIAN_REJECTION_ALPHA,
+        max_queries: int = GUARDIAN_PLANNER_MAX_QUERIES,
+    ):
+        self.pushdown = pushdown
+        self.exclude_tags = [t.strip() for t in exclude_tags.split(",") if t.strip()]
+        self.alpha = alpha
+        self._rejection = LRUCache(max_queries)
+        self._lock = threading.Lock()
+
+    def _rate(self, query: str) -> Optional[float]:
+        with self._lock:
+            entry = self._rejection.get(query)
+        return None if entry is None else entry[0]
+
+    def fetch_size(self, query: str, page_size: int) -> int:
+        """API `page-size` to request so ~`page_size` results survive filtering."""
+        rate = self._rate(query) or 0.0
+        planned = math.ceil(page_size / max(1.0 - rate, 0.1))
+        return max(1, min(GUARDIAN_API_MAX_PAGE_SIZE, max(page_size, planned)))
+
+    @staticmethod
+    def start(page: int, page_size: int, fetch_size: int) -> tuple:
+        """
+        Map a caller page (of `page_size` items) onto API pages of `fetch_size` items.
+
+        Returns:
+            tuple[int, int]: First API page and the number of its results to skip.
+        """
+        offset = (page - 1) * page_size
+        return offset // fetch_size + 1, offset % fetch_size
+
+    def build_params(
+        self, query: str, fetch_size: int, fields: str, api_page: int,
+        from_date: Optional[str] = None, to_date: Optional[str] = None,
+    ) -> dict:
+        params = _build_params(query, fetch_size, fields, api_page, from_date, to_date)
+        if self.pushdown:
+            params["type"] = "article"
+            if self.exclude_tags:
+                params["tag"] = ",".join(f"-{tag}" for tag in self.exclude_tags)
+        return params
+
+    def is_calibrated(self, query: str) -> bool:
+        with self._lock:
+            return query in self._rejection
+
+    def observe(self, query: str, examined: int, accepted: int) -> None:
+        """Fold one fetch's rejection rate into the query's EWMA."""
+        if examined <= 0:
+            return
+        rate = 1.0 - accepted / examined
+        with self._lock:
+            entry = self._rejection.get(query)
+            self._rejection.set(query, rate if entry is None else (
+                self.alpha * rate + (1 - self.alpha) * entry[0]
+            ))
+
+    def stats(self, limit: int = GUARDIAN_PLANNER_STATS_LIMIT) -> dict:
+        # Only the most recently used queries are listed; `queries` is the tracked total
+        with self._lock:
+            recent = self._rejection.items(limit)
+            tracked = len(self._rejection)
+        return {
+            "pushdown": self.pushdown,
+            "queries": tracked,
+            "max_queries": self._rejection.max_entries,
+            "rejection_rate": {q: round(r, 4) for q, r in recent},
+        }
+
+
+# Planner used by the sync fetcher
+default_planner = QueryPlanner()
 
 
 def fetch_guardian_articles(
@@ -25,6 +255,8 @@ def fetch_guardian_articles(
     page: int = 1,
     debug: bool = False,
     max_pages: int = GUARDIAN_MAX_PAGES,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
 ):
 
     """
@@ -52,8 +284,10 @@ def fetch_guardian_articles(
         (a) A total of `page_size` valid articles are collected, OR
         (b) `max_pages` have been checked (failsafe against infinite loops)
 
-    - Skips unwanted entries (live blogs, quizzes, obituaries)
-    - Ensures no duplicates using a title + URL tuple key
+    - Skips unwanted entries (live blogs, quizzes, obituaries); with pushdown
+      enabled the API already excludes them (see QueryPlanner)
+    - Sizes API pages from the observed rejection rate so fewer round trips are needed
+    - Ensures no duplicates using a title + URL tuple key (and the Guardian id)
     - Returns exactly `page_size` items per keyword if possible
 
     ─────────────────────────────────────────────────────────────────────────────
@@ -61,9 +295,11 @@ def fetch_guardian_articles(
         query (str): Keyword to search (e.g., "technology")
         page_size (int): Desired number of valid articles to return
         fields (str): Comma-separated list of fields to include
-        page (int): Starting page number for the Guardian API
+        page (int): Page of `page_size` results to return (1 = first)
         debug (bool): If True, prints detailed response info
         max_pages (int): Maximum number of API pages to scan
+        from_date (str | None): Earliest publication date (YYYY-MM-DD)
+        to_date (str | None): Latest publication date (YYYY-MM-DD)
 
     Returns:
         list[dict]: List of dictionaries containing article title, URL, and summary.
@@ -71,75 +307,47 @@ def fetch_guardian_articles(
 
     url = GUARDIAN_API_URL
     articles = []  # type: ignore
-    seen = set()
-    page = 1
-    total_checked = 0
-
-    # Guardian API `page-size` parameter controls both:
-    #  - how many articles are fetched per request (API fetch limit)
-    #  - how many articles are ultimately displayed (UI display count)
-    #
-    # The API enforces its own maximum of 50 items per page,
-    # so no additional local limits are required here.
-
-    while len(articles) < page_size and page <= max_pages:
-        params = {
-            "api-key": GUARDIAN_API_KEY,
-            "q": query,
-            "page-size": page_size,
-            "show-fields": fields,
-            "page": page,
-            "order-by": "newest"
-        }
-
-        response = httpx.get(url, params=params)
-        print(f"✅ Response status: {response.status_code}")
+    seen = set()  # type: ignore
+    scanned = 0
+    examined = 0
+
+    # `page_size` is how many articles are returned (UI display count).
+    # The API `page-size` is planned separately: it over-fetches by the observed
+    # rejection rate (capped at the API maximum of 50 items per page).
+    planner = default_planner
+    fetch_size = planner.fetch_size(query, page_size)
+    api_page, skip = planner.start(page, page_size, fetch_size)
+
+    while len(articles) < page_size and scanned < max_pages:
+        params = planner.build_params(query, fetch_size, fields, api_page, from_date, to_date)
+
+        try:
+            response = guardian_upstream.call(
+                lambda: _get(url, params), retryable=_is_retryable
+            )
+        except UpstreamError as e:
+            logger.warning("❌ Request failed on page %s: %s", page, e)
+            break
+        logger.debug("✅ Response status: %s", response.status_code)
 
         if response.status_code != 200:
-            print(f"❌ Request failed on page {page}")
+            logger.warning("❌ Request failed on page %s (status %s)", page, response.status_code)
             break
 
         response.raise_for_status()
         data = response.json()
-        print(f"📦 Found {len(data['response']['results'])} results on page {page}")
+        logger.debug("📦 Found %d results on page %s", len(data["response"]["results"]), page)
 
         if debug:
             print("<<< STATUS CODE >>>", response.status_code)
             print("<<< RESPONSE TEXT START >>>", response.text[:200])  # Truncate for readability
             print("<<< RESPONSE TEXT END >>>")
 
-        for item in data["response"]["results"]:
-            total_checked += 1
-
-            # Skip live blogs, Quizzes, and Obituaries
-            # id: unique idenfitiers of articles e.g.
-            # world/live/2025/aug/08/uk-election-live-updates
-            # sport/quiz/2025/aug/08/football-weekly
+        results = data["response"]["results"][skip:] if scanned == 0 else data["response"]["results"]
+        examined += _collect_valid_articles(results, seen, articles, page_size)
 
-            if (
-                "live" in item["id"] or
-                "quiz" in item["id"] or
-                "obituary" in item["webTitle"].lower()
-            ):
-                continue
-
-            key = (item["webTitle"], item["webUrl"])
-            if key in seen:
-                continue
-            seen.add(key)
-
-            articles.append({
-            "title": item["webTitle"],
-            "url": item["webUrl"],
-            "content": item["fields"].get("trailText", ""),
-            "fields": item["fields"],
-            })
-
-            if len(articles) >= page_size:
-                break
-
-            if debug:
-                print(f"Page {page}: Collected {len(articles)} articles so far.")
+        if debug:
+            print(f"Page {page}: Collected {len(articles)} articles so far.")
 
     # if debug:
     #     for article in articles:
@@ -148,12 +356,164 @@ def fetch_guardian_articles(
     #         print("Content Preview:", article["content"][:200])
     #         print("=" * 40)
 
-        print(f"📰 Collected {len(articles)} articles so far...")
+        logger.debug("📰 Collected %d articles so far...", len(articles))
         page += 1  # ✅ Move to next page inside the while loop
+        scanned += 1
+        api_page += 1
 
-    print(f"✅ Final count for '{query}': {len(articles)} articles")
+    planner.observe(query, examined, len(articles))
+    logger.info("✅ Final count for '%s': %d articles", query, len(articles))
     return articles
 
+class AsyncGuardianClient:
+    """
+    Async Guardian client backed by one shared, connection-pooled httpx.AsyncClient.
+
+    API pages are planned by a QueryPlanner. For a query it has not seen yet, all
+    `max_pages` pages are requested speculatively in parallel; once the rejection
+    rate is known, the first page is sized to suffice and the remaining pages are
+    only requested (in parallel) if it falls short. Results are consumed in page
+    order (so output matches the serial fetcher), and pages still in flight are
+    cancelled as soon as `page_size` valid articles have been collected.
+
+    Usage:
+        client = AsyncGuardianClient()
+        articles = await client.fetch_articles(query="technology", page_size=3)
+        await client.aclose()
+    """
+
+    def __init__(
+        self,
+        base_url: str = GUARDIAN_API_URL,
+        max_connections: int = GUARDIAN_MAX_CONNECTIONS,
+        max_keepalive_connections: int = GUARDIAN_MAX_KEEPALIVE,
+        timeout: float = GUARDIAN_TIMEOUT_SEC,
+        http2: bool = HTTP2_AVAILABLE,
+        cache_ttl: float = GUARDIAN_CACHE_TTL_SEC,
+        cache_stale_ttl: float = GUARDIAN_CACHE_STALE_SEC,
+        cache_max_entries: int = GUARDIAN_CACHE_MAX_ENTRIES,
+        planner: Optional[QueryPlanner] = None,
+    ):
+        self.base_url = base_url
+        self.planner = planner or QueryPlanner()
+        self.cache = (
+            AsyncResponseCache(ttl=cache_ttl, stale_ttl=cache_stale_ttl, max_entries=cache_max_entries)
+            if cache_ttl > 0 else None
+        )
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+        )
+
+    async def _fetch_page(self, params: dict):
+        # Transient failures are retried within the shared budget; if they persist
+        # (or the circuit is open) the error propagates instead of looking like "no results".
+        response = await guardian_upstream.call_async(
+            lambda: self._request(params), retryable=_is_retryable
+        )
+        if response.status_code != 200:
+            logger.warning("❌ Request failed on page %s (status %s)", params["page"], response.status_code)
+            return None
+        return response.json()["response"]["results"]
+
+    async def _request(self, params: dict) -> httpx.Response:
+        try:
+            response = await self._client.get(self.base_url, params=params)
+        except httpx.TransportError as e:
+            raise UpstreamConnectionError("guardian", e) from e
+        return _check_status(response)
+
+    async def fetch_articles(
+        self,
+        query: str = GUARDIAN_DEFAULT_QUERY,
+        page_size: int = GUARDIAN_DEFAULT_PAGE_SIZE,
+        fields: str = GUARDIAN_DEFAULT_FIELDS,
+        page: int = 1,
+        max_pages: int = GUARDIAN_MAX_PAGES,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+    ) -> list:
+        """
+        Async counterpart of `fetch_guardian_articles` (same filtering and dedup rules).
+
+        Args:
+            query (str): Keyword to search (e.g., "technology")
+            page_size (int): Desired number of valid articles to return
+            fields (str): Comma-separated list of fields to include
+            page (int): Page of `page_size` results to return (1 = first)
+            max_pages (int): Maximum number of API pages to scan
+            from_date (str | None): Earliest publication date (YYYY-MM-DD)
+            to_date (str | None): Latest publication date (YYYY-MM-DD)
+
+        Returns:
+            list[dict]: List of dictionaries containing article title, URL, and summary.
+        """
+        args = (query, page_size, fields, page, max_pages, from_date, to_date)
+        if self.cache is None:
+            return await self._fetch_uncached(*args)
+
+        # Misses show up as nested upstream.guardian spans
+        with span("cache.guardian", query=query):
+            return await self.cache.get_or_fetch(args, lambda: self._fetch_uncached(*args))
+
+    async def _fetch_uncached(
+        self, query: str, page_size: int, fields: str, page: int, max_pages: int,
+        from_date: Optional[str] = None, to_date: Optional[str] = None,
+    ) -> list:
+        articles = []  # type: ignore
+        seen = set()  # type: ignore
+        examined = 0
+
+        fetch_size = self.planner.fetch_size(query, page_size)
+        api_page, skip = self.planner.start(page, page_size, fetch_size)
+
+        def launch(p: int):
+            params = self.planner.build_params(query, fetch_size, fields, p, from_date, to_date)
+            return asyncio.create_task(self._fetch_page(params))
+
+        # Once the planner has seen this query, the first page is sized to be
+        # enough on its own; otherwise speculate on all pages up front.
+        first_wave = 1 if self.planner.is_calibrated(query) else max_pages
+        tasks = [launch(p) for p in range(api_page, api_page + first_wave)]
+
+        try:
+            i = 0
+            while i < len(tasks):
+                results = await tasks[i]
+                if results is None:
+                    break
+                examined += _collect_valid_articles(results[skip:] if i == 0 else results, seen, articles, page_size)
+                if len(articles) >= page_size:
+                    break
+                i += 1
+                if i == len(tasks):
+                    # Planned page fell short: fetch the remaining pages in parallel
+                    tasks += [launch(p) for p in range(api_page + i, api_page + max_pages)]
+        finally:
+            # Stop early: drop speculative pages we no longer need
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.planner.observe(query, examined, len(articles))
+        logger.info("✅ Final count for '%s': %d articles", query, len(articles))
+        return articles
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache is not None else {"enabled": False}
+
+    def planner_stats(self) -> dict:
+        return self.planner.stats()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
 # This block allows standalone execution of this script
 # for quick testing or debugging without starting the FastAPI server.
 if __name__ == "__main__":
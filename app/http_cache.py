@@ -0,0 +1,328 @@
+# app/http_cache.py
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import stat
+import tempfile
+import threading
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from fastapi.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.archive_store import archive_store
+from app.metrics import HTTP_CACHE_RESPONSES
+from app.templating import TEMPLATE_DIR, templates
+from app.tracing import span
+
+try:  # optional: pip install brotli
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+HTTP_CACHE_DIR = Path(os.getenv("HTTP_CACHE_DIR", "data/http_cache"))
+# URL prefix the built tree is served under (see PrecompressedStaticFiles)
+HTTP_CACHE_MOUNT = "/built"
+# Lifetime of immutable (past-day) responses
+HTTP_IMMUTABLE_MAX_AGE = int(os.getenv("HTTP_IMMUTABLE_MAX_AGE", "31536000"))
+
+IMMUTABLE = f"public, max-age={HTTP_IMMUTABLE_MAX_AGE}, immutable"
+REVALIDATE = "no-cache"  # may be stored, but must be revalidated (ETag) before reuse
+
+# Precompressed artifacts built per day: name -> media type
+DAY_ARTIFACTS = {
+    "archive.html": "text/html; charset=utf-8",
+    "daily.html": "text/html; charset=utf-8",
+    "day.json": "application/json",
+}
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_AUDIO_DAY_RE = re.compile(r"^audio[/\\](\d{4}-\d{2}-\d{2})[/\\]")
+_BUILT_DAY_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})[/\\]")
+
+
+def cache_control_for(day: str) -> str:
+    """Past days never change once published; today's content must be revalidated."""
+    return IMMUTABLE if day < date.today().isoformat() else REVALIDATE
+
+
+def content_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists `etag` (weak comparison) or is "*"."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def negotiate_encoding(request: Request, available: list) -> Optional[str]:
+    """
+    Pick the best of `available` encodings ("br", "gzip") the client accepts.
+
+    Returns:
+        str | None: The encoding, or None for the identity body.
+    """
+    accepted = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.lower()] = q
+
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class PrecompressedStore:
+    """
+    Rendered, precompressed responses per day under HTTP_CACHE_DIR/<date>/.
+
+    Each artifact is stored as identity, .gz and (if brotli is installed) .br.
+    meta.json records each artifact's content-hash ETag plus the source stamp
+    (summary file and template mtimes) it was built from, so a rewritten day
+    or a changed template is rebuilt on the next request.
+
+    The tree is a self-contained static site: manifest.json lists every built
+    day with its ETags and file sizes, so it can also be synced to a CDN or
+    served by a plain file server.
+
+    Args:
+        root (Path): Output directory.
+    """
+
+    def __init__(self, root: Path = HTTP_CACHE_DIR):
+        self.root = Path(root)
+        self._meta: dict = {}  # day -> meta, so requests skip re-reading meta.json
+        self._manifest_lock = threading.Lock()
+
+    def _source_stamp(self, day: str) -> Optional[str]:
+        try:
+            st = archive_store.summary_path(day).stat()
+        except FileNotFoundError:
+            return None
+        template_mtimes = [
+            str((Path(TEMPLATE_DIR) / name).stat().st_mtime_ns)
+            for name in ("archive.html", "daily.html")
+        ]
+        return ":".join([str(st.st_mtime_ns), str(st.st_size), *template_mtimes])
+
+    def _read_meta(self, day: str) -> dict:
+        if day in self._meta:
+            return self._meta[day]
+        try:
+            with open(self.root / day / "meta.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def list_days(self) -> list:
+        """Dates that have a daily summary file, oldest first."""
+        days = []
+        for path in sorted(archive_store.data_dir.glob("daily_summary_*.json")):
+            day = path.stem[len("daily_summary_"):]
+            if _DATE_RE.match(day):
+                days.append(day)
+        return days
+
+    def is_current(self, day: str) -> bool:
+        """True if `day` is already built from its current summary file and templates."""
+        stamp = self._source_stamp(day)
+        return stamp is not None and self._read_meta(day).get("source") == stamp
+
+    def build_day(self, day: str, force: bool = False) -> Optional[dict]:
+        """
+        Render and precompress every artifact of `day` (skipped if already current).
+
+        Returns:
+            dict | None: The day's meta (etags per artifact), or None if the day has no data.
+        """
+        if not _DATE_RE.match(day):
+            return None
+        stamp = self._source_stamp(day)
+        if stamp is None:
+            return None
+        meta = self._read_meta(day)
+        if not force and meta.get("source") == stamp:
+            return meta
+
+        view = archive_store.get_day(day)
+        if view is None:
+            return None
+
+        bodies = {
+            "archive.html": templates.get_template("archive.html").render(
+                request=None, date=day, articles=view["articles"]
+            ).encode("utf-8"),
+            "daily.html": templates.get_template("daily.html").render(
+                request=None, summaries=view["by_topic"], error=None
+            ).encode("utf-8"),
+            "day.json": json.dumps(
+                {"date": day, "articles": view["articles"]}, ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8"),
+        }
+
+        out_dir = self.root / day
+        out_dir.mkdir(parents=True, exist_ok=True)
+        etags = {}
+        for name, body in bodies.items():
+            _write_atomic(out_dir / name, body)
+            _write_atomic(out_dir / f"{name}.gz", gzip.compress(body, compresslevel=9, mtime=0))
+            if BROTLI_AVAILABLE:
+                _write_atomic(out_dir / f"{name}.br", brotli.compress(body, quality=11))
+            etags[name] = content_etag(body)
+
+        meta = {"source": stamp, "etags": etags, "brotli": BROTLI_AVAILABLE}
+        _write_atomic(out_dir / "meta.json", json.dumps(meta, indent=2).encode("utf-8"))
+        self._meta[day] = meta
+        HTTP_CACHE_RESPONSES.inc(result="built")
+        return meta
+
+    def update_manifest(self, days: list) -> Path:
+        """
+        Record the built artifacts of `days` in manifest.json (other entries are kept).
+
+        Returns:
+            Path: The manifest file.
+        """
+        path = self.root / "manifest.json"
+        with self._manifest_lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (FileNotFoundError, ValueError):
+                manifest = {"days": {}}
+
+            for day in days:
+                meta = self._read_meta(day)
+                if not meta:
+                    manifest["days"].pop(day, None)
+                    continue
+                files = {}
+                for name in DAY_ARTIFACTS:
+                    for suffix in ("", ".gz", ".br"):
+                        artifact = self.root / day / f"{name}{suffix}"
+                        if artifact.exists():
+                            files[f"{day}/{name}{suffix}"] = artifact.stat().st_size
+                manifest["days"][day] = {"source": meta["source"], "etags": meta["etags"], "files": files}
+
+            manifest["days"] = dict(sorted(manifest["days"].items()))
+            manifest["generated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            self.root.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, json.dumps(manifest, indent=2).encode("utf-8"))
+        return path
+
+    def respond(self, request: Request, day: str, name: str) -> Optional[Response]:
+        """
+        Serve a precompressed artifact with ETag / 304 and Cache-Control handling.
+
+        Builds the day first if it is missing or stale; returns None if the day has no data.
+        """
+        with span("cache.http", day=day, artifact=name):
+            meta = self.build_day(day)
+        if meta is None:
+            return None
+
+        etag = meta["etags"][name]
+        cache_control = cache_control_for(day)
+        if etag_matches(request, etag):
+            HTTP_CACHE_RESPONSES.inc(result="not_modified")
+            return not_modified(etag, cache_control)
+        HTTP_CACHE_RESPONSES.inc(result="served")
+
+        available = ["gzip"] + (["br"] if meta.get("brotli") else [])
+        encoding = negotiate_encoding(request, available)
+        suffix = {"br": ".br", "gzip": ".gz"}.get(encoding or "", "")
+
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return FileResponse(self.root / day / f"{name}{suffix}", media_type=DAY_ARTIFACTS[name], headers=headers)
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with Cache-Control for day-scoped files (e.g. audio/<date>/article_01.mp3):
+    immutable for past days, revalidate (ETag / Last-Modified) otherwise.
+    Range requests for seeking are handled by Starlette's FileResponse.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        match = _AUDIO_DAY_RE.match(self.get_path(scope))
+        response.headers["Cache-Control"] = cache_control_for(match.group(1)) if match else REVALIDATE
+        return response
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Serves the HTTP_CACHE_DIR tree as built, with no freshness check or rendering:
+    `<date>/archive.html` is answered with its `.br` / `.gz` sibling when the
+    client accepts it, plus the per-day Cache-Control and Starlette's ETag / 304.
+
+    Files are only as fresh as the last build (daily job or build_static_site);
+    the /archive routes stay the fallback that builds missing or stale days.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        encoding = negotiate_encoding(Request(scope), ["br", "gzip"])
+        if encoding and scope["method"] in ("GET", "HEAD"):
+            suffix = ".br" if encoding == "br" else ".gz"
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                response = self.file_response(full_path, stat_result, scope)
+                if response.status_code == 200:
+                    response.headers["Content-Encoding"] = encoding
+                    response.headers["Content-Type"] = DAY_ARTIFACTS.get(
+                        Path(path).name, "application/octet-stream"
+                    )
+                return self._with_headers(path, response)
+        return self._with_headers(path, await super().get_response(path, scope))
+
+    @staticmethod
+    def _with_headers(path: str, response: Response) -> Response:
+        match = _BUILT_DAY_RE.match(path)
+        response.headers["Cache-Control"] = cache_control_for(match.group(1)) if match else REVALIDATE
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+# Shared instance used by app/main.py, routes/archive.py and the daily job
+precompressed_store = PrecompressedStore()
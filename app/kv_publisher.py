@@ -0,0 +1,268 @@
+# app/kv_publisher.py
+"""
+Incremental publisher for the UI's KV namespace (articles/<date> keys).
+
+- Each value's SHA-256 is compared with a local manifest (KV_MANIFEST_PATH);
+  only new or changed keys are uploaded, and the manifest is updated once the
+  upload succeeded.
+- Changed keys are sent in one bulk put (`wrangler kv bulk put`), so a
+  backfill pays for one Node/wrangler start-up instead of one per key.
+- Backends are pluggable: `WranglerKV` (real KV) and `FileSystemKV`, a
+  directory-backed stand-in for running the publisher offline.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote, unquote
+from app.log import get_logger
+
+logger = get_logger("kv")
+
+KV_BACKEND = os.getenv("KV_BACKEND", "wrangler")  # wrangler | fs
+KV_FS_DIR = Path(os.getenv("KV_FS_DIR", "data/fake_kv"))
+KV_MANIFEST_PATH = Path(os.getenv("KV_MANIFEST_PATH", "data/kv_manifest.json"))
+# Cloudflare accepts up to 10,000 pairs per bulk request
+KV_BULK_MAX_KEYS = int(os.getenv("KV_BULK_MAX_KEYS", "10000"))
+# Payload put under articles/<date>: "json" (compact JSON) or "bundle" (app/bundle.py binary)
+KV_PAYLOAD_FORMAT = os.getenv("KV_PAYLOAD_FORMAT", "json")
+
+DEFAULT_BINDING = "newslite_kv"
+DEFAULT_UI_DIR = Path("~/dev/newslite-ui").expanduser()
+DATA_DIR = Path("data")
+
+
+class KVPublishError(RuntimeError):
+    """Raised when a backend fails to store a batch."""
+
+
+class FileSystemKV:
+    """
+    KV stand-in that stores each key as a file under `root` (key URL-quoted).
+
+    Args:
+        root (Path): Directory holding the values.
+    """
+
+    def __init__(self, root: Path = KV_FS_DIR):
+        self.root = Path(root)
+        self.label = f"fs:{self.root}"
+
+    def _path(self, key: str) -> Path:
+        return self.root / quote(key, safe="")
+
+    def put_many(self, items: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        for key, value in items.items():
+            path = self._path(key)
+            tmp = path.with_name(path.name + ".part")
+            tmp.write_bytes(value)
+            os.replace(tmp, path)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def keys(self) -> list:
+        if not self.root.exists():
+            return []
+        return sorted(unquote(p.name) for p in self.root.iterdir() if not p.name.endswith(".part"))
+
+
+class WranglerKV:
+    """
+    Cloudflare KV through `npx wrangler kv bulk put` (run inside the UI repo).
+
+    Args:
+        binding (str): Wrangler KV binding name.
+        ui_dir (Path): UI repo root (holds wrangler.toml).
+        prod (bool): Production namespace instead of preview.
+    """
+
+    def __init__(self, binding: str = DEFAULT_BINDING, ui_dir: Path = DEFAULT_UI_DIR, prod: bool = False):
+        self.binding = binding
+        self.ui_dir = Path(ui_dir).expanduser()
+        self.prod = prod
+        self.label = f"wrangler:{binding}:{'prod' if prod else 'preview'}"
+
+    def put_many(self, items: dict) -> None:
+        pairs = []
+        for key, value in items.items():
+            try:
+                if b"\x00" in value:
+                    raise UnicodeDecodeError("utf-8", value, 0, 1, "binary payload")
+                pairs.append({"key": key, "value": value.decode("utf-8")})
+            except UnicodeDecodeError:  # binary (e.g. .nlb bundles)
+                pairs.append({"key": key, "value": base64.b64encode(value).decode("ascii"), "base64": True})
+
+        fd, tmp_name = tempfile.mkstemp(prefix="kv_bulk_", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(pairs, f, ensure_ascii=False)
+            cmd = [
+                "npx", "wrangler", "kv", "bulk", "put", tmp_name,
+                "--binding", self.binding,
+                "--remote",
+                "--preview=false" if self.prod else "--preview",
+            ]
+            logger.info("[EXEC] %s", " ".join(cmd))
+            result = subprocess.run(cmd, cwd=str(self.ui_dir), capture_output=True, text=True)
+        except OSError as e:  # npx not installed, ui_dir missing
+            raise KVPublishError(f"cannot run wrangler in {self.ui_dir}: {e}") from e
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+        if result.returncode != 0:
+            raise KVPublishError(
+                f"wrangler kv bulk put failed (exit {result.returncode}): {result.stderr.strip() or result.stdout.strip()}"
+            )
+
+
+def create_backend(
+    kind: str = KV_BACKEND,
+    binding: str = DEFAULT_BINDING,
+    ui_dir: Path = DEFAULT_UI_DIR,
+    prod: bool = False,
+):
+    """Backend for `kind` ("wrangler" or "fs")."""
+    if kind == "fs":
+        return FileSystemKV(KV_FS_DIR / ("prod" if prod else "preview") / binding)
+    if kind == "wrangler":
+        return WranglerKV(binding, ui_dir, prod)
+    raise ValueError(f"Unknown KV_BACKEND: {kind!r} (expected 'wrangler' or 'fs')")
+
+
+def content_hash(value: bytes) -> str:
+    return hashlib.sha256(value).hexdigest()
+
+
+def day_key(day: str) -> str:
+    return f"articles/{day}"
+
+
+def day_payload_path(day: str, data_dir: Path = DATA_DIR, payload_format: str = KV_PAYLOAD_FORMAT) -> Path:
+    """data/daily_summary_<day>_with_audio.json (or .nlb for the bundle format)."""
+    suffix = ".nlb" if payload_format == "bundle" else ".json"
+    return Path(data_dir) / f"daily_summary_{day}_with_audio{suffix}"
+
+
+class KVPublisher:
+    """
+    Upload only the keys whose content changed since the last successful publish.
+
+    The manifest maps backend label -> key -> {sha256, bytes, published_at},
+    so preview and production are tracked separately.
+
+    Args:
+        backend: Object with `put_many(items: dict[str, bytes])` and a `label`.
+        manifest_path (Path): Local manifest file.
+        max_keys (int): Keys per bulk put.
+    """
+
+    def __init__(self, backend, manifest_path: Path = KV_MANIFEST_PATH, max_keys: int = KV_BULK_MAX_KEYS):
+        self.backend = backend
+        self.manifest_path = Path(manifest_path)
+        self.max_keys = max(1, max_keys)
+        self._lock = threading.Lock()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: dict) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.manifest_path.parent, prefix=".kv_manifest.", suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_name, self.manifest_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def changed(self, items: dict) -> dict:
+        """Subset of `items` (key -> bytes) whose hash differs from the manifest."""
+        with self._lock:
+            published = self._load_manifest().get(self.backend.label, {})
+        return {
+            key: value for key, value in items.items()
+            if published.get(key, {}).get("sha256") != content_hash(value)
+        }
+
+    def publish(self, items: dict, force: bool = False) -> dict:
+        """
+        Bulk-put the new or changed entries of `items`.
+
+        Args:
+            items (dict): key -> value bytes.
+            force (bool): Upload every key, even unchanged ones.
+
+        Returns:
+            dict: "uploaded" and "unchanged" key lists.
+
+        Raises:
+            KVPublishError: If a batch failed (batches before it stay recorded).
+        """
+        todo = dict(items) if force else self.changed(items)
+        keys = sorted(todo)
+        for i in range(0, len(keys), self.max_keys):
+            batch = {key: todo[key] for key in keys[i:i + self.max_keys]}
+            self.backend.put_many(batch)
+            self._record(batch)
+
+        return {"uploaded": keys, "unchanged": sorted(set(items) - set(todo))}
+
+    def _record(self, batch: dict) -> None:
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock:
+            manifest = self._load_manifest()
+            published = manifest.setdefault(self.backend.label, {})
+            for key, value in batch.items():
+                published[key] = {"sha256": content_hash(value), "bytes": len(value), "published_at": now}
+            self._save_manifest(manifest)
+
+    def publish_days(
+        self,
+        days: list,
+        data_dir: Path = DATA_DIR,
+        payload_format: str = KV_PAYLOAD_FORMAT,
+        force: bool = False,
+        workers: int = 8,
+    ) -> dict:
+        """
+        Publish `articles/<day>` for each of `days` in one bulk put.
+
+        Payload files are read and hashed in parallel; days without a payload
+        file are reported as "missing".
+
+        Returns:
+            dict: "uploaded", "unchanged" and "missing" key lists.
+        """
+        def load(day: str):
+            path = day_payload_path(day, data_dir, payload_format)
+            try:
+                value = path.read_bytes()
+            except FileNotFoundError:
+                return day, None
+            return day, value or None
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            loaded = list(pool.map(load, days))
+
+        items = {day_key(day): value for day, value in loaded if value is not None}
+        result = self.publish(items, force=force)
+        result["missing"] = [day_key(day) for day, value in loaded if value is None]
+        return result
@@ -1,15 +1,22 @@
 # app/main.py
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Query, Request
-from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
-from app.guardian_client import fetch_guardian_articles
-from app.summary_llm import summarize_article
-import json
+from fastapi.responses import JSONResponse, HTMLResponse, PlainTextResponse
+from app.guardian_client import FIELDS_BODY, FIELDS_TRAIL, AsyncGuardianClient
+from app.summary_llm import summarize_many
+from app.summary_cache import summary_cache
+from app.templating import precompile_templates, render_template
+from app.http_cache import HTTP_CACHE_MOUNT, CachedStaticFiles, PrecompressedStaticFiles, precompressed_store
+from app.resilience import CircuitOpenError, UpstreamError, upstream_stats
+from app.metrics import ROUTE_LATENCY, register_cache, registry
+from app.log import get_logger
+from app.tracing import TRACING_ENABLED, TracingMiddleware
+import math
+import time
 from datetime import date
 from pathlib import Path
-from routes import archive
-from fastapi.staticfiles import StaticFiles
+from routes import archive, debug, search
 
 # Test Data
 sample_summaries = [
@@ -25,30 +32,90 @@ sample_summaries = [
 
 
 
-app = FastAPI()
+logger = get_logger("api")
+
+# One pooled Guardian client shared by every request (keep-alive across requests)
+guardian_client = AsyncGuardianClient()
+
+
+
+def _guardian_cache_counts() -> tuple:
+    stats = guardian_client.cache_stats()
+    return stats.get("hits", 0), stats.get("misses", 0)
+
+
+# Guardian cache hit ratio on /metrics, read from the cache's own counters at scrape time
+register_cache("guardian", _guardian_cache_counts)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile every template before the first request (and fill the bytecode cache)
+    precompile_templates()
+    yield
+    await guardian_client.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    # Time until the response starts; labelled by route template (/archive/{date_str}), not raw path
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    ROUTE_LATENCY.observe(
+        time.perf_counter() - started,
+        route=getattr(route, "path", "unmatched"),
+        method=request.method,
+        status=str(response.status_code),
+    )
+    return response
+
+
+@app.exception_handler(UpstreamError)
+async def upstream_unavailable(request: Request, exc: UpstreamError):
+    # Upstream down (circuit open) or still failing after budgeted retries: fail fast
+    headers = {"Retry-After": str(math.ceil(exc.retry_after))} if isinstance(exc, CircuitOpenError) else {}
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers=headers)
+
 
 app.include_router(archive.router)
+app.include_router(search.router)
+
+# Opt-in span tracing + sampled profiles of slow requests (nothing installed when off)
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+    app.include_router(debug.router)
 
 # serve files under /static -> project-root/output
 # make sure output/ directory exists
 # This will make files saved under output/ available at http://.../static/....
 Path("output").mkdir(parents=True, exist_ok=True)
-app.mount("/static", StaticFiles(directory="output"), name="static")
+# (ETag / Last-Modified / Range from Starlette, plus Cache-Control per day)
+app.mount("/static", CachedStaticFiles(directory="output"), name="static")
+
+# Prebuilt archive pages (/built/<date>/archive.html, daily.html, day.json) straight from
+# disk; in production a file server or CDN serves this tree (docs/deploy/nginx.conf)
+precompressed_store.root.mkdir(parents=True, exist_ok=True)
+app.mount(HTTP_CACHE_MOUNT, PrecompressedStaticFiles(directory=precompressed_store.root), name="built")
 
 
 @app.get("/guardian")
-def get_guardian_news(q: str = Query("technology"), count: int = Query(1)):
-    articles = fetch_guardian_articles(query=q, page_size=count)
+async def get_guardian_news(q: str = Query("technology"), count: int = Query(1)):
+    articles = await guardian_client.fetch_articles(query=q, page_size=count)
     return {"source": "guardian", "articles": articles}
 
 
 @app.get("/summary")
-def summarize_article(q: str = Query("climate"), count: int = Query(1)):
-    articles = fetch_guardian_articles(query=q, page_size=count)
-    summaries = []
+async def get_summaries(q: str = Query("climate"), count: int = Query(1)):
+    # only trailText is summarized here
+    articles = await guardian_client.fetch_articles(query=q, page_size=count, fields=FIELDS_TRAIL)
+    results = await summarize_many([article["content"] for article in articles])
 
-    for article in articles:
-        summary = summarize_article(article["content"])
+    summaries = []
+    for article, summary in zip(articles, results):
         summaries.append({
             "title": article["title"],
             "url": article["url"],
@@ -58,18 +125,34 @@ def summarize_article(q: str = Query("climate"), count: int = Query(1)):
     return {"source": "guardian", "summaries": summaries}
 
 
+@app.get("/cache/stats")
+def get_cache_stats():
+    return {
+        "guardian": guardian_client.cache_stats(),
+        "guardian_planner": guardian_client.planner_stats(),
+        "summary": summary_cache.stats(),
+    }
+
+
+@app.get("/upstreams/stats")
+def get_upstream_stats():
+    # rate limiter / AIMD / circuit breaker / retry budget state per upstream
+    return upstream_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/sample_summaries")
 def get_sample_summaries():
     return JSONResponse(content={"summaries": sample_summaries})
 
-templates = Jinja2Templates(directory="app/templates")
-
-templates.env.auto_reload = True
-templates.env.cache = {} # disable template caching for development
-
 
 @app.get("/", response_class=HTMLResponse)
-def search_ui(
+async def search_ui(
     request: Request,
     q: str = "technology",
     count: int = Query(3, ge=1, le=30),  # max 30 and min 1
@@ -77,18 +160,25 @@ def search_ui(
     content_type: str = Query("body", pattern="^(body|trail)$")
 ):
 
-    print(f"DEBUG: q={q}, count={count}, page={page}")
-    articles = fetch_guardian_articles(query=q, page_size=count, page=page)
+    logger.debug("search_ui q=%s count=%s page=%s", q, count, page)
+    # request only the field this view renders (bodyText is by far the largest)
+    fields = FIELDS_BODY if content_type == "body" else FIELDS_TRAIL
+    articles = await guardian_client.fetch_articles(query=q, page_size=count, page=page, fields=fields)
 
     # contentの種類を切り替え
-    for article in articles:
-        article["content"] = (
-            article["fields"].get("bodyText", "") if content_type == "body"
-            else article["fields"].get("trailText", "")
-        )
-
-    return templates.TemplateResponse("index.html", {
-        "request": request,
+    # (copy each article: the list may be shared through the Guardian response cache)
+    articles = [
+        {
+            **article,
+            "content": (
+                article["fields"].get("bodyText", "") if content_type == "body"
+                else article["fields"].get("trailText", "")
+            ),
+        }
+        for article in articles
+    ]
+
+    return render_template(request, "index.html", {
         "articles": articles,
         "query": q,
         "count": count,
@@ -100,23 +190,13 @@ def search_ui(
 @app.get("/daily", response_class=HTMLResponse)
 def daily_summary_page(request: Request):
     today_str = date.today().isoformat()
-    data_file = Path(f"data/daily_summary_{today_str}.json")
+    # Precompressed page (already sorted by topic), revalidated with its ETag
+    response = precompressed_store.respond(request, today_str, "daily.html")
 
-    if not data_file.exists():
-        return templates.TemplateResponse("daily.html", {
-            "request": request,
+    if response is None:
+        return render_template(request, "daily.html", {
             "summaries": [],
             "error": "No summary data found for today."
         })
 
-    with open(data_file, "r", encoding="utf-8") as f:
-        summaries = json.load(f)
-
-    # sort by topic
-    summaries = sorted(summaries, key=lambda x: x.get("topic", ""))
-
-    return templates.TemplateResponse("daily.html", {
-        "request": request,
-        "summaries": summaries,
-        "error": None
-    })
\ No newline at end of file
+    return response
@@ -0,0 +1,336 @@
+# app/metrics.py
+"""
+In-process metrics (counters, gauges, histograms) in the Prometheus text format.
+
+Served by GET /metrics and summarized at the end of each daily job run.
+Recording is a dict lookup plus a few additions under a lock, so it is cheap
+enough for the hot path; METRICS_ENABLED=false turns recording off entirely.
+"""
+
+import math
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Optional
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.label_names)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: tuple, value) -> list:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram; each label set keeps bucket counts, sum, count
+    and the min / max seen (so summary quantiles never leave the observed range).
+
+    Args:
+        name (str): Metric name.
+        documentation (str): HELP text.
+        labels (tuple[str]): Label names.
+        buckets (tuple[float]): Upper bounds (ascending; +Inf is implied).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, value, value]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            series[1] += value
+            series[2] += 1
+            series[3] = min(series[3], value)
+            series[4] = max(series[4], value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration (seconds) of the `with` block."""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - started, **labels)
+
+    def _render_sample(self, key: tuple, series) -> list:
+        counts, total, count = series[:3]
+        lines, cumulative = [], 0
+        for bound, n in zip((*self.buckets, math.inf), counts):
+            cumulative += n
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def summary(self) -> dict:
+        """
+        Per label set: count, mean and bucket-interpolated p50 / p95 / p99.
+
+        Returns:
+            dict: label values (joined with ",") -> stats.
+        """
+        with self._lock:
+            items = [(key, ([*s[0]], *s[1:])) for key, s in self._values.items()]
+
+        result = {}
+        for key, (counts, total, count, low, high) in sorted(items):
+            result[",".join(map(str, key)) or "all"] = {
+                "count": count,
+                "mean": total / count if count else 0.0,
+                **{
+                    name: min(high, max(low, self._quantile(counts, count, q)))
+                    for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+                },
+            }
+        return result
+
+    def _quantile(self, counts: list, count: int, q: float) -> float:
+        # Linear interpolation inside the bucket holding the q-th observation
+        rank, cumulative, lower = q * count, 0, 0.0
+        for bound, n in zip((*self.buckets, math.inf), counts):
+            if n and cumulative + n >= rank:
+                return math.inf if bound == math.inf else lower + (bound - lower) * (rank - cumulative) / n
+            cumulative += n
+            lower = bound
+        return lower
+
+
+class Registry:
+    """
+    Named metrics plus collectors that read existing stats() at scrape time
+    (so caches that already count hits do not need a second counter).
+    """
+
+    def __init__(self):
+        self._metrics: dict = {}
+        self._collectors: list = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labels: tuple, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labels, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: tuple = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labels)
+
+    def gauge(self, name: str, documentation: str, labels: tuple = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labels)
+
+    def histogram(
+        self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labels, buckets=buckets)
+
+    def add_collector(self, collect: Callable[[], None]) -> None:
+        """`collect()` runs before every render and updates gauges from live stats."""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def collect(self) -> None:
+        for collect in list(self._collectors):
+            try:
+                collect()
+            except Exception:  # a broken collector must not break /metrics
+                pass
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        self.collect()
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def histograms(self) -> list:
+        with self._lock:
+            return sorted((m for m in self._metrics.values() if isinstance(m, Histogram)), key=lambda m: m.name)
+
+    def clear(self) -> None:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+# Process-wide registry served by /metrics
+registry = Registry()
+
+UPSTREAM_LATENCY = registry.histogram(
+    "newslite_upstream_request_seconds",
+    "Latency of each attempt against an upstream (guardian, openai, polly).",
+    ("upstream", "outcome"),
+)
+ROUTE_LATENCY = registry.histogram(
+    "newslite_http_request_seconds",
+    "Time until the response headers are sent, per route template.",
+    ("route", "method", "status"),
+)
+CACHE_HIT_RATIO = registry.gauge(
+    "newslite_cache_hit_ratio", "Hits / (hits + misses) since start-up.", ("cache",)
+)
+CACHE_REQUESTS = registry.gauge(
+    "newslite_cache_requests", "Cache lookups since start-up.", ("cache", "result")
+)
+GUARDIAN_FILTERED = registry.histogram(
+    "newslite_guardian_articles_filtered",
+    "Guardian results rejected (live blogs, quizzes, duplicates) per page.",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50),
+)
+POLLY_CHARS_PER_SEC = registry.histogram(
+    "newslite_polly_characters_per_second",
+    "SSML characters synthesized per second of SynthesizeSpeech (request + audio download).",
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+OPENAI_TOKENS = registry.histogram(
+    "newslite_openai_tokens",
+    "Tokens per OpenAI request (response.usage).",
+    ("kind",),
+    buckets=(50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000),
+)
+PIPELINE_STAGE = registry.histogram(
+    "newslite_pipeline_stage_seconds", "Wall time of each daily job stage.", ("stage", "status")
+)
+HTTP_CACHE_RESPONSES = registry.counter(
+    "newslite_http_cache_responses_total",
+    "Precompressed responses by result (served, not_modified, built).",
+    ("result",),
+)
+
+
+def register_cache(name: str, hits_and_misses: Callable[[], tuple]) -> None:
+    """
+    Export a cache's hit ratio and lookups on /metrics.
+
+    Args:
+        name (str): Cache label (e.g. "guardian", "summary").
+        hits_and_misses (Callable): Returns (hits, misses) from the cache's own counters.
+    """
+    def collect() -> None:
+        hits, misses = hits_and_misses()
+        total = hits + misses
+        CACHE_REQUESTS.set(hits, cache=name, result="hit")
+        CACHE_REQUESTS.set(misses, cache=name, result="miss")
+        CACHE_HIT_RATIO.set(hits / total if total else 0.0, cache=name)
+
+    registry.add_collector(collect)
+
+
+def run_summary(unit_overrides: Optional[dict] = None) -> str:
+    """
+    Human-readable summary of every histogram with observations (for the daily job).
+
+    Returns:
+        str: One line per metric and label set: count, mean, p50, p95, p99.
+    """
+    units = {"_seconds": "s", **(unit_overrides or {})}
+    lines = []
+    for histogram in registry.histograms():
+        unit = next((u for suffix, u in units.items() if histogram.name.endswith(suffix)), "")
+        for labels, s in histogram.summary().items():
+            if not s["count"]:
+                continue
+            lines.append(
+                f"{histogram.name}{{{labels}}}: n={s['count']} mean={s['mean']:.3g}{unit} "
+                f"p50={s['p50']:.3g}{unit} p95={s['p95']:.3g}{unit} p99={s['p99']:.3g}{unit}"
+            )
+    registry.collect()
+    for (cache,), ratio in sorted(CACHE_HIT_RATIO._values.items()):
+        lines.append(f"{CACHE_HIT_RATIO.name}{{{cache}}}: {ratio:.1%}")
+    return "\n".join(lines)
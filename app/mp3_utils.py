@@ -0,0 +1,237 @@
+# app/mp3_utils.py
+
+import os
+import tempfile
+from pathlib import Path
+
+# Chunk size for streaming copies between files
+COPY_CHUNK_SIZE = 64 * 1024
+
+ID3V2_HEADER_SIZE = 10
+ID3V1_TAG_SIZE = 128
+
+
+def id3v2_tag_size(header: bytes) -> int:
+    """
+    Return the total size of an ID3v2 tag (header + body + footer) starting at `header`,
+    or 0 if `header` does not start with an ID3v2 tag.
+
+    The tag size is stored as a 28-bit "syncsafe" integer (7 bits per byte).
+    """
+    if len(header) < ID3V2_HEADER_SIZE or header[:3] != b"ID3":
+        return 0
+    size = 0
+    for b in header[6:10]:
+        size = (size << 7) | (b & 0x7F)
+    has_footer = bool(header[5] & 0x10)
+    return ID3V2_HEADER_SIZE + size + (ID3V2_HEADER_SIZE if has_footer else 0)
+
+
+def audio_payload_span(path: Path) -> tuple:
+    """
+    Locate the MPEG audio frames inside an MP3 file, excluding ID3 tags.
+
+    Returns:
+        tuple[int, int]: (start offset, length in bytes) of the audio payload.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        start = 0
+        # Tags may be stacked; skip every leading ID3v2 tag
+        while True:
+            f.seek(start)
+            skip = id3v2_tag_size(f.read(ID3V2_HEADER_SIZE))
+            if not skip:
+                break
+            start += skip
+
+        end = file_size
+        if end - start >= ID3V1_TAG_SIZE:
+            f.seek(end - ID3V1_TAG_SIZE)
+            if f.read(3) == b"TAG":
+                end -= ID3V1_TAG_SIZE
+
+    start = min(start, file_size)
+    return start, max(0, end - start)
+
+
+def concat_mp3_files(parts: list, output_path: Path) -> None:
+    """
+    Stitch MP3 files into one, in order, dropping each part's ID3 tags and
+    Xing/Info/VBRI header frame (see `scan_mp3`).
+
+    MP3 frames are self-contained, so concatenating the audio frames yields a
+    playable file; a part's VBR header left in the middle would make players
+    report the first part's duration. The result is written to a temporary file
+    and renamed into place.
+    """
+    output_path = Path(output_path)
+    fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for part in parts:
+                span = scan_mp3(part)
+                with open(part, "rb") as src:
+                    copy_file_span(src.fileno(), out.fileno(), span["start"], span["length"])
+        os.replace(tmp_name, output_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+# ────────────────────────────────────────────────────────────────
+# MPEG audio frame parsing (used for durations and Xing/Info detection)
+# ────────────────────────────────────────────────────────────────
+
+# Bitrates (kbps) for Layer III, indexed by the 4-bit bitrate field
+_BITRATES_V1_L3 = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0]
+_BITRATES_V2_L3 = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0]
+
+# Sample rates indexed by [version bits][rate bits]; version 0b01 is reserved
+_SAMPLE_RATES = {
+    0b11: [44100, 48000, 32000],  # MPEG-1
+    0b10: [22050, 24000, 16000],  # MPEG-2
+    0b00: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+
+def parse_frame_header(header: bytes):
+    """
+    Parse a 4-byte MPEG Layer III frame header.
+
+    Returns:
+        dict | None: frame_length, samples, sample_rate and side_info_size,
+        or None if `header` is not a valid Layer III frame header.
+    """
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = (header[2] >> 4) & 0x0F
+    rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    mono = ((header[3] >> 6) & 0x03) == 0x03
+
+    if version == 0b01 or layer != 0b01 or rate_index == 3:
+        return None
+
+    is_v1 = version == 0b11
+    bitrate = (_BITRATES_V1_L3 if is_v1 else _BITRATES_V2_L3)[bitrate_index] * 1000
+    if not bitrate:
+        return None
+
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    samples = 1152 if is_v1 else 576
+    frame_length = (samples // 8) * bitrate // sample_rate + padding
+
+    if is_v1:
+        side_info_size = 17 if mono else 32
+    else:
+        side_info_size = 9 if mono else 17
+
+    return {
+        "frame_length": frame_length,
+        "samples": samples,
+        "sample_rate": sample_rate,
+        "side_info_size": side_info_size,
+    }
+
+
+def _is_vbr_info_frame(frame: bytes, info: dict) -> bool:
+    """True for a Xing/Info (LAME) or VBRI header frame, which carries no audio."""
+    offset = 4 + info["side_info_size"]
+    return frame[offset:offset + 4] in (b"Xing", b"Info") or frame[36:40] == b"VBRI"
+
+
+def scan_mp3(path: Path) -> dict:
+    """
+    Walk the MPEG frames of an MP3 file without loading it into memory.
+
+    ID3v2/ID3v1 tags and a leading Xing/Info/VBRI frame are excluded from the
+    reported audio span, so spans from several files can be concatenated into
+    one stream with a single header.
+
+    Returns:
+        dict: start (byte offset of first audio frame), length (bytes of audio),
+        duration_sec and frames.
+    """
+    start, length = audio_payload_span(path)
+    end = start + length
+    frames = 0
+    duration = 0.0
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        first = f.read(4)
+        first_info = parse_frame_header(first)
+        if first_info is not None:
+            f.seek(start)
+            frame = f.read(first_info["frame_length"])
+            if _is_vbr_info_frame(frame, first_info):
+                start += first_info["frame_length"]
+
+        pos = start
+        while pos + 4 <= end:
+            f.seek(pos)
+            info = parse_frame_header(f.read(4))
+            if info is None or info["frame_length"] <= 0:
+                break
+            frames += 1
+            duration += info["samples"] / info["sample_rate"]
+            pos += info["frame_length"]
+
+    return {
+        "start": start,
+        "length": max(0, end - start),
+        "duration_sec": round(duration, 3),
+        "frames": frames,
+    }
+
+
+def _syncsafe(n: int) -> bytes:
+    return bytes([(n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F])
+
+
+def build_id3v2_header(title: str) -> bytes:
+    """Build a minimal ID3v2.4 tag carrying a UTF-8 title (TIT2) frame."""
+    text = b"\x03" + title.encode("utf-8")  # 0x03 = UTF-8 text encoding
+    frame = b"TIT2" + _syncsafe(len(text)) + b"\x00\x00" + text
+    return b"ID3\x04\x00\x00" + _syncsafe(len(frame)) + frame
+
+
+def copy_file_span(src_fd: int, dst_fd: int, offset: int, length: int) -> None:
+    """
+    Append `length` bytes at `offset` of `src_fd` to `dst_fd`'s current position.
+
+    Uses in-kernel copies (copy_file_range, then sendfile) where the platform
+    supports them, falling back to a chunked read/write loop.
+    """
+    remaining = length
+    if hasattr(os, "copy_file_range"):
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, remaining, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                remaining -= copied
+        except OSError:
+            pass  # e.g. cross-filesystem on older kernels; try the next strategy
+    if remaining > 0 and hasattr(os, "sendfile"):
+        try:
+            while remaining > 0:
+                sent = os.sendfile(dst_fd, src_fd, offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+        except OSError:
+            pass
+    while remaining > 0:
+        chunk = os.pread(src_fd, min(COPY_CHUNK_SIZE, remaining), offset)
+        if not chunk:
+            break
+        os.write(dst_fd, chunk)
+        offset += len(chunk)
+        remaining -= len(chunk)
@@ -0,0 +1,159 @@
+# app/pipeline.py
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from app.metrics import PIPELINE_STAGE
+
+PIPELINE_DIR = Path(os.getenv("PIPELINE_DIR", "data/pipeline"))
+
+
+def write_json_atomic(path: Path, data, indent: Optional[int] = 2) -> None:
+    """Write JSON to a temporary file next to `path` and rename it into place."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def read_json(path: Path, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+class Checkpoints:
+    """
+    On-disk checkpoints for one pipeline run (e.g. one day), under PIPELINE_DIR/<run_id>/.
+
+    - `state.json` records the status of every stage.
+    - Stages store per-item results with `save()` / `load()` (e.g. "summaries/03").
+    """
+
+    def __init__(self, run_id: str, root: Path = PIPELINE_DIR):
+        self.run_id = run_id
+        self.dir = Path(root) / run_id
+        self._state_path = self.dir / "state.json"
+        self.state = read_json(self._state_path, {}) or {}
+
+    def exists(self) -> bool:
+        return self._state_path.exists()
+
+    def clear(self) -> None:
+        for path in sorted(self.dir.rglob("*"), reverse=True):
+            if path.is_dir():
+                path.rmdir()
+            else:
+                path.unlink()
+        self.state = {}
+
+    def item_path(self, name: str) -> Path:
+        return self.dir / f"{name}.json"
+
+    def has(self, name: str) -> bool:
+        return self.item_path(name).exists()
+
+    def load(self, name: str, default=None):
+        return read_json(self.item_path(name), default)
+
+    def save(self, name: str, data) -> None:
+        write_json_atomic(self.item_path(name), data)
+
+    def stage_status(self, stage: str) -> Optional[str]:
+        return self.state.get(stage, {}).get("status")
+
+    def set_stage(self, stage: str, status: str, **extra) -> None:
+        self.state[stage] = {"status": status, "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), **extra}
+        write_json_atomic(self._state_path, self.state)
+
+    def is_complete(self, stage_names) -> bool:
+        return all(self.stage_status(name) == "done" for name in stage_names)
+
+
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    `run(ctx)` is awaited once all `deps` have succeeded. It returns the number of
+    items that failed (0 = "done", > 0 = "partial"); raising marks the stage
+    "failed" and skips everything downstream. Stages must skip items that already
+    have checkpoints so `--resume` only redoes missing or failed work.
+
+    Args:
+        name (str): Stage name (also the key in state.json).
+        run (Callable): `async def run(ctx) -> int`.
+        deps (tuple[str]): Names of stages that must succeed first.
+    """
+
+    def __init__(self, name: str, run: Callable[..., Awaitable[int]], deps: tuple = ()):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+
+
+async def run_dag(stages: list, ctx, checkpoints: Checkpoints, log=print) -> dict:
+    """
+    Run `stages` as a DAG: every stage starts as soon as its dependencies succeed,
+    so independent stages run concurrently.
+
+    Returns:
+        dict: stage name -> final status ("done", "partial", "failed" or "skipped").
+    """
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        missing = set(stage.deps) - names
+        if missing:
+            raise ValueError(f"Stage {stage.name!r} depends on unknown stages: {sorted(missing)}")
+
+    tasks: dict = {}
+    statuses: dict = {}
+
+    async def run_stage(stage: Stage) -> bool:
+        dep_results = await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+        if not all(dep_results):
+            statuses[stage.name] = "skipped"
+            checkpoints.set_stage(stage.name, "skipped")
+            log(f"⏭️  [{checkpoints.run_id}] {stage.name}: skipped (upstream failed)")
+            return False
+
+        started = time.monotonic()
+        log(f"▶️  [{checkpoints.run_id}] {stage.name}")
+        try:
+            failed_items = await stage.run(ctx)
+        except Exception as e:
+            statuses[stage.name] = "failed"
+            PIPELINE_STAGE.observe(time.monotonic() - started, stage=stage.name, status="failed")
+            checkpoints.set_stage(stage.name, "failed", error=repr(e))
+            log(f"❌ [{checkpoints.run_id}] {stage.name}: {e!r}")
+            return False
+
+        status = "partial" if failed_items else "done"
+        elapsed = round(time.monotonic() - started, 3)
+        statuses[stage.name] = status
+        PIPELINE_STAGE.observe(elapsed, stage=stage.name, status=status)
+        checkpoints.set_stage(stage.name, status, failed_items=failed_items or 0, elapsed_sec=elapsed)
+        log(f"✅ [{checkpoints.run_id}] {stage.name}: {status} in {elapsed}s")
+        return True
+
+    # Stages are created in list order, so dependencies must be listed first
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in tasks:
+                raise ValueError(f"Stage {stage.name!r} is listed before its dependency {dep!r}")
+        tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+    await asyncio.gather(*tasks.values())
+    return statuses
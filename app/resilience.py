@@ -0,0 +1,564 @@
+# app/resilience.py
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from app.log import get_logger
+from app.metrics import UPSTREAM_LATENCY
+from app.tracing import span
+
+logger = get_logger("resilience")
+
+# Every upstream (guardian, openai, polly) reads its settings from
+# <NAME>_RATE_PER_SEC, <NAME>_BURST, <NAME>_MIN_CONCURRENCY, <NAME>_MAX_CONCURRENCY,
+# <NAME>_TARGET_LATENCY_SEC, <NAME>_BREAKER_FAILURES, <NAME>_BREAKER_RESET_SEC,
+# <NAME>_RETRY_RATIO, <NAME>_MAX_RETRIES and <NAME>_BACKOFF_BASE_SEC.
+UPSTREAM_DEFAULTS = {
+    "guardian": {
+        "rate_per_sec": 10.0,
+        "min_concurrency": 2,
+        "max_concurrency": int(os.getenv("GUARDIAN_MAX_CONNECTIONS", "20")),
+        "target_latency_sec": 2.0,
+        "max_retries": 2,
+        "backoff_base_sec": 0.5,
+    },
+    "openai": {
+        "rate_per_sec": 5.0,
+        "min_concurrency": 1,
+        "max_concurrency": int(os.getenv("OPENAI_CONCURRENCY", "5")),
+        "target_latency_sec": 20.0,
+        "max_retries": 3,
+        "backoff_base_sec": 1.0,
+    },
+    "polly": {
+        # Polly's default SynthesizeSpeech quota is 8 TPS
+        "rate_per_sec": float(os.getenv("POLLY_MAX_TPS", "8")),
+        "min_concurrency": 1,
+        "max_concurrency": int(os.getenv("POLLY_MAX_CONCURRENCY", "4")),
+        "target_latency_sec": 10.0,
+        "max_retries": 2,
+        "backoff_base_sec": 0.5,
+    },
+}
+
+# Shared by all upstreams unless overridden per name
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET_SEC = 30.0
+DEFAULT_RETRY_RATIO = 0.2
+
+# HTTP statuses / AWS error codes that mean "slow down"
+_OVERLOAD_STATUSES = {429, 503}
+_THROTTLING_CODES = {"Throttling", "ThrottlingException", "TooManyRequestsException", "RequestLimitExceeded"}
+
+
+class UpstreamError(Exception):
+    """Base class for errors raised by the resilience layer itself."""
+
+
+class CircuitOpenError(UpstreamError):
+    """Raised without calling the upstream while its circuit breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open (retry in {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class RetryableStatusError(UpstreamError):
+    """Raised by call sites for a response status worth retrying (e.g. 429 / 5xx)."""
+
+    def __init__(self, name: str, status_code: int):
+        super().__init__(f"{name} returned HTTP {status_code}")
+        self.status_code = status_code
+
+
+class UpstreamConnectionError(UpstreamError):
+    """Raised by call sites for a transport failure (connect / read error, timeout); retried as transient."""
+
+    def __init__(self, name: str, error: Exception):
+        super().__init__(f"{name} is unreachable: {error!r}")
+        self.name = name
+
+
+def status_of(error: Exception) -> Optional[int]:
+    """Best-effort HTTP status of an exception from httpx, openai or botocore."""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return status
+    if isinstance(response, dict):  # botocore ClientError
+        return response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return None
+
+
+def is_overload(error: Exception) -> bool:
+    """True for "slow down" signals: 429/503, AWS throttling codes and timeouts."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    if status_of(error) in _OVERLOAD_STATUSES:
+        return True
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code") in _THROTTLING_CODES
+    return False
+
+
+def is_transient(error: Exception) -> bool:
+    """Default retry predicate: timeouts, connection errors, throttling and 5xx."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError, UpstreamConnectionError)):
+        return True
+    if is_overload(error):
+        return True
+    status = status_of(error)
+    return status is not None and status >= 500
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket usable from threads and coroutines.
+
+    `acquire()` reserves a token (the balance may go negative) and returns how
+    long the caller has to wait for it, so waiting happens outside the lock and
+    callers are served in arrival order.
+
+    Args:
+        rate (float): Tokens added per second (<= 0 disables limiting).
+        burst (float): Bucket capacity.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit shared by threads and coroutines.
+
+    Each success under `target_latency` raises the limit by 1/limit (about +1
+    per limit's worth of calls); an overload signal (429, throttling, timeout)
+    or a call slower than `target_latency` halves it, at most once per
+    `target_latency` so one burst of failures counts as one signal.
+
+    Args:
+        min_limit (int): Lower bound of the limit.
+        max_limit (int): Upper bound (and starting value) of the limit.
+        target_latency (float): Latency above which the limit is decreased.
+        backoff (float): Multiplicative decrease factor.
+    """
+
+    def __init__(self, min_limit: int, max_limit: int, target_latency: float, backoff: float = 0.5):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.limit = float(self.max_limit)
+        self.inflight = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._async_waiters: deque = deque()
+
+    def _try_acquire_locked(self) -> bool:
+        if self.inflight < int(self.limit):
+            self.inflight += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._cond:
+            while not self._try_acquire_locked():
+                self._cond.wait()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._try_acquire_locked():
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False) -> None:
+        """Free a slot and adjust the limit (`latency` is None for calls that did not complete)."""
+        with self._cond:
+            self.inflight -= 1
+            now = time.monotonic()
+            slow = latency is not None and latency > self.target_latency
+            if overloaded or slow:
+                if now - self._last_decrease >= self.target_latency:
+                    self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                    self._last_decrease = now
+            elif latency is not None:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+            # Wake every waiter; each re-checks the limit under the lock
+            self._cond.notify_all()
+            waiters = list(self._async_waiters)
+            self._async_waiters.clear()
+
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream is down.
+
+    closed → open after `failure_threshold` consecutive transient failures;
+    open → half-open after `reset_timeout` seconds, letting one probe call
+    through; the probe's outcome closes or re-opens the circuit.
+
+    Args:
+        name (str): Upstream name (used in errors).
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds to stay open before probing.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError while open; returns True if this call is the half-open probe."""
+        with self._lock:
+            if self.state == "closed":
+                return False
+            elapsed = time.monotonic() - self._opened_at
+            if self.state == "open" and elapsed >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            raise CircuitOpenError(self.name, max(0.0, self.reset_timeout - elapsed))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def record_neutral(self) -> None:
+        # A non-transient error (e.g. HTTP 400) says nothing about upstream health
+        with self._lock:
+            self._probing = False
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of traffic so they cannot amplify an outage.
+
+    Every first attempt deposits `ratio` tokens; every retry withdraws one.
+    `min_per_sec` tokens per second are always available so low-traffic
+    callers can still retry occasionally.
+
+    Args:
+        ratio (float): Retries allowed per request (0.2 = at most +20% load).
+        min_per_sec (float): Retry tokens refilled per second regardless of traffic.
+        max_tokens (float): Cap on saved-up retry tokens.
+    """
+
+    def __init__(self, ratio: float, min_per_sec: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def _refill_locked(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._updated) * self.min_per_sec)
+        self._updated = now
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill_locked()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            self._refill_locked()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.exhausted += 1
+            return False
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill_locked()
+            return self._tokens
+
+
+class Upstream:
+    """
+    Resilience policy for one upstream service, shared by every caller.
+
+    A call waits for a rate-limit token and an AIMD concurrency slot, fails fast
+    while the circuit breaker is open, and retries transient errors with
+    full-jitter exponential backoff as long as the retry budget allows.
+
+    Args:
+        name (str): Upstream name ("guardian", "openai", "polly").
+        rate_per_sec (float): Token-bucket rate (<= 0 disables rate limiting).
+        burst (float | None): Token-bucket capacity (default: rate_per_sec).
+        min_concurrency (int): AIMD lower bound.
+        max_concurrency (int): AIMD upper bound.
+        target_latency_sec (float): Latency above which concurrency is reduced.
+        breaker_failures (int): Consecutive failures that open the circuit.
+        breaker_reset_sec (float): Seconds the circuit stays open before a probe.
+        retry_ratio (float): Retry budget as a fraction of requests.
+        max_retries (int): Retries per call (on top of the first attempt).
+        backoff_base_sec (float): Base delay of the exponential backoff.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_sec: float = 10.0,
+        burst: Optional[float] = None,
+        min_concurrency: int = 1,
+        max_concurrency: int = 10,
+        target_latency_sec: float = 5.0,
+        breaker_failures: int = DEFAULT_BREAKER_FAILURES,
+        breaker_reset_sec: float = DEFAULT_BREAKER_RESET_SEC,
+        retry_ratio: float = DEFAULT_RETRY_RATIO,
+        max_retries: int = 2,
+        backoff_base_sec: float = 0.5,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.concurrency = AdaptiveConcurrency(min_concurrency, max_concurrency, target_latency_sec)
+        self.breaker = CircuitBreaker(name, breaker_failures, breaker_reset_sec)
+        self.budget = RetryBudget(retry_ratio)
+        self.max_retries = max_retries
+        self.backoff_base_sec = backoff_base_sec
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff_base_sec * (2 ** attempt))
+
+    def _on_error(self, error: Exception, latency: float, retryable: Callable[[Exception], bool]) -> bool:
+        """Record a failed attempt; returns True if it should be retried."""
+        transient = retryable(error)
+        self.concurrency.release(latency if transient else None, overloaded=is_overload(error))
+        if not transient:
+            self.breaker.record_neutral()
+            return False
+        self.failures += 1
+        self.breaker.record_failure()
+        return True
+
+    def _should_retry(self, attempt: int, error: Exception) -> bool:
+        if attempt >= self.max_retries or isinstance(error, CircuitOpenError):
+            return False
+        if not self.budget.try_withdraw():
+            logger.warning("⚠️ %s: retry budget exhausted, not retrying %r", self.name, error)
+            return False
+        self.retries += 1
+        return True
+
+    def _acquire(self) -> None:
+        """Pass the breaker, then wait for a rate-limit token and a concurrency slot."""
+        probe = self.breaker.before_call()
+        try:
+            with span(f"upstream.{self.name}.wait"):
+                self.bucket.acquire()
+                self.concurrency.acquire()
+        except BaseException:
+            # Interrupted before a slot was taken: give back a claimed half-open probe
+            if probe:
+                self.breaker.record_neutral()
+            raise
+
+    async def _acquire_async(self) -> None:
+        probe = self.breaker.before_call()
+        try:
+            with span(f"upstream.{self.name}.wait"):
+                await self.bucket.acquire_async()
+                # Returns right after taking the slot, so a cancellation never leaks one
+                await self.concurrency.acquire_async()
+        except BaseException:
+            # Cancelled while waiting (e.g. a speculative Guardian page): release the probe
+            if probe:
+                self.breaker.record_neutral()
+            raise
+
+    def call(self, fn: Callable, retryable: Callable[[Exception], bool] = is_transient):
+        """Call `fn()` under this upstream's policy (blocking; for worker threads)."""
+        self.calls += 1
+        self.budget.deposit()
+        with span(f"upstream.{self.name}") as call_span:
+            attempt = 0
+            while True:
+                self._acquire()
+                call_span.set(attempts=attempt + 1)
+                started = time.monotonic()
+                try:
+                    result = fn()
+                except Exception as e:
+                    UPSTREAM_LATENCY.observe(time.monotonic() - started, upstream=self.name, outcome="error")
+                    if not self._on_error(e, time.monotonic() - started, retryable) or not self._should_retry(attempt, e):
+                        raise
+                    delay = self._backoff(attempt)
+                    logger.info("🔁 %s retry %d/%d in %.2fs: %r", self.name, attempt + 1, self.max_retries, delay, e)
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                except BaseException:
+                    self.concurrency.release()
+                    self.breaker.record_neutral()
+                    raise
+                latency = time.monotonic() - started
+                UPSTREAM_LATENCY.observe(latency, upstream=self.name, outcome="ok")
+                self.concurrency.release(latency)
+                self.breaker.record_success()
+                return result
+
+    async def call_async(
+        self,
+        factory: Callable[[], Awaitable],
+        retryable: Callable[[Exception], bool] = is_transient,
+        timeout: Optional[float] = None,
+    ):
+        """Await `factory()` under this upstream's policy; each attempt is bounded by `timeout`."""
+        self.calls += 1
+        self.budget.deposit()
+        with span(f"upstream.{self.name}") as call_span:
+            attempt = 0
+            while True:
+                await self._acquire_async()
+                call_span.set(attempts=attempt + 1)
+                started = time.monotonic()
+                try:
+                    result = await (asyncio.wait_for(factory(), timeout) if timeout else factory())
+                except Exception as e:
+                    UPSTREAM_LATENCY.observe(time.monotonic() - started, upstream=self.name, outcome="error")
+                    if not self._on_error(e, time.monotonic() - started, retryable) or not self._should_retry(attempt, e):
+                        raise
+                    delay = self._backoff(attempt)
+                    logger.info("🔁 %s retry %d/%d in %.2fs: %r", self.name, attempt + 1, self.max_retries, delay, e)
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                except BaseException:
+                    # Cancelled: free the slot without judging the upstream
+                    self.concurrency.release()
+                    self.breaker.record_neutral()
+                    raise
+                latency = time.monotonic() - started
+                UPSTREAM_LATENCY.observe(latency, upstream=self.name, outcome="ok")
+                self.concurrency.release(latency)
+                self.breaker.record_success()
+                return result
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "concurrency_limit": int(self.concurrency.limit),
+            "inflight": self.concurrency.inflight,
+            "circuit": self.breaker.state,
+            "circuit_rejected": self.breaker.rejected,
+            "retry_tokens": round(self.budget.tokens, 2),
+            "retry_budget_exhausted": self.budget.exhausted,
+        }
+
+
+def _setting(name: str, key: str, default, cast):
+    value = os.getenv(f"{name.upper()}_{key}")
+    return cast(value) if value is not None else default
+
+
+def _build_upstream(name: str) -> Upstream:
+    defaults = UPSTREAM_DEFAULTS.get(name, {})
+    rate = _setting(name, "RATE_PER_SEC", defaults.get("rate_per_sec", 10.0), float)
+    return Upstream(
+        name,
+        rate_per_sec=rate,
+        burst=_setting(name, "BURST", rate, float),
+        min_concurrency=_setting(name, "MIN_CONCURRENCY", defaults.get("min_concurrency", 1), int),
+        max_concurrency=_setting(name, "MAX_CONCURRENCY", defaults.get("max_concurrency", 10), int),
+        target_latency_sec=_setting(name, "TARGET_LATENCY_SEC", defaults.get("target_latency_sec", 5.0), float),
+        breaker_failures=_setting(name, "BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES, int),
+        breaker_reset_sec=_setting(name, "BREAKER_RESET_SEC", DEFAULT_BREAKER_RESET_SEC, float),
+        retry_ratio=_setting(name, "RETRY_RATIO", DEFAULT_RETRY_RATIO, float),
+        max_retries=_setting(name, "MAX_RETRIES", defaults.get("max_retries", 2), int),
+        backoff_base_sec=_setting(name, "BACKOFF_BASE_SEC", defaults.get("backoff_base_sec", 0.5), float),
+    )
+
+
+_upstreams: dict = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name: str) -> Upstream:
+    """Return the process-wide Upstream for `name` (created from env settings on first use)."""
+    with _upstreams_lock:
+        if name not in _upstreams:
+            _upstreams[name] = _build_upstream(name)
+        return _upstreams[name]
+
+
+def upstream_stats() -> dict:
+    with _upstreams_lock:
+        return {name: upstream.stats() for name, upstream in _upstreams.items()}
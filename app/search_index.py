@@ -0,0 +1,216 @@
+# app/search_index.py
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+SEARCH_DATA_DIR = Path(os.getenv("SEARCH_DATA_DIR", "data"))
+SEARCH_DB_PATH = Path(os.getenv("SEARCH_DB_PATH", "data/search.sqlite3"))
+# How often /search re-checks data/ for new or changed daily files
+SEARCH_REFRESH_SEC = float(os.getenv("SEARCH_REFRESH_SEC", "60"))
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# bm25() column weights: title, summary, body
+_BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def build_match_query(text: str) -> str:
+    """
+    Turn free user input into a safe FTS5 MATCH expression.
+
+    Every word is quoted (so FTS5 operators and stray quotes in the input cannot
+    cause syntax errors) and all words must match.
+    """
+    return " ".join(f'"{token}"' for token in _TOKEN_RE.findall(text))
+
+
+class SearchIndex:
+    """
+    Local full-text index (SQLite FTS5, BM25 ranking) over archived days.
+
+    Each day combines daily_summary_<date>.json (title, topic, summary) with the
+    bodyText from daily_full_article_<date>.json. Days are re-indexed only when
+    one of their files changes, so indexing after each daily job is incremental.
+
+    Args:
+        data_dir (Path): Directory holding the daily JSON files.
+        db_path (Path): SQLite database file.
+    """
+
+    def __init__(self, data_dir: Path = SEARCH_DATA_DIR, db_path: Path = SEARCH_DB_PATH):
+        self.data_dir = Path(data_dir)
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_refresh = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS search_files (
+                    date TEXT PRIMARY KEY,
+                    stamp TEXT NOT NULL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS search_docs USING fts5(
+                    title, summary, body,
+                    topic UNINDEXED, date UNINDEXED, url UNINDEXED, position UNINDEXED,
+                    tokenize = 'porter unicode61'
+                );
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _day_files(self, day: str) -> tuple:
+        return (
+            self.data_dir / f"daily_summary_{day}.json",
+            self.data_dir / f"daily_full_article_{day}.json",
+        )
+
+    @staticmethod
+    def _stamp(paths) -> str:
+        parts = []
+        for path in paths:
+            try:
+                st = path.stat()
+                parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+            except FileNotFoundError:
+                parts.append("-")
+        return "|".join(parts)
+
+    def index_day(self, day: str) -> int:
+        """
+        Index one day if its files changed since the last run.
+
+        Returns:
+            int: Number of documents (re)indexed (0 if the day was already current).
+        """
+        if not DATE_RE.match(day):
+            return 0
+        summary_path, full_path = self._day_files(day)
+        if not summary_path.exists():
+            return 0
+
+        stamp = self._stamp((summary_path, full_path))
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT stamp FROM search_files WHERE date = ?", (day,)).fetchone()
+            if row is not None and row[0] == stamp:
+                return 0
+
+            with open(summary_path, "r", encoding="utf-8") as f:
+                summaries = json.load(f)
+
+            bodies = {}
+            if full_path.exists():
+                with open(full_path, "r", encoding="utf-8") as f:
+                    for article in json.load(f):
+                        bodies[article.get("url", "")] = article.get("fields", {}).get("bodyText", "")
+
+            with conn:
+                conn.execute("DELETE FROM search_docs WHERE date = ?", (day,))
+                conn.executemany(
+                    "INSERT INTO search_docs (title, summary, body, topic, date, url, position) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            a.get("title", ""), a.get("summary", ""), bodies.get(a.get("url", ""), ""),
+                            a.get("topic", ""), day, a.get("url", ""), i,
+                        )
+                        for i, a in enumerate(summaries, 1)
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_files (date, stamp) VALUES (?, ?)", (day, stamp)
+                )
+            return len(summaries)
+
+    def index_all(self) -> int:
+        """Index every new or changed day in data_dir; returns the number of documents indexed."""
+        total = 0
+        for path in sorted(self.data_dir.glob("daily_summary_*.json")):
+            day = path.stem[len("daily_summary_"):]
+            if DATE_RE.match(day):
+                total += self.index_day(day)
+        self._last_refresh = time.monotonic()
+        return total
+
+    def refresh_if_stale(self, max_age: float = SEARCH_REFRESH_SEC) -> None:
+        if time.monotonic() - self._last_refresh >= max_age:
+            self.index_all()
+
+    def search(
+        self,
+        query: str,
+        topic: Optional[str] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        limit: int = 20,
+    ) -> list:
+        """
+        Ranked full-text search with highlighted snippets.
+
+        Args:
+            query (str): Free-text query (all words must match).
+            topic (str | None): Only articles of this topic.
+            from_date (str | None): First date (YYYY-MM-DD), inclusive.
+            to_date (str | None): Last date (YYYY-MM-DD), inclusive.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list[dict]: Results ordered by BM25 score (best first).
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        clauses, params = ["search_docs MATCH ?"], [match]
+        if topic:
+            clauses.append("topic = ?")
+            params.append(topic)
+        if from_date:
+            clauses.append("date >= ?")
+            params.append(from_date)
+        if to_date:
+            clauses.append("date <= ?")
+            params.append(to_date)
+
+        sql = (
+            "SELECT date, position, topic, title, url, "
+            "snippet(search_docs, 1, '<mark>', '</mark>', '…', 24), "
+            "snippet(search_docs, 2, '<mark>', '</mark>', '…', 24), "
+            f"bm25(search_docs, {', '.join(str(w) for w in _BM25_WEIGHTS)}) AS score "
+            f"FROM search_docs WHERE {' AND '.join(clauses)} ORDER BY score LIMIT ?"
+        )
+
+        with self._lock:
+            rows = self._connect().execute(sql, (*params, limit)).fetchall()
+
+        results = []
+        for day, position, topic_, title, url, summary_snippet, body_snippet, score in rows:
+            results.append({
+                "date": day,
+                "position": position,
+                "topic": topic_,
+                "title": title,
+                "url": url,
+                # Prefer the summary snippet; fall back to the body when only the body matched
+                "snippet": summary_snippet if "<mark>" in summary_snippet else body_snippet,
+                "score": round(-score, 6),  # bm25() is lower-is-better
+            })
+        return results
+
+
+# Shared instance used by routes/search.py and the daily job
+search_index = SearchIndex()
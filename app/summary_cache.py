@@ -0,0 +1,151 @@
+# app/summary_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Optional
+
+from app.cache import LRUCache
+from app.metrics import register_cache
+
+SUMMARY_CACHE_PATH = Path(os.getenv("SUMMARY_CACHE_PATH", "data/summary_cache.sqlite3"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "20000"))
+SUMMARY_CACHE_MEMORY_ENTRIES = int(os.getenv("SUMMARY_CACHE_MEMORY_ENTRIES", "512"))
+
+
+def normalize_text(text: str) -> str:
+    """Normalize article text so cosmetic whitespace/Unicode differences share a cache key."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def summary_cache_key(text: str, model: str, prompt_template: str, temperature: float) -> str:
+    """
+    Content-addressed key: sha256 over (normalized text, model, prompt template, temperature).
+
+    Changing any of the inputs that shape the completion produces a new key,
+    so old summaries are never served for a different prompt or model.
+    """
+    payload = json.dumps(
+        [normalize_text(text), model, prompt_template, temperature],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    Disk-backed (SQLite) summary store with an in-memory LRU in front.
+
+    - `get()` checks memory first, then SQLite; disk hits are promoted to memory.
+    - `put()` upserts and evicts least-recently-used rows above `max_entries`.
+    - Safe to share between threads (one connection guarded by a lock).
+
+    Args:
+        path (Path): SQLite database file.
+        max_entries (int): Maximum number of rows kept on disk.
+        memory_entries (int): Size of the in-memory LRU.
+    """
+
+    def __init__(
+        self,
+        path: Path = SUMMARY_CACHE_PATH,
+        max_entries: int = SUMMARY_CACHE_MAX_ENTRIES,
+        memory_entries: int = SUMMARY_CACHE_MEMORY_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._memory = LRUCache(memory_entries)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so importing the module never touches the filesystem
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_access ON summaries(last_access)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                return entry[0]
+
+            conn = self._connect()
+            row = conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE summaries SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.disk_hits += 1
+            self._memory.set(key, row[0])
+            return row[0]
+
+    def put(self, key: str, summary: str, model: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, model, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, summary, model, now, now),
+            )
+            count = conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM summaries WHERE key IN "
+                    "(SELECT key FROM summaries ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            conn.commit()
+            self._memory.set(key, summary)
+
+    def stats(self) -> dict:
+        memory = self._memory.stats()
+        hits = memory["hits"] + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        }
+
+
+# Shared instance used by app/summary_llm.py
+summary_cache = SummaryCache()
+
+
+def _summary_cache_counts() -> tuple:
+    stats = summary_cache.stats()
+    return stats["memory_hits"] + stats["disk_hits"], stats["misses"]
+
+
+register_cache("summary", _summary_cache_counts)
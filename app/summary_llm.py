@@ -1,36 +1,70 @@
 # app/summary_llm.py
 
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
-from app.usage_tracker import check_and_log_openai
+import openai
+from openai import AsyncOpenAI, OpenAI
+from app.usage_tracker import check_and_log_openai, log_openai_usage
+from app.summary_cache import summary_cache, summary_cache_key
+from app.resilience import CircuitOpenError, get_upstream, is_transient
+from app.log import get_logger
+from app.metrics import OPENAI_TOKENS
+from app.tracing import span
+from app.tokenizer import count_tokens, split_into_chunks, trim_to_tokens
 
 
 load_dotenv()
 
+logger = get_logger("openai")
+
 # Call OpenAI API
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Retries are handled by the shared "openai" upstream policy (app/resilience.py),
+# so the SDK's own retries are disabled.
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+OPENAI_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "5"))
+OPENAI_TIMEOUT_SEC = float(os.getenv("OPENAI_TIMEOUT_SEC", "30"))
+
+# Rate limit, adaptive concurrency, circuit breaker and retry budget
+# (OPENAI_MAX_RETRIES, OPENAI_BACKOFF_BASE_SEC, OPENAI_RATE_PER_SEC, ...)
+openai_upstream = get_upstream("openai")
 
 USE_DUMMY = os.getenv("USE_DUMMY_SUMMARY", "false").lower() == "true"
 
+DUMMY_SUMMARY = "(This is a test summary due to quota limits.)"
+SUMMARY_UNAVAILABLE = "(Summary unavailable)"
+# Usage report of a summary served from the cache (no request, nothing charged)
+CACHED_USAGE = {"cached": True, "cost_usd": 0.0, "latency_sec": 0.0}
 
-def summarize_article(article_text: str) -> dict:
 
-    if USE_DUMMY:
-        return {"summary": "(This is a test summary due to quota limits.)"}
+OPENAI_MODEL = "gpt-3.5-turbo"
+OPENAI_TEMPERATURE = 0.7  # Standard creativity level; allows some diversity and natural rephrasing.
+OPENAI_MAX_OUTPUT_TOKENS = int(os.getenv("OPENAI_MAX_OUTPUT_TOKENS", "500"))  # Sufficient for long summaries.
 
-    # Estimated cost per article summary (tentatively 0.01 USD)
-    # 0.0005 x 6 articles 4 times = 0.012 USD (0.01 USD on Open AI server side)
-    check_and_log_openai(0.0005)
+# Article text beyond this many tokens is trimmed to its lead paragraphs (0: send everything)
+SUMMARY_INPUT_MAX_TOKENS = int(os.getenv("SUMMARY_INPUT_MAX_TOKENS", "1500"))
 
+# Map-reduce mode: articles over SUMMARY_INPUT_MAX_TOKENS are split into chunks of at most
+# SUMMARY_CHUNK_TOKENS, summarized concurrently, then reduced (instead of trimmed)
+SUMMARY_MAP_REDUCE = os.getenv("SUMMARY_MAP_REDUCE", "false").lower() == "true"
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "1200"))
+SUMMARY_CHUNK_OUTPUT_TOKENS = int(os.getenv("SUMMARY_CHUNK_OUTPUT_TOKENS", "200"))
+# Chunks past this many are dropped, with a warning (bounds cost and the reduce prompt)
+SUMMARY_MAX_CHUNKS = int(os.getenv("SUMMARY_MAX_CHUNKS", "8"))
 
+# USD per 1K tokens (gpt-3.5-turbo list prices; see docs/cost/openai_pricing_notes.md)
+OPENAI_INPUT_USD_PER_1K = float(os.getenv("OPENAI_INPUT_USD_PER_1K", "0.0005"))
+OPENAI_OUTPUT_USD_PER_1K = float(os.getenv("OPENAI_OUTPUT_USD_PER_1K", "0.0015"))
+# Chat formatting tokens added around each message
+CHAT_MESSAGE_OVERHEAD_TOKENS = 7
 
-    """
-    Returns a ~100-word plain English summary of the given article text.
-    Optimized for clarity and readability for general users (not learners).
-    """
-    prompt = f"""
+SUMMARY_PROMPT_TEMPLATE = """
 Summarize the following news article in clear and simple English.
 Keep the summary around 100 words.
 Do not include vocabulary explanations.
@@ -41,29 +75,397 @@ Article:
 \"\"\"
 """
 
+CHUNK_PROMPT_TEMPLATE = """
+The following text is one part of a longer news article.
+Summarize this part in 3 to 4 sentences of clear and simple English.
+Keep names, numbers and places. Do not add anything that is not in the text.
+
+Text:
+\"\"\"
+{chunk_text}
+\"\"\"
+"""
+
+REDUCE_PROMPT_TEMPLATE = """
+Below are summaries of consecutive parts of one news article, in order.
+Combine them into a single summary of the whole article in clear and simple English.
+Keep the summary around 100 words.
+Do not include vocabulary explanations.
+
+{partial_summaries}
+"""
+
+
+def openai_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of one request at the configured per-1K-token prices."""
+    return (prompt_tokens * OPENAI_INPUT_USD_PER_1K + completion_tokens * OPENAI_OUTPUT_USD_PER_1K) / 1000
+
+
+def _reserve(prompt: str, max_tokens: int) -> dict:
+    """
+    Reserve the worst-case cost of one request (prompt + `max_tokens` of output)
+    in the usage tracker; raises BudgetExceededError over the monthly budget.
+
+    Returns:
+        dict: Usage report to pass to `_settle_usage` once the call is done.
+    """
+    prompt_tokens = count_tokens(prompt, OPENAI_MODEL) + CHAT_MESSAGE_OVERHEAD_TOKENS
+    reserved = openai_cost(prompt_tokens, max_tokens)
+    check_and_log_openai(reserved)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": 0, "max_tokens": max_tokens, "reserved_usd": reserved}
+
+
+def _settle_usage(report: dict, response, started: float, sent: bool = True) -> dict:
+    """
+    Replace the reservation with the real cost from `response.usage`. When the
+    call failed only the prompt's cost is kept (the input may still be billed),
+    and nothing when it was never sent (circuit open).
+
+    Returns:
+        dict: Per-article report: tokens, cost_usd, latency_sec, trimmed.
+    """
+    reserved = report.pop("reserved_usd")
+    max_tokens = report.pop("max_tokens")
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        report["prompt_tokens"] = usage.prompt_tokens
+        report["completion_tokens"] = usage.completion_tokens
+    elif response is not None:
+        report["estimated"] = True  # no usage in the response: locally counted prompt, reserved output
+        report["completion_tokens"] = max_tokens
+    elif not sent:
+        report["prompt_tokens"] = 0
+    cost = openai_cost(report["prompt_tokens"], report["completion_tokens"])
+    log_openai_usage(cost - reserved)
+    report["cost_usd"] = round(cost, 6)
+    report["latency_sec"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Retry on timeouts, connection errors, 429 and 5xx; everything else fails fast."""
+    if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return is_transient(error)
+
+
+def _observe_usage(response) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    OPENAI_TOKENS.observe(usage.prompt_tokens, kind="prompt")
+    OPENAI_TOKENS.observe(usage.completion_tokens, kind="completion")
+
+
+def _complete(prompt: str, max_tokens: int = OPENAI_MAX_OUTPUT_TOKENS) -> tuple:
+    """
+    One chat completion under the "openai" upstream policy (blocking).
+
+    Returns:
+        tuple: (reply text, or None if the call failed; usage report)
+    """
+    report = _reserve(prompt, max_tokens)
+    started, response, text = time.perf_counter(), None, None
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7, # Standard creativity level; allows some diversity and natural rephrasing.
-            max_tokens=500,  # Sufficient for long summaries.
+        response = openai_upstream.call(
+            lambda: client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=OPENAI_TEMPERATURE,
+                max_tokens=max_tokens,
+                timeout=OPENAI_TIMEOUT_SEC,
+            ),
+            retryable=_is_retryable,
         )
+        _observe_usage(response)
+        text = response.choices[0].message.content.strip()
 
-        # TODO: After verifying token average, replace fixed cost tracking with dynamic token-based calculation
-        # check and log usage
-        # PRICE_PER_1K_TOKEN = 0.0005 # for gpt-3.5-turbo output
-        # tokens = response.usage.total_tokens
-        # cost = tokens * (PRICE_PER_1K_TOKEN / 1000)
-        # print(f"Tokens: {tokens}, Estimated cost: ${cost:.5f}")
-        # check_and_log_usage(cost)
+    except Exception as e:
+        logger.warning("Summary error: %s", e)
+        sent = not isinstance(e, CircuitOpenError)
+    else:
+        sent = True
+    return text, _settle_usage(report, response, started, sent)
 
 
-        result = response.choices[0].message.content.strip()
-        return {"summary": result}
+async def _complete_async(prompt: str, timeout: float, max_tokens: int = OPENAI_MAX_OUTPUT_TOKENS) -> tuple:
+    """Async variant of `_complete`; each attempt is bounded by `timeout` seconds."""
+    report = _reserve(prompt, max_tokens)
+    started, response, text = time.perf_counter(), None, None
+
+    try:
+        response = await openai_upstream.call_async(
+            lambda: async_client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=OPENAI_TEMPERATURE,
+                max_tokens=max_tokens,
+            ),
+            retryable=_is_retryable,
+            timeout=timeout,
+        )
+        _observe_usage(response)
+        text = response.choices[0].message.content.strip()
 
     except Exception as e:
-        print(f"Summary error: {e}")
-        return {"summary": "(Summary unavailable)"}
+        # Includes CircuitOpenError: fail fast while OpenAI is down
+        logger.warning("Summary error: %r", e)
+        sent = not isinstance(e, CircuitOpenError)
+    else:
+        sent = True
+    return text, _settle_usage(report, response, started, sent)
+
+
+def _cached_summary(cache_key: str, span_name: str = "cache.summary") -> Optional[str]:
+    with span(span_name) as lookup:
+        cached = summary_cache.get(cache_key)
+        lookup.set(hit=cached is not None)
+    return cached
+
+
+async def _cached_summary_async(cache_key: str, span_name: str = "cache.summary") -> Optional[str]:
+    # SQLite lookups block, so they run in a worker thread instead of on the event loop
+    with span(span_name) as lookup:
+        cached = await asyncio.to_thread(summary_cache.get, cache_key)
+        lookup.set(hit=cached is not None)
+    return cached
+
+
+async def _store_summary_async(cache_key: str, summary: str) -> None:
+    await asyncio.to_thread(summary_cache.put, cache_key, summary, OPENAI_MODEL)
+
+
+def _chunk_cache_key(chunk: str) -> str:
+    return summary_cache_key(chunk, OPENAI_MODEL, CHUNK_PROMPT_TEMPLATE, OPENAI_TEMPERATURE)
+
+
+# Shared by every sync map-reduce summary instead of a pool per article
+_chunk_executor = ThreadPoolExecutor(max_workers=max(1, OPENAI_CONCURRENCY), thread_name_prefix="summary-chunk")
+
+
+def _summary_cache_key(article_text: str, sent_text: str, input_tokens: int) -> str:
+    """
+    Cache key for the final summary of an article.
+
+    Trimmed summaries are keyed on the text actually sent; map-reduce summaries
+    cover the whole article, so they are keyed on it together with the chunking
+    settings and both prompts, and never share a key with a trimmed summary.
+    """
+    if not _uses_map_reduce(input_tokens):
+        return summary_cache_key(sent_text, OPENAI_MODEL, SUMMARY_PROMPT_TEMPLATE, OPENAI_TEMPERATURE)
+    template = (
+        f"map_reduce chunk_tokens={SUMMARY_CHUNK_TOKENS} max_chunks={SUMMARY_MAX_CHUNKS}\n"
+        f"{CHUNK_PROMPT_TEMPLATE}\n{REDUCE_PROMPT_TEMPLATE}"
+    )
+    return summary_cache_key(article_text, OPENAI_MODEL, template, OPENAI_TEMPERATURE)
+
+
+def _split_for_map_reduce(article_text: str) -> tuple:
+    """(chunks to summarize, tokens in the chunks dropped past SUMMARY_MAX_CHUNKS)"""
+    chunks = split_into_chunks(article_text, SUMMARY_CHUNK_TOKENS, OPENAI_MODEL)
+    limit = max(1, SUMMARY_MAX_CHUNKS)
+    if len(chunks) <= limit:
+        return chunks, 0
+    dropped_tokens = sum(count_tokens(chunk, OPENAI_MODEL) for chunk in chunks[limit:])
+    logger.warning(
+        "✂️ Article split into %d chunks; dropping the last %d (%d tokens) past SUMMARY_MAX_CHUNKS=%d",
+        len(chunks), len(chunks) - limit, dropped_tokens, limit,
+    )
+    return chunks[:limit], dropped_tokens
+
+
+def _reduce_prompt(partials: list) -> str:
+    parts = "\n\n".join(f"Part {i}: {partial}" for i, partial in enumerate(partials, 1))
+    return REDUCE_PROMPT_TEMPLATE.format(partial_summaries=parts)
+
+
+def _combine_usage(input_tokens: int, chunks: list, dropped_tokens: int, reports: list, started: float) -> dict:
+    """One usage report for a map-reduce summary (latency is wall time, not the sum)."""
+    return {
+        "input_tokens": input_tokens,
+        "sent_tokens": sum(count_tokens(chunk, OPENAI_MODEL) for chunk in chunks),
+        "trimmed": dropped_tokens > 0,
+        "dropped_tokens": dropped_tokens,
+        "chunks": len(chunks),
+        "cached_chunks": sum(1 for r in reports[:len(chunks)] if r.get("cached")),
+        "prompt_tokens": sum(r.get("prompt_tokens", 0) for r in reports),
+        "completion_tokens": sum(r.get("completion_tokens", 0) for r in reports),
+        "cost_usd": round(sum(r.get("cost_usd", 0.0) for r in reports), 6),
+        "latency_sec": round(time.perf_counter() - started, 3),
+    }
+
+
+def _map_reduce(article_text: str, input_tokens: int) -> tuple:
+    """
+    Summarize each chunk on the shared chunk executor, then reduce the chunk summaries.
+
+    Returns:
+        tuple: (summary or None, usage report)
+    """
+    started = time.perf_counter()
+    chunks, dropped_tokens = _split_for_map_reduce(article_text)
+
+    def summarize_chunk(chunk: str) -> tuple:
+        key = _chunk_cache_key(chunk)
+        cached = _cached_summary(key, "cache.summary_chunk")
+        if cached is not None:
+            return cached, dict(CACHED_USAGE)
+        text, report = _complete(CHUNK_PROMPT_TEMPLATE.format(chunk_text=chunk), SUMMARY_CHUNK_OUTPUT_TOKENS)
+        if text is not None:
+            summary_cache.put(key, text, OPENAI_MODEL)
+        return text, report
+
+    mapped = list(_chunk_executor.map(summarize_chunk, chunks))
+
+    partials = [text for text, _ in mapped]
+    reports = [report for _, report in mapped]
+    result = None
+    # A failed chunk fails the article; the chunks that succeeded are cached for the retry
+    if all(partial is not None for partial in partials):
+        result, report = _complete(_reduce_prompt(partials))
+        reports.append(report)
+    return result, _combine_usage(input_tokens, chunks, dropped_tokens, reports, started)
+
+
+async def _map_reduce_async(article_text: str, input_tokens: int, timeout: float) -> tuple:
+    """
+    Summarize every chunk concurrently, then reduce the chunk summaries, so the
+    latency is the slowest chunk plus one reduce call.
+
+    Returns:
+        tuple: (summary or None, usage report)
+    """
+    started = time.perf_counter()
+    chunks, dropped_tokens = _split_for_map_reduce(article_text)
+
+    async def summarize_chunk(chunk: str) -> tuple:
+        key = _chunk_cache_key(chunk)
+        cached = await _cached_summary_async(key, "cache.summary_chunk")
+        if cached is not None:
+            return cached, dict(CACHED_USAGE)
+        text, report = await _complete_async(
+            CHUNK_PROMPT_TEMPLATE.format(chunk_text=chunk), timeout, SUMMARY_CHUNK_OUTPUT_TOKENS
+        )
+        if text is not None:
+            await _store_summary_async(key, text)
+        return text, report
+
+    # Chunks share the "openai" upstream's rate limit and AIMD concurrency with every other call
+    with span("summarize.map", chunks=len(chunks)):
+        mapped = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+
+    partials = [text for text, _ in mapped]
+    reports = [report for _, report in mapped]
+    result = None
+    # A failed chunk fails the article; the chunks that succeeded are cached for the retry
+    if all(partial is not None for partial in partials):
+        with span("summarize.reduce"):
+            result, report = await _complete_async(_reduce_prompt(partials), timeout)
+        reports.append(report)
+    return result, _combine_usage(input_tokens, chunks, dropped_tokens, reports, started)
+
+
+def _uses_map_reduce(input_tokens: int) -> bool:
+    return SUMMARY_MAP_REDUCE and SUMMARY_INPUT_MAX_TOKENS > 0 and input_tokens > SUMMARY_INPUT_MAX_TOKENS
+
+
+def summarize_article(article_text: str) -> dict:
+    """
+    Returns a ~100-word plain English summary of the given article text.
+    Optimized for clarity and readability for general users (not learners).
+
+    Summaries are cached by content (see app/summary_cache.py); a cache hit
+    returns immediately without an API call or a usage-tracker charge.
+
+    Articles longer than SUMMARY_INPUT_MAX_TOKENS are cut to their lead or, with
+    SUMMARY_MAP_REDUCE=true, summarized chunk by chunk and then reduced. The
+    usage tracker is charged from `response.usage`; the result's "usage" entry
+    reports tokens (before / after trimming), cost_usd and latency_sec.
+    """
+
+    if USE_DUMMY:
+        return {"summary": DUMMY_SUMMARY}
+
+    text, input_tokens, sent_tokens = trim_to_tokens(article_text, SUMMARY_INPUT_MAX_TOKENS, OPENAI_MODEL)
+    cache_key = _summary_cache_key(article_text, text, input_tokens)
+    cached = _cached_summary(cache_key)
+    if cached is not None:
+        return {"summary": cached, "cached": True, "usage": dict(CACHED_USAGE)}
+
+    if _uses_map_reduce(input_tokens):
+        result, report = _map_reduce(article_text, input_tokens)
+    else:
+        result, report = _complete(SUMMARY_PROMPT_TEMPLATE.format(article_text=text))
+        report = {"input_tokens": input_tokens, "sent_tokens": sent_tokens,
+                  "trimmed": sent_tokens < input_tokens, **report}
+
+    if result is None:
+        return {"summary": SUMMARY_UNAVAILABLE, "usage": report}
+    summary_cache.put(cache_key, result, OPENAI_MODEL)
+    return {"summary": result, "usage": report}
+
+
+async def summarize_article_async(article_text: str, timeout: float = OPENAI_TIMEOUT_SEC) -> dict:
+    """
+    Async variant of `summarize_article` (same prompt, cache and cost tracking).
+
+    Each attempt is bounded by `timeout` seconds. Calls go through the shared
+    "openai" upstream policy: rate-limited, AIMD concurrency, circuit breaker,
+    and timeouts / 429 / 5xx retried with jittered backoff within a retry budget.
+    """
+
+    if USE_DUMMY:
+        return {"summary": DUMMY_SUMMARY}
+
+    text, input_tokens, sent_tokens = trim_to_tokens(article_text, SUMMARY_INPUT_MAX_TOKENS, OPENAI_MODEL)
+    cache_key = _summary_cache_key(article_text, text, input_tokens)
+    cached = await _cached_summary_async(cache_key)
+    if cached is not None:
+        return {"summary": cached, "cached": True, "usage": dict(CACHED_USAGE)}
+
+    if _uses_map_reduce(input_tokens):
+        result, report = await _map_reduce_async(article_text, input_tokens, timeout)
+    else:
+        result, report = await _complete_async(SUMMARY_PROMPT_TEMPLATE.format(article_text=text), timeout)
+        report = {"input_tokens": input_tokens, "sent_tokens": sent_tokens,
+                  "trimmed": sent_tokens < input_tokens, **report}
+
+    if result is None:
+        return {"summary": SUMMARY_UNAVAILABLE, "usage": report}
+    await _store_summary_async(cache_key, result)
+    return {"summary": result, "usage": report}
+
+
+async def summarize_many(
+    articles: list,
+    concurrency: int = OPENAI_CONCURRENCY,
+    on_result: Optional[Callable[[int, dict], None]] = None,
+) -> list:
+    """
+    Summarize many article texts concurrently, at most `concurrency` at a time.
+
+    Args:
+        articles (list[str]): Article texts to summarize.
+        concurrency (int): Maximum number of in-flight OpenAI requests.
+        on_result (Callable | None): Called as `on_result(index, result)` as soon as
+            each summary finishes (e.g. to checkpoint it).
+
+    Returns:
+        list[dict]: One `{"summary": ...}` dict per input, in input order.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def worker(index: int, text: str) -> dict:
+        async with semaphore:
+            result = await summarize_article_async(text)
+        if on_result is not None:
+            on_result(index, result)
+        return result
+
+    return await asyncio.gather(*(worker(i, text) for i, text in enumerate(articles)))
 
 
 # Manual test (optional)
@@ -0,0 +1,113 @@
+# app/templating.py
+
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+
+import jinja2
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.templating import Jinja2Templates
+
+from app.tracing import span, traced_iter
+
+TEMPLATE_DIR = Path(os.getenv("TEMPLATE_DIR", "app/templates"))
+# Development: re-read templates when they change on disk (no bytecode cache)
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+TEMPLATE_BYTECODE_CACHE_DIR = Path(os.getenv("TEMPLATE_BYTECODE_CACHE_DIR", "data/jinja_cache"))
+# Stream rendered HTML with Template.generate() instead of building the whole page first
+TEMPLATE_STREAMING = os.getenv("TEMPLATE_STREAMING", "true").lower() == "true"
+# Rendered fragments are grouped into chunks of at least this many characters
+TEMPLATE_STREAM_CHUNK_CHARS = int(os.getenv("TEMPLATE_STREAM_CHUNK_CHARS", "8192"))
+
+
+def create_environment(
+    directory: Path = TEMPLATE_DIR,
+    auto_reload: bool = TEMPLATE_AUTO_RELOAD,
+    bytecode_cache_dir: Optional[Path] = TEMPLATE_BYTECODE_CACHE_DIR,
+) -> jinja2.Environment:
+    """
+    Build the Jinja2 environment shared by every route.
+
+    In production mode (`auto_reload=False`) compiled templates are kept in
+    memory for the life of the process (no per-request stat of the source) and
+    their bytecode is cached on disk, so a restart skips the compile step too.
+    """
+    bytecode_cache = None
+    if not auto_reload and bytecode_cache_dir is not None:
+        Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(str(bytecode_cache_dir))
+
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(str(directory)),
+        autoescape=True,
+        auto_reload=auto_reload,
+        cache_size=400 if auto_reload else -1,  # -1: never evict compiled templates
+        bytecode_cache=bytecode_cache,
+    )
+
+
+# One environment for app/main.py and routes/ (url_for etc. are added by Jinja2Templates)
+templates = Jinja2Templates(env=create_environment())
+
+
+def precompile_templates() -> int:
+    """
+    Load every template once so the first request does not pay for compiling.
+
+    Returns:
+        int: Number of templates compiled (or loaded from the bytecode cache).
+    """
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
+
+
+def _buffered(fragments: Iterator[str], min_chars: int) -> Iterator[str]:
+    # generate() yields many tiny fragments; group them so each chunk is worth a write
+    buffer, size = [], 0  # type: ignore
+    for fragment in fragments:
+        buffer.append(fragment)
+        size += len(fragment)
+        if size >= min_chars:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def render_template(
+    request: Request,
+    name: str,
+    context: dict,
+    status_code: int = 200,
+    stream: bool = TEMPLATE_STREAMING,
+) -> Response:
+    """
+    Render `name` with `context` as an HTML response.
+
+    With `stream=True` the page is sent as it renders (Template.generate()), so
+    the head and first articles reach the client before the rest is rendered.
+
+    Args:
+        request (Request): Current request (exposed to the template as `request`).
+        name (str): Template file name, e.g. "daily.html".
+        context (dict): Template variables.
+        status_code (int): HTTP status of the response.
+        stream (bool): Stream the rendered output instead of buffering it.
+
+    Returns:
+        Response: The rendered page (a StreamingResponse when streaming).
+    """
+    if not stream:
+        with span("render", template=name):
+            return templates.TemplateResponse(request, name, context, status_code=status_code)
+
+    context = {"request": request, **context}
+    template = templates.get_template(name)
+    return StreamingResponse(
+        _buffered(traced_iter("render", template.generate(context), template=name), TEMPLATE_STREAM_CHUNK_CHARS),
+        status_code=status_code,
+        media_type="text/html",
+    )
@@ -0,0 +1,168 @@
+# app/tokenizer.py
+"""
+Local token counting and lead-first trimming of article text before it goes
+into a prompt.
+
+Uses tiktoken when it is installed (pip install tiktoken) and its encoding can
+be loaded; otherwise tokens are estimated as ~4 characters each, which is close
+enough for English news text to keep a prompt under budget.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Optional
+
+try:  # optional: pip install tiktoken
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+FALLBACK_ENCODING = "cl100k_base"
+
+_PARAGRAPH_SPLIT = re.compile(r"\s*\n\s*")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|(?<=[.!?][\"'”’)])\s+")
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:  # model unknown to this tiktoken version
+        pass
+    except Exception:  # encoding files could not be downloaded / read
+        return None
+    try:
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception:
+        return None
+
+
+def tokenizer_name(model: str) -> str:
+    """Which counter `count_tokens` uses for `model` ("tiktoken:<encoding>" or "estimate")."""
+    encoding = _encoding(model)
+    return f"tiktoken:{encoding.name}" if encoding is not None else "estimate"
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Number of tokens `text` takes for `model`.
+
+    Args:
+        text (str): Text to count.
+        model (str): OpenAI model name (selects the tiktoken encoding).
+
+    Returns:
+        int: Exact count with tiktoken, ~len(text) / 4 otherwise.
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _truncate(text: str, max_tokens: int, model: str) -> str:
+    encoding = _encoding(model)
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+
+def _lead_units(text: str) -> tuple:
+    # Paragraphs when the text has line breaks; Guardian bodyText often has none, so sentences
+    paragraphs = [p for p in _PARAGRAPH_SPLIT.split(text.strip()) if p]
+    if len(paragraphs) > 1:
+        return paragraphs, "\n"
+    return [s for s in _SENTENCE_SPLIT.split(text.strip()) if s], " "
+
+
+def trim_to_tokens(text: str, max_tokens: Optional[int], model: str) -> tuple:
+    """
+    Keep the lead of `text` (whole paragraphs, or sentences) within `max_tokens`.
+
+    News articles put the essentials first, so the lead is what a summary needs;
+    a single oversized first paragraph / sentence is cut at the token limit.
+
+    Args:
+        text (str): Article text.
+        max_tokens (int | None): Token budget (None or <= 0: no trimming).
+        model (str): OpenAI model name.
+
+    Returns:
+        tuple: (text to send, tokens before trimming, tokens after trimming)
+    """
+    original = count_tokens(text, model)
+    if not max_tokens or max_tokens <= 0 or original <= max_tokens:
+        return text, original, original
+
+    units, separator = _lead_units(text)
+    separator_tokens = count_tokens(separator, model)
+    kept: list = []
+    used = 0
+    for unit in units:
+        cost = count_tokens(unit, model) + (separator_tokens if kept else 0)
+        if used + cost > max_tokens:
+            break
+        kept.append(unit)
+        used += cost
+
+    trimmed = separator.join(kept) if kept else _truncate(units[0] if units else text, max_tokens, model)
+    return trimmed, original, count_tokens(trimmed, model)
+
+
+def _split_tokens(text: str, max_tokens: int, model: str) -> list:
+    encoding = _encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+    size = max_tokens * CHARS_PER_TOKEN
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def split_into_chunks(text: str, max_tokens: int, model: str) -> list:
+    """
+    Split `text` into consecutive chunks of at most `max_tokens` tokens.
+
+    Chunks are built from whole paragraphs (or sentences), so each reads on its
+    own; only a single paragraph / sentence longer than `max_tokens` is cut
+    mid-way at a token boundary.
+
+    Args:
+        text (str): Article text.
+        max_tokens (int): Token limit per chunk.
+        model (str): OpenAI model name.
+
+    Returns:
+        list[str]: Chunks in reading order (empty for empty text).
+    """
+    max_tokens = max(1, max_tokens)
+    units, separator = _lead_units(text)
+    separator_tokens = count_tokens(separator, model)
+    chunks: list = []
+    current: list = []
+    used = 0
+
+    for unit in units:
+        size = count_tokens(unit, model)
+        if size > max_tokens:
+            if current:
+                chunks.append(separator.join(current))
+                current, used = [], 0
+            chunks.extend(_split_tokens(unit, max_tokens, model))
+            continue
+        cost = size + (separator_tokens if current else 0)
+        if current and used + cost > max_tokens:
+            chunks.append(separator.join(current))
+            current, used = [unit], size
+        else:
+            current.append(unit)
+            used += cost
+
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
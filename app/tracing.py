@@ -0,0 +1,374 @@
+# app/tracing.py
+"""
+Opt-in request tracing and slow-request profiling for the FastAPI app.
+
+- `TracingMiddleware` starts a trace per request (kept in a contextvar, so it
+  follows the request into awaited coroutines, tasks and threadpool calls).
+- `span(name, **attrs)` times one step (upstream call, cache lookup, render)
+  inside the current trace; outside a trace it returns a shared no-op.
+- A sampled share of requests runs under cProfile; the profile is kept only
+  if the request turned out slow (>= TRACE_SLOW_MS) and is written to a
+  rotating store under TRACE_PROFILE_DIR.
+- The slowest recent requests and their span breakdown are listed by
+  GET /debug/slow (routes/debug.py).
+
+With TRACING_ENABLED=false (the default) the middleware and /debug routes are
+not installed and `span()` is one contextvar lookup.
+"""
+
+import asyncio
+import cProfile
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.log import get_logger
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# Requests at least this slow are recorded (and their profile kept, if sampled)
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "500"))
+# Share of requests run under cProfile (0 disables profiling, spans are still recorded)
+TRACE_PROFILE_SAMPLE_RATE = float(os.getenv("TRACE_PROFILE_SAMPLE_RATE", "0.1"))
+TRACE_PROFILE_DIR = Path(os.getenv("TRACE_PROFILE_DIR", "data/profiles"))
+# Newest profiles kept on disk (older ones are deleted)
+TRACE_PROFILE_KEEP = int(os.getenv("TRACE_PROFILE_KEEP", "50"))
+# Slow requests kept in memory for /debug/slow
+TRACE_SLOW_KEEP = int(os.getenv("TRACE_SLOW_KEEP", "100"))
+
+PROFILE_TOP_FUNCTIONS = 15
+
+logger = get_logger("tracing")
+
+
+class Trace:
+    """Spans recorded for one request (offsets are relative to the request start)."""
+
+    __slots__ = ("method", "path", "started", "spans", "finished")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.spans: list = []
+        self.finished = False
+
+    def add(self, name: str, started: float, duration: float, depth: int, attrs: dict) -> None:
+        if self.finished:  # e.g. a background cache refresh outliving the request
+            return
+        self.spans.append({
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 2),
+            "duration_ms": round(duration * 1000, 2),
+            "depth": depth,
+            **({"attrs": attrs} if attrs else {}),
+        })
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("newslite_trace", default=None)
+_span_depth: ContextVar[int] = ContextVar("newslite_span_depth", default=0)
+
+
+class _Span:
+    __slots__ = ("trace", "name", "attrs", "started", "token")
+
+    def __init__(self, trace: Trace, name: str, attrs: dict):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "_Span":
+        self.token = _span_depth.set(_span_depth.get() + 1)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self.started
+        depth = _span_depth.get() - 1
+        _span_depth.reset(self.token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.trace.add(self.name, self.started, duration, depth, self.attrs)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attrs):
+    """
+    Time a block as a span of the current request's trace.
+
+    Usage: `with span("cache.summary") as s: ...; s.set(hit=True)`.
+    Works in sync and async code; a no-op when no trace is active.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name, attrs)
+
+
+def traced_iter(name: str, iterator: Iterator, **attrs) -> Iterator:
+    """
+    Record the time spent producing the items of `iterator` (e.g. a streamed
+    template) as one span, however the iteration is interleaved with sending.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return iterator
+
+    def run():
+        first, busy, depth = None, 0.0, _span_depth.get()
+        try:
+            while True:
+                started = time.perf_counter()
+                first = first or started
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    busy += time.perf_counter() - started
+                yield item
+        finally:
+            trace.add(name, first or time.perf_counter(), busy, depth, attrs)
+
+    return run()
+
+
+def _breakdown(trace: Trace, total_ms: float) -> dict:
+    # Time per span name; overlapping top-level spans (concurrent calls) are
+    # merged, so "other" is the part of the request not covered by any span.
+    per_name: dict = {}
+    for s in trace.spans:
+        entry = per_name.setdefault(s["name"], {"count": 0, "total_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] = round(entry["total_ms"] + s["duration_ms"], 2)
+
+    covered, end = 0.0, 0.0
+    for s in sorted((s for s in trace.spans if s["depth"] == 0), key=lambda s: s["start_ms"]):
+        start, stop = s["start_ms"], s["start_ms"] + s["duration_ms"]
+        if stop > end:
+            covered += stop - max(start, end)
+            end = stop
+    per_name["other"] = {"count": 1, "total_ms": round(max(0.0, total_ms - covered), 2)}
+    return per_name
+
+
+class ProfileStore:
+    """
+    Rotating directory of cProfile dumps (`<UTC time>_<method>_<path>_<ms>ms.prof`).
+
+    Args:
+        directory (Path): Where profiles are written.
+        keep (int): Newest profiles kept; older ones are deleted on save.
+    """
+
+    NAME_PATTERN = re.compile(r"^[\w.\-]+\.prof$")
+
+    def __init__(self, directory: Path = TRACE_PROFILE_DIR, keep: int = TRACE_PROFILE_KEEP):
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+        self._lock = threading.Lock()
+
+    def save(self, profiler: cProfile.Profile, method: str, path: str, duration_ms: float) -> str:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        slug = re.sub(r"[^\w\-]+", "_", path.strip("/"))[:60] or "root"
+        name = f"{stamp}_{method}_{slug}_{int(duration_ms)}ms.prof"
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            target = self.directory / name
+            tmp = target.with_name(name + ".part")
+            profiler.dump_stats(str(tmp))
+            os.replace(tmp, target)
+            for old in self.list()[self.keep:]:
+                (self.directory / old).unlink(missing_ok=True)
+        return name
+
+    def list(self) -> list:
+        """Profile file names, newest first."""
+        if not self.directory.exists():
+            return []
+        return sorted((p.name for p in self.directory.glob("*.prof")), reverse=True)
+
+    def path_for(self, name: str) -> Optional[Path]:
+        if not self.NAME_PATTERN.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+
+def _top_functions(profiler: cProfile.Profile, limit: int = PROFILE_TOP_FUNCTIONS) -> list:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append({
+            "function": f"{function} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 2),
+            "cumtime_ms": round(cumtime * 1000, 2),
+        })
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return rows[:limit]
+
+
+class SlowRequestLog:
+    """
+    The last `keep` requests slower than `threshold_ms`, with spans and profile.
+
+    Args:
+        threshold_ms (float): Minimum duration recorded.
+        keep (int): Records kept (oldest dropped first).
+        profiles (ProfileStore): Where sampled profiles of slow requests go.
+        sample_rate (float): Share of requests profiled.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = TRACE_SLOW_MS,
+        keep: int = TRACE_SLOW_KEEP,
+        profiles: Optional[ProfileStore] = None,
+        sample_rate: float = TRACE_PROFILE_SAMPLE_RATE,
+    ):
+        self.threshold_ms = threshold_ms
+        self.profiles = profiles or ProfileStore()
+        self.sample_rate = sample_rate
+        self.traced = 0
+        self.profiled = 0
+        self._records: deque = deque(maxlen=max(1, keep))
+        self._lock = threading.Lock()
+        # cProfile hooks the whole thread (the event loop), so one profiled request at a time
+        self._profile_lock = threading.Lock()
+
+    def start_profile(self) -> Optional[cProfile.Profile]:
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        if not self._profile_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is active on this thread
+            self._profile_lock.release()
+            return None
+        return profiler
+
+    def stop_profile(self, profiler: cProfile.Profile) -> None:
+        profiler.disable()
+        self._profile_lock.release()
+
+    def record(self, trace: Trace, route: str, status: int, duration_ms: float,
+               profiler: Optional[cProfile.Profile] = None) -> dict:
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "method": trace.method,
+            "path": trace.path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration_ms, 2),
+            "breakdown": _breakdown(trace, duration_ms),
+            "spans": sorted(trace.spans, key=lambda s: s["start_ms"]),
+            "profile": None,
+        }
+        if profiler is not None:
+            try:
+                entry["profile"] = self.profiles.save(profiler, trace.method, trace.path, duration_ms)
+                entry["top_functions"] = _top_functions(profiler)
+                self.profiled += 1
+            except OSError as e:
+                logger.warning("⚠️ Could not save profile: %s", e)
+        with self._lock:
+            self._records.append(entry)
+        return entry
+
+    def worst(self, limit: int = 20) -> list:
+        with self._lock:
+            records = list(self._records)
+        return sorted(records, key=lambda r: r["duration_ms"], reverse=True)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": TRACING_ENABLED,
+            "slow_ms": self.threshold_ms,
+            "profile_sample_rate": self.sample_rate,
+            "traced": self.traced,
+            "slow": len(self._records),
+            "profiled": self.profiled,
+            "profiles_on_disk": len(self.profiles.list()),
+        }
+
+
+# Shared by the middleware and /debug/slow
+slow_requests = SlowRequestLog()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: one trace per HTTP request, finished when the last body
+    chunk is sent (so streamed templates are included).
+
+    Args:
+        app: Wrapped ASGI app.
+        log (SlowRequestLog): Where slow requests are recorded.
+    """
+
+    def __init__(self, app, log: SlowRequestLog = slow_requests):
+        self.app = app
+        self.log = log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        query = scope.get("query_string", b"").decode("latin-1")
+        trace = Trace(scope["method"], scope["path"] + (f"?{query}" if query else ""))
+        token = _current_trace.set(trace)
+        status = 500
+        profiler = self.log.start_profile()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - trace.started) * 1000
+            if profiler is not None:
+                self.log.stop_profile(profiler)
+            trace.finished = True
+            _current_trace.reset(token)
+            self.log.traced += 1
+            if duration_ms >= self.log.threshold_ms:
+                route = getattr(scope.get("route"), "path", "unmatched")
+                # The response is already sent; pstats and the dump run off the event loop
+                await asyncio.to_thread(self.log.record, trace, route, status, duration_ms, profiler)
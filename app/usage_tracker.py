@@ -1,65 +1,267 @@
-# data/usage_tracker.json
-# {"openai_total_usd": 0.003, "polly_total_chars": 3000, "last_reset": "2025-08"}
+# data/usage_tracker.json  (compacted snapshot)
+# {"openai_total_usd": 0.003, "polly_total_chars": 3000, "last_reset": "2025-08", "log_id": "..."}
+#
+# data/usage_tracker.log   (append-only write-ahead log, one JSON object per line)
+# {"log_id": "..."}                                             <- header line
+# {"month": "2025-08", "openai_total_usd": 0.001, "polly_total_chars": 0}
 
-import os
+import atexit
 import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, in-process locking still applies
+    fcntl = None  # type: ignore
+
 USAGE_FILE = Path("data/usage_tracker.json")
+USAGE_LOG_FILE = Path("data/usage_tracker.log")
+USAGE_LOCK_FILE = Path("data/usage_tracker.lock")
 USAGE_FILE.parent.mkdir(parents=True, exist_ok=True)
 
 OPENAI_MONTHLY_LIMIT_USD = float(os.getenv("OPENAI_MONTHLY_LIMIT_USD", "3.0"))
 POLLY_MONTHLY_LIMIT_CHARS = int(os.getenv("POLLY_MONTHLY_LIMIT_CHARS", "1000000")) # 1000000 for free charge max in 12 months of creating an account
 
+# Pending increments are flushed to the log after this many calls or seconds,
+# and the log is folded into the snapshot once it grows past the byte limit.
+USAGE_FLUSH_MAX_PENDING = int(os.getenv("USAGE_FLUSH_MAX_PENDING", "20"))
+USAGE_FLUSH_INTERVAL_SEC = float(os.getenv("USAGE_FLUSH_INTERVAL_SEC", "5"))
+USAGE_COMPACT_LOG_BYTES = int(os.getenv("USAGE_COMPACT_LOG_BYTES", str(64 * 1024)))
+
+COUNTERS = ("openai_total_usd", "polly_total_chars")
+
+
+class BudgetExceededError(Exception):
+    """Raised when a monthly OpenAI / Polly budget would be exceeded."""
+
+
+def _current_month() -> str:
+    return datetime.now().strftime("%Y-%m")
+
+
 # Initialization
 def _init_usage():
     return {
         "openai_total_usd": 0.0,
         "polly_total_chars": 0,
-        "last_reset": datetime.now().strftime("%Y-%m") # Reset monthly
+        "last_reset": _current_month() # Reset monthly
     }
 
-# Loading usage
-def load_usage():
-    # init
-    if not USAGE_FILE.exists():
-        usage = _init_usage()
-        save_usage(usage)
-        return usage
 
-    with open(USAGE_FILE) as f:
-        return json.load(f)
+@contextmanager
+def _file_lock():
+    """Exclusive lock shared by every process (uvicorn workers, cron job) using the tracker."""
+    if fcntl is None:
+        yield
+        return
+    with open(USAGE_LOCK_FILE, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _fsync_write(path: Path, text: str) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_disk_totals() -> tuple:
+    """
+    Return (totals for the current month, log_id of the active log).
+
+    The log_id is None when there is no log, or when the log on disk was already
+    folded into the snapshot; the next flush must then start a new log.
+
+    usage["last_reset"] holds the most recent reset month (i.e., the month currently being tracked).
+    Snapshot values from an older month and log entries from older months are ignored,
+    which is how the monthly reset happens.
+    """
+    month = _current_month()
+    totals = {name: 0 for name in COUNTERS}
+    folded_log_id = None
+
+    if USAGE_FILE.exists():
+        with open(USAGE_FILE) as f:
+            snapshot = json.load(f)
+        folded_log_id = snapshot.get("log_id")
+        if snapshot.get("last_reset") == month:
+            for name in COUNTERS:
+                totals[name] += snapshot.get(name, 0)
+
+    log_id = None
+    if USAGE_LOG_FILE.exists():
+        with open(USAGE_LOG_FILE) as f:
+            for line_no, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line after a crash
+                if line_no == 0:
+                    log_id = entry.get("log_id")
+                    # The snapshot already contains this log (crash between compaction steps):
+                    # its entries must not be appended to, or they would never be read again
+                    if log_id is not None and log_id == folded_log_id:
+                        log_id = None
+                        break
+                    continue
+                if entry.get("month") == month:
+                    for name in COUNTERS:
+                        totals[name] += entry.get(name, 0)
+
+    return totals, log_id
+
+
+class UsageAccumulator:
+    """
+    In-memory usage counters with batched, crash-safe persistence.
+
+    - Budget checks read memory only (persisted totals + local pending increments).
+    - Pending increments are appended to an fsync'd write-ahead log in batches,
+      under an flock so several processes can share the same files.
+    - The log is periodically compacted into the JSON snapshot.
 
-    # usage["last_reset"] holds the most recent reset month (i.e., the month currently being tracked)
-    # The name "last_reset" may be somewhat misleading intuitively, but it currently refers to this month's data
-    current_month = datetime.now().strftime("%Y-%m")
-    if usage.get("last_reset") != current_month:
-        usage = _init_usage()
-        save_usage(usage)
-    return usage
+    Increments made by other processes become visible at the next flush, so
+    with N processes the budget may be overshot by at most one batch per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._month = _current_month()
+        self._persisted = {name: 0 for name in COUNTERS}
+        self._pending = {name: 0 for name in COUNTERS}
+        self._pending_calls = 0
+        self._last_flush = time.monotonic()
+
+    def _sync_locked(self) -> None:
+        """Flush pending increments and reload totals; caller holds self._lock."""
+        with _file_lock():
+            totals, log_id = _read_disk_totals()
+
+            if self._pending_calls:
+                entry = {"month": self._month, **self._pending}
+                new_log = log_id is None
+                if new_log:
+                    log_id = uuid.uuid4().hex
+                with open(USAGE_LOG_FILE, "w" if new_log else "a") as f:
+                    if new_log:
+                        f.write(json.dumps({"log_id": log_id}) + "\n")
+                    f.write(json.dumps(entry) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                if entry["month"] == _current_month():
+                    for name in COUNTERS:
+                        totals[name] += self._pending[name]
+
+            self._persisted = totals
+            self._pending = {name: 0 for name in COUNTERS}
+            self._pending_calls = 0
+            self._month = _current_month()
+            self._last_flush = time.monotonic()
+            self._loaded = True
+
+            # log_id None: the log on disk is already folded in (replaced by the next flush)
+            if (
+                log_id is not None
+                and USAGE_LOG_FILE.exists()
+                and USAGE_LOG_FILE.stat().st_size > USAGE_COMPACT_LOG_BYTES
+            ):
+                self._compact_locked(totals, log_id)
+
+    def _compact_locked(self, totals: dict, log_id) -> None:
+        # 1) snapshot records which log it folded in, 2) the log is replaced.
+        # A crash between the steps is detected by _read_disk_totals via log_id.
+        snapshot = {**totals, "last_reset": self._month, "log_id": log_id}
+        _fsync_write(USAGE_FILE, json.dumps(snapshot))
+        _fsync_write(USAGE_LOG_FILE, json.dumps({"log_id": uuid.uuid4().hex}) + "\n")
+
+    def charge(self, name: str, amount, limit, message: str) -> None:
+        """Add `amount` to `name`; raises BudgetExceededError past `limit` (None: never)."""
+        with self._lock:
+            if not self._loaded or self._month != _current_month():
+                self._sync_locked()
+
+            new_total = self._persisted[name] + self._pending[name] + amount
+            if limit is not None and new_total > limit:
+                raise BudgetExceededError(message)
+
+            self._pending[name] += amount
+            self._pending_calls += 1
+
+            if (
+                self._pending_calls >= USAGE_FLUSH_MAX_PENDING
+                or time.monotonic() - self._last_flush >= USAGE_FLUSH_INTERVAL_SEC
+            ):
+                self._sync_locked()
+
+    def totals(self) -> dict:
+        with self._lock:
+            if not self._loaded or self._month != _current_month():
+                self._sync_locked()
+            return {name: self._persisted[name] + self._pending[name] for name in COUNTERS}
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._pending_calls:
+                self._sync_locked()
+
+    def reset(self, usage: dict) -> None:
+        """Replace the persisted state with `usage` (drops pending increments)."""
+        with self._lock, _file_lock():
+            log_id = uuid.uuid4().hex
+            _fsync_write(USAGE_FILE, json.dumps({**usage, "log_id": None}))
+            _fsync_write(USAGE_LOG_FILE, json.dumps({"log_id": log_id}) + "\n")
+            self._pending = {name: 0 for name in COUNTERS}
+            self._pending_calls = 0
+            self._loaded = False
+
+
+_accumulator = UsageAccumulator()
+atexit.register(_accumulator.flush)
+
+
+# Loading usage
+def load_usage():
+    usage = _accumulator.totals()
+    return {**usage, "last_reset": _current_month()}
 
 
 def save_usage(data):
-    with open(USAGE_FILE, "w") as f:
-        json.dump(data, f)
+    _accumulator.reset(data)
 
-def check_and_log_openai (estimated_cost_usd: float):
-    usage = load_usage()
-    new_total = usage["openai_total_usd"] + estimated_cost_usd
 
-    if new_total > OPENAI_MONTHLY_LIMIT_USD:
-        raise Exception("Monthly OpenAI API budget exceeded")
+def flush_usage():
+    """Persist pending increments now (called automatically at interpreter exit)."""
+    _accumulator.flush()
 
-    usage["openai_total_usd"] = new_total
-    save_usage(usage)
 
-def check_and_log_polly(chars: int):
-    usage = load_usage()
-    new_total = usage["polly_total_chars"] + chars
+def check_and_log_openai (estimated_cost_usd: float):
+    _accumulator.charge(
+        "openai_total_usd", estimated_cost_usd, OPENAI_MONTHLY_LIMIT_USD,
+        "Monthly OpenAI API budget exceeded",
+    )
 
-    if new_total > POLLY_MONTHLY_LIMIT_CHARS:
-        raise Exception(f"Polly monthly char limit exceeded")
+def log_openai_usage(cost_usd: float):
+    """
+    Record OpenAI spend that already happened, or a refund (negative) of an
+    over-estimate charged by check_and_log_openai. Never raises: the money is spent.
+    """
+    _accumulator.charge("openai_total_usd", cost_usd, None, "")
 
-    usage["polly_total_chars"] = new_total
-    save_usage(usage)
\ No newline at end of file
+def check_and_log_polly(chars: int):
+    _accumulator.charge(
+        "polly_total_chars", chars, POLLY_MONTHLY_LIMIT_CHARS,
+        "Polly monthly char limit exceeded",
+    )
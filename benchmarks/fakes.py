@@ -0,0 +1,235 @@
+# benchmarks/fakes.py
+"""
+Local stand-ins for the Guardian API, OpenAI and Polly used by the benchmarks.
+
+Every fake takes a `Faults` config (latency, jitter, error rate, seed), so a
+run can model a slow or flaky upstream without touching the real services.
+Responses are deterministic per (query, page, index), so two runs see the
+same articles.
+"""
+
+import io
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TypeVar
+from urllib.parse import parse_qs, urlparse
+
+from botocore.exceptions import ClientError
+
+WORDS = (
+    "government climate energy school students teachers technology market data "
+    "policy emissions research report minister council budget city network users "
+    "platform model carbon heat rainfall flood drought teachers exam university "
+    "funding security privacy software chips battery solar wind grid transport"
+).split()
+
+# One MPEG-1 Layer III frame (128 kbps, 44.1 kHz): header + zero payload
+MP3_FRAME = b"\xff\xfb\x90\x64" + bytes(413)
+
+
+class Faults:
+    """
+    Latency and error injection for one fake upstream.
+
+    Args:
+        latency_ms (float): Base latency added to every call.
+        jitter_ms (float): Uniform random extra latency (0..jitter_ms).
+        error_rate (float): Probability that a call fails (HTTP 500 / Polly throttling).
+        seed (int): Seed of the random generator.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def apply(self) -> bool:
+        """Sleep for the configured latency; returns True if this call must fail."""
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            fail = self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return fail
+
+
+def fake_body(seed: str, words: int = 600) -> str:
+    rng = random.Random(seed)
+    sentences, sentence = [], []
+    for _ in range(words):
+        sentence.append(rng.choice(WORDS))
+        if len(sentence) >= rng.randint(12, 24):
+            sentences.append(" ".join(sentence).capitalize() + ".")
+            sentence = []
+    return " ".join(sentences)
+
+
+_Server = TypeVar("_Server", bound="_FakeServer")
+
+
+class _FakeServer:
+    """ThreadingHTTPServer on 127.0.0.1:<free port>, served from a daemon thread."""
+
+    def __init__(self, faults: Faults):
+        self.faults = faults
+        self.calls = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # keep benchmark output clean
+                pass
+
+            def _reply(self, status: int, payload: dict):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                fake._dispatch(self, "GET")
+
+            def do_POST(self):
+                fake._dispatch(self, "POST")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self: _Server) -> _Server:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _dispatch(self, handler, method: str) -> None:
+        with self._lock:
+            self.calls += 1
+        if self.faults.apply():
+            status, payload = 500, {"error": "injected failure"}
+        else:
+            try:
+                status, payload = self.handle(handler, method)
+            except Exception as e:  # a broken fake must not hang the client
+                status, payload = 500, {"error": str(e)}
+        try:
+            handler._reply(status, payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on the request (e.g. a cancelled speculative page)
+            handler.close_connection = True
+
+    def handle(self, handler, method: str) -> tuple:
+        raise NotImplementedError
+
+
+class FakeGuardianServer(_FakeServer):
+    """
+    Serves /search like content.guardianapis.com (point GUARDIAN_API_URL at `search_url`).
+
+    Every third result is a live blog, so the client's filtering and the query
+    planner's over-fetching are exercised too.
+    """
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.url}/search"
+
+    def handle(self, handler, method: str) -> tuple:
+        params = {k: v[0] for k, v in parse_qs(urlparse(handler.path).query).items()}
+        q = params.get("q", "news")
+        page = int(params.get("page", "1"))
+        size = int(params.get("page-size", "10"))
+
+        results = []
+        for i in range(size):
+            n = (page - 1) * size + i
+            kind = "live" if n % 3 == 2 else "article"
+            results.append({
+                "id": f"{q}/2025/aug/01/{kind}-{n}",
+                "webTitle": f"{q.title()} story {n}",
+                "webUrl": f"https://www.theguardian.com/{q}/2025/aug/01/{kind}-{n}",
+                "fields": {
+                    "headline": f"{q.title()} story {n}",
+                    "trailText": fake_body(f"{q}-{n}-trail", 30),
+                    "bodyText": fake_body(f"{q}-{n}"),
+                },
+            })
+        return 200, {"response": {"status": "ok", "currentPage": page, "pageSize": size, "results": results}}
+
+
+class FakeOpenAIServer(_FakeServer):
+    """Serves /v1/chat/completions (point OPENAI_BASE_URL at `base_url`)."""
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def handle(self, handler, method: str) -> tuple:
+        length = int(handler.headers.get("Content-Length", "0"))
+        request = json.loads(handler.rfile.read(length) or b"{}")
+        prompt = " ".join(str(m.get("content", "")) for m in request.get("messages", []))
+        summary = " ".join(prompt.split()[:60]) or "Summary."
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(summary) // 4)
+        return 200, {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": summary},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+class StubPolly:
+    """
+    In-process stand-in for the boto3 Polly client (synthesize_speech only).
+
+    Returns silent MP3 frames, one per 40 characters of SSML; failures raise
+    ThrottlingException like the real service under load.
+    """
+
+    def __init__(self, faults: Faults):
+        self.faults = faults
+        self.calls = 0
+        self.characters = 0
+        self._lock = threading.Lock()
+
+    def synthesize_speech(self, Text: str = "", **kwargs) -> dict:
+        with self._lock:
+            self.calls += 1
+            self.characters += len(Text)
+        if self.faults.apply():
+            raise ClientError(
+                {"Error": {"Code": "ThrottlingException", "Message": "injected failure"}},
+                "SynthesizeSpeech",
+            )
+        return {"AudioStream": io.BytesIO(MP3_FRAME * max(1, len(Text) // 40))}
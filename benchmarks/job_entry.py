@@ -0,0 +1,53 @@
+# benchmarks/job_entry.py
+"""
+Run scripts/daily_summary_job.py with the stub Polly client (used by benchmarks/run.py).
+
+Guardian and OpenAI are redirected through GUARDIAN_API_URL / OPENAI_BASE_URL by
+the caller; Polly is a boto3 client, so it is replaced in-process here. The last
+line of output is `BENCH_RESULT {...}` with the exit code, wall time, peak RSS
+and stub counters.
+
+    BENCH_POLLY_LATENCY_MS=100 python -m benchmarks.job_entry --force
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+
+import app.amazon_polly_client as polly_client
+import scripts.daily_summary_job as job
+from benchmarks.fakes import Faults, StubPolly
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def main() -> int:
+    stub = StubPolly(Faults(
+        latency_ms=float(os.getenv("BENCH_POLLY_LATENCY_MS", "0")),
+        jitter_ms=float(os.getenv("BENCH_POLLY_JITTER_MS", "0")),
+        error_rate=float(os.getenv("BENCH_POLLY_ERROR_RATE", "0")),
+    ))
+    job.create_polly_client = polly_client.create_polly_client = lambda *args, **kwargs: stub
+
+    sys.argv = ["daily_summary_job", *sys.argv[1:]]
+    started = time.perf_counter()
+    exit_code = job.main()
+    result = {
+        "exit_code": exit_code,
+        "wall_sec": round(time.perf_counter() - started, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "polly_calls": stub.calls,
+        "polly_characters": stub.characters,
+    }
+    print("BENCH_RESULT " + json.dumps(result), flush=True)
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,309 @@
+# benchmarks/run.py
+"""
+run.py — NewsLite benchmark suite (no live services)
+
+Starts a fake Guardian API and a fake OpenAI endpoint on localhost, runs the
+daily job end to end against them (Polly stubbed in-process), then serves the
+app with uvicorn and load-tests its routes. Everything runs in a temporary
+working directory, so data/ and output/ of the checkout are left alone.
+
+    python -m benchmarks.run                                   # defaults, compare with baseline
+    python -m benchmarks.run --requests 500 --concurrency 16
+    python -m benchmarks.run --guardian-latency-ms 300 --error-rate 0.05
+    python -m benchmarks.run --save-baseline                   # record benchmarks/baseline.json
+
+Results are written to benchmarks/results/<timestamp>.json. The run exits 1
+if a metric is worse than the baseline by more than --tolerance. Numbers
+depend on the machine, so record the baseline on the machine that compares
+against it (e.g. before starting a change, then rerun after it).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fakes import Faults, FakeGuardianServer, FakeOpenAIServer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BENCH_DIR = REPO_ROOT / "benchmarks"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+RESULTS_DIR = BENCH_DIR / "results"
+
+# name -> path ("{today}" is the day produced by the job run)
+ROUTES = {
+    "/": "/?q=technology&count=3&content_type=body",
+    "/guardian": "/guardian?q=technology&count=5",
+    "/summary": "/summary?q=climate&count=2",
+    "/daily": "/daily",
+    "/archive/{date}": "/archive/{today}",
+}
+
+# metric -> True if higher is better (p99 is reported but too noisy to gate on)
+ROUTE_METRICS = {"rps": True, "p50_ms": False, "p95_ms": False}
+JOB_METRICS = {"wall_sec": False, "peak_rss_mb": False}
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values) + 0.5))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def bench_env(args, guardian: FakeGuardianServer, openai: FakeOpenAIServer) -> dict:
+    """Environment for the job and the app: fake upstreams, no budget caps."""
+    env = dict(os.environ)
+    env.pop("R2_BASE_URL", None)  # no attach / publish stages
+    env.update({
+        "PYTHONPATH": str(REPO_ROOT),
+        "GUARDIAN_API_URL": guardian.search_url,
+        "GUARDIAN_API_KEY": "bench",
+        "OPENAI_BASE_URL": openai.base_url,
+        "OPENAI_API_KEY": "sk-bench",
+        "USE_DUMMY_SUMMARY": "false",
+        "OPENAI_MONTHLY_LIMIT_USD": "1000000",
+        "POLLY_MONTHLY_LIMIT_CHARS": "1000000000",
+        "TEMPLATE_DIR": str(REPO_ROOT / "app" / "templates"),
+        "BENCH_POLLY_LATENCY_MS": str(args.polly_latency_ms),
+        "BENCH_POLLY_JITTER_MS": str(args.jitter_ms),
+        "BENCH_POLLY_ERROR_RATE": str(args.error_rate),
+    })
+    if args.no_cache:
+        env["GUARDIAN_CACHE_TTL_SEC"] = "0"
+    return env
+
+
+def run_job(workdir: Path, env: dict) -> dict:
+    """Run the daily job for today in a child process; returns its BENCH_RESULT."""
+    print("🏃 daily job ...", flush=True)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.job_entry", "--force"],
+        cwd=str(workdir), env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+
+    # wall_sec (job.main() only) comes from BENCH_RESULT; process_sec includes interpreter start-up
+    result = {"exit_code": proc.returncode, "process_sec": round(wall, 3)}
+    for line in proc.stdout.splitlines():
+        if line.startswith("BENCH_RESULT "):
+            result.update(json.loads(line[len("BENCH_RESULT "):]))
+    if proc.returncode != 0:
+        print(f"⚠️ daily job exited {proc.returncode}:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+    return result
+
+
+def start_server(workdir: Path, env: dict):
+    """Import the app with the bench environment and serve it from a thread."""
+    os.chdir(workdir)  # the app resolves data/ and output/ relative to the cwd
+    os.environ.clear()
+    os.environ.update(env)
+    sys.path.insert(0, str(REPO_ROOT))
+
+    import uvicorn
+    from app.main import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def load_route(base_url: str, path: str, requests: int, concurrency: int, warmup: int) -> dict:
+    """Send `requests` GETs with `concurrency` in flight; returns throughput and latency percentiles."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        for _ in range(warmup):
+            await client.get(path)
+
+        latencies: list = []
+        statuses: dict = {}
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    await response.aread()
+                    status = str(response.status_code)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": sum(n for status, n in statuses.items() if not status.startswith("2")),
+        "statuses": statuses,
+        "rps": round(requests / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Metrics worse than the baseline by more than `tolerance` (a fraction).
+
+    Returns:
+        list[dict]: metric, baseline, current and relative change of each regression.
+    """
+    pairs = [
+        (f"{name} {metric}", baseline.get("routes", {}).get(name, {}).get(metric),
+         current.get(metric), higher_is_better)
+        for name, current in results.get("routes", {}).items()
+        for metric, higher_is_better in ROUTE_METRICS.items()
+    ]
+    pairs += [
+        (f"job {metric}", baseline.get("job", {}).get(metric), results.get("job", {}).get(metric), higher_is_better)
+        for metric, higher_is_better in JOB_METRICS.items()
+    ]
+
+    regressions = []
+    for label, before, after, higher_is_better in pairs:
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        worse = change < -tolerance if higher_is_better else change > tolerance
+        if worse:
+            regressions.append({"metric": label, "baseline": before, "current": after, "change": round(change, 3)})
+    return regressions
+
+
+def print_report(results: dict, regressions: list, compared: bool) -> None:
+    print(f"\n{'route':<18}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, r in results["routes"].items():
+        print(f"{name:<18}{r['rps']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}")
+    job = results.get("job")
+    if job:
+        print(f"\ndaily job: {job.get('wall_sec')}s wall, peak RSS {job.get('peak_rss_mb')} MB, "
+              f"exit {job.get('exit_code')}")
+    print(f"server peak RSS: {results['server_peak_rss_mb']} MB")
+
+    for r in regressions:
+        print(f"❌ regression: {r['metric']} {r['baseline']} → {r['current']} ({r['change']:+.1%})")
+    if not compared:
+        print("ℹ️  no baseline compared (record one with --save-baseline)")
+    elif not regressions:
+        print("✅ no regressions against the baseline")
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmark NewsLite against local fakes.")
+    p.add_argument("--requests", type=int, default=200, help="Requests per route. Default: 200.")
+    p.add_argument("--concurrency", type=int, default=8, help="Requests in flight. Default: 8.")
+    p.add_argument("--warmup", type=int, default=5, help="Untimed requests per route. Default: 5.")
+    p.add_argument("--routes", nargs="+", default=list(ROUTES), choices=list(ROUTES), help="Routes to load.")
+    p.add_argument("--guardian-latency-ms", type=float, default=50)
+    p.add_argument("--openai-latency-ms", type=float, default=300)
+    p.add_argument("--polly-latency-ms", type=float, default=150)
+    p.add_argument("--jitter-ms", type=float, default=0, help="Extra random latency on every fake.")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Failure probability on every fake.")
+    p.add_argument("--no-cache", action="store_true", help="Disable the Guardian response cache.")
+    p.add_argument("--skip-job", action="store_true", help="Do not run the daily job (/daily and /archive 404).")
+    p.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON to compare with.")
+    p.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="Allowed relative slowdown before a metric counts as a regression. Default: 0.25.")
+    p.add_argument("--out", help="Results file. Default: benchmarks/results/<timestamp>.json")
+    p.add_argument("--keep-workdir", action="store_true", help="Keep the temporary data/ and output/.")
+    args = p.parse_args()
+    # resolved before start_server() changes the working directory
+    baseline_path = Path(args.baseline).resolve()
+    out = Path(args.out).resolve() if args.out else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+
+    workdir = Path(tempfile.mkdtemp(prefix="newslite-bench-"))
+    guardian = FakeGuardianServer(Faults(args.guardian_latency_ms, args.jitter_ms, args.error_rate, seed=1)).start()
+    openai = FakeOpenAIServer(Faults(args.openai_latency_ms, args.jitter_ms, args.error_rate, seed=2)).start()
+    env = bench_env(args, guardian, openai)
+    today = date.today().isoformat()
+
+    results: dict = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {k: v for k, v in vars(args).items() if k not in ("baseline", "out", "save_baseline")},
+        },
+        "routes": {},
+    }
+
+    try:
+        if not args.skip_job:
+            results["job"] = run_job(workdir, env)
+            results["job"]["guardian_calls"] = guardian.calls
+            results["job"]["openai_calls"] = openai.calls
+
+        server, thread, base_url = start_server(workdir, env)
+        try:
+            for name in args.routes:
+                path = ROUTES[name].format(today=today)
+                print(f"🏃 {name} ...", flush=True)
+                results["routes"][name] = asyncio.run(
+                    load_route(base_url, path, args.requests, args.concurrency, args.warmup)
+                )
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+        results["server_peak_rss_mb"] = round(peak_rss_mb(), 1)
+    finally:
+        guardian.stop()
+        openai.stop()
+        if "app.usage_tracker" in sys.modules:
+            # flush now: the atexit flush would run after the workdir is gone
+            sys.modules["app.usage_tracker"].flush_usage()
+        if args.keep_workdir:
+            print(f"📁 workdir kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    regressions = []
+    compared = baseline_path.exists() and not args.save_baseline
+    if compared:
+        regressions = compare(results, json.loads(baseline_path.read_text(encoding="utf-8")), args.tolerance)
+    results["regressions"] = regressions
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"📌 baseline saved: {baseline_path}")
+
+    print_report(results, regressions, compared)
+    print(f"📄 results: {out}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
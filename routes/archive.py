@@ -1,29 +1,44 @@
 # routes/archive.py
 
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-from pathlib import Path
-import json
+from typing import Optional
+from fastapi import APIRouter, Request, Query
+from fastapi.responses import HTMLResponse, JSONResponse
+from app.archive_store import archive_store
+from app.http_cache import precompressed_store
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
-@router.get("/archive/{date_str}", response_class=HTMLResponse)
-async def read_archive(request: Request, date_str: str):
-    filepath = Path(f"data/daily_summary_{date_str}.json")
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+
+@router.get("/archive")
+def query_archive(
+    from_date: Optional[str] = Query(None, alias="from", pattern=DATE_PATTERN),
+    to_date: Optional[str] = Query(None, alias="to", pattern=DATE_PATTERN),
+    topic: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+):
+    articles = archive_store.query(from_date=from_date, to_date=to_date, topic=topic, limit=limit)
+    return {"from": from_date, "to": to_date, "topic": topic, "articles": articles}
 
-    if not filepath.exists():
-        return HTMLResponse(content="Article not found", status_code=404)
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        articles = json.load(f)
+# Declared before /archive/{date_str}, which would otherwise match "<date>.json"
+@router.get("/archive/{date_str}.json")
+def read_archive_json(request: Request, date_str: str):
+    # Precompressed compact JSON with a content-hash ETag (304 on revalidation)
+    response = precompressed_store.respond(request, date_str, "day.json")
+    if response is None:
+        return JSONResponse(content={"detail": "Article not found"}, status_code=404)
+    return response
 
-    for i, article in enumerate(articles, 1): # article_01, 02, 03...
-        article["audio_path"] = f"audio/{date_str}/article_{i:02}.mp3"
 
-    return templates.TemplateResponse("archive.html", {
-        "request": request,
-        "date": date_str,
-        "articles": articles
-    })
+@router.get("/archive/{date_str}", response_class=HTMLResponse)
+def read_archive(request: Request, date_str: str):
+    # Page rendered and compressed once per day (at job time or on first hit);
+    # past days are immutable, so browsers and CDNs keep them for a year.
+    response = precompressed_store.respond(request, date_str, "archive.html")
+
+    if response is None:
+        return HTMLResponse(content="Article not found", status_code=404)
+
+    return response
@@ -0,0 +1,23 @@
+# routes/debug.py
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from app.tracing import slow_requests
+
+# Only included when TRACING_ENABLED=true (see app/main.py)
+router = APIRouter(prefix="/debug")
+
+
+@router.get("/slow")
+def list_slow_requests(limit: int = Query(20, ge=1, le=500)):
+    # Slowest recent requests, each with its span breakdown (and top functions if profiled)
+    return {"stats": slow_requests.stats(), "requests": slow_requests.worst(limit)}
+
+
+@router.get("/slow/profiles/{name}")
+def download_profile(name: str):
+    # Raw cProfile dump: python -m pstats <file>, or snakeviz
+    path = slow_requests.profiles.path_for(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
@@ -0,0 +1,24 @@
+# routes/search.py
+
+from typing import Optional
+from fastapi import APIRouter, Query
+from app.search_index import search_index
+
+router = APIRouter()
+
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+
+@router.get("/search")
+def search_archive(
+    q: str = Query(..., min_length=1),
+    topic: Optional[str] = None,
+    from_date: Optional[str] = Query(None, alias="from", pattern=DATE_PATTERN),
+    to_date: Optional[str] = Query(None, alias="to", pattern=DATE_PATTERN),
+    limit: int = Query(20, ge=1, le=100),
+):
+    # Pick up days written by the daily job since the last check (throttled)
+    search_index.refresh_if_stale()
+
+    results = search_index.search(q, topic=topic, from_date=from_date, to_date=to_date, limit=limit)
+    return {"query": q, "results": results}
@@ -4,7 +4,8 @@ attach_audio_urls.py — Add audio URLs to today's NewsLite JSON safely.
 
 - Reads data/daily_summary_YYYY-MM-DD.json
 - Appends audio URLs: https://<r2-base-url>/<date>/article_01.mp3
-- Saves new JSON as: data/daily_summary_YYYY-MM-DD_with_audio.json
+- Saves new JSON as: data/daily_summary_YYYY-MM-DD_with_audio.json (compact)
+  plus the binary bundle data/daily_summary_YYYY-MM-DD_with_audio.nlb (app/bundle.py)
 - Prevents accidental overwrite or double processing
 """
 
@@ -14,35 +15,46 @@ import os
 from pathlib import Path
 from os import getenv
 from dotenv import load_dotenv
+from app.bundle import bundle_path_for, write_bundle
 
 load_dotenv()
 
 # ====== Config =======================
 R2_BASE_URL = os.getenv("R2_BASE_URL")
-if not R2_BASE_URL:
-    raise RuntimeError("R2_BASE_URL is not set. Please export R2_BASE_URL in your environment.")
 # Example value:
 #   R2_BASE_URL=https://audio.newslite.tarclog.com/audio
 # ============================================================
 
 
-def main():
-    today_str = date.today().strftime("%Y-%m-%d")
+def attach_audio_urls(day: str, overwrite: bool = False):
+    """
+    Create data/daily_summary_<day>_with_audio.json from the day's summary JSON.
+
+    Args:
+        day (str): Target date (YYYY-MM-DD).
+        overwrite (bool): Replace an existing *_with_audio.json (used by the
+            daily pipeline when it re-runs this stage).
+
+    Returns:
+        Path | None: The written file, or None if a safety check stopped the run.
+    """
+    if not R2_BASE_URL:
+        raise RuntimeError("R2_BASE_URL is not set. Please export R2_BASE_URL in your environment.")
 
-    src_path = Path(f"data/daily_summary_{today_str}.json")
-    dst_path = Path(f"data/daily_summary_{today_str}_with_audio.json")
+    src_path = Path(f"data/daily_summary_{day}.json")
+    dst_path = Path(f"data/daily_summary_{day}_with_audio.json")
 
     # --- Safety 1: Source file does not exist, then exit ---
     if not src_path.exists():
         print(f"❌ Source JSON not found: {src_path}")
-        return
+        return None
 
     # --- Safety 2: with_audio already exists, warn ---
-    if dst_path.exists():
+    if dst_path.exists() and not overwrite:
         print(f"⚠️  WARNING: {dst_path} already exists.")
         print("    → Already audio URL is attached.")
         print("    → Overwriting is not done. Please check manually.")
-        return
+        return None
 
     # --- Load JSON ---
     data = json.loads(src_path.read_text())
@@ -52,13 +64,13 @@ def main():
         print("⚠️  WARNING: Source JSON already contains 'audio' fields.")
         print("    → Local JSON already has audio fields. Please investigate.")
         print("    → with_audio will not be created.")
-        return
+        return None
 
     # --- Generate audio URLs ---
     processed = []
     for idx, article in enumerate(data):
         audio_no = f"{idx + 1:02d}"
-        audio_url = f"{R2_BASE_URL}/{today_str}/article_{audio_no}.mp3"
+        audio_url = f"{R2_BASE_URL}/{day}/article_{audio_no}.mp3"
 
         article_with_audio = {
             **article,
@@ -67,11 +79,20 @@ def main():
         processed.append(article_with_audio)
 
     # --- Save output JSON ---
-    dst_path.write_text(json.dumps(processed, ensure_ascii=False, indent=2))
+    # compact JSON (no indent): this is the payload published to KV
+    dst_path.write_text(json.dumps(processed, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    write_bundle(bundle_path_for(dst_path), processed, {"date": day})
 
     print(f"✅ Audio URLs successfully added.")
     print(f"📁 Output: {dst_path} ")
-    print(f"🔗 Example first audio: {processed[0]['audio']}")
+    if processed:
+        print(f"🔗 Example first audio: {processed[0]['audio']}")
+    return dst_path
+
+
+def main():
+    today_str = date.today().strftime("%Y-%m-%d")
+    attach_audio_urls(today_str)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+# scripts/build_static_site.py
+"""
+build_static_site.py — Render every published day into the static site tree
+
+For each data/daily_summary_<date>.json this writes archive.html, daily.html and
+day.json (identity + .gz, + .br with brotli) under HTTP_CACHE_DIR/<date>/ and
+records them in HTTP_CACHE_DIR/manifest.json. Days whose summary file and
+templates did not change since the last build are skipped.
+
+    python -m scripts.build_static_site                          # all new / changed days
+    python -m scripts.build_static_site --from 2025-08-01 --to 2025-08-31
+    python -m scripts.build_static_site --force --workers 8      # rebuild everything
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.http_cache import precompressed_store
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def build_site(days: list, force: bool = False, workers: int = 4) -> dict:
+    """
+    Build `days` in parallel and update the manifest.
+
+    Rendering is light; most of the time goes to gzip/brotli, which release the
+    GIL, so threads are enough to use several cores.
+
+    Args:
+        days (list): Dates (YYYY-MM-DD) to build.
+        force (bool): Rebuild days that are already current.
+        workers (int): Number of days built concurrently.
+
+    Returns:
+        dict: Lists of "built", "skipped" and "failed" days.
+    """
+    todo = days if force else [d for d in days if not precompressed_store.is_current(d)]
+    result = {"built": [], "skipped": sorted(set(days) - set(todo)), "failed": []}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(precompressed_store.build_day, day, force): day for day in todo}
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                meta = future.result()
+            except Exception as e:
+                print(f"❌ [{day}] build failed: {e}")
+                result["failed"].append(day)
+                continue
+            if meta is None:
+                result["failed"].append(day)
+            else:
+                print(f"✅ [{day}] built")
+                result["built"].append(day)
+
+    if result["built"]:
+        precompressed_store.update_manifest(sorted(result["built"]))
+    return result
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Build the static archive site.")
+    p.add_argument("--from", dest="from_date", help="First date (inclusive).")
+    p.add_argument("--to", dest="to_date", help="Last date (inclusive).")
+    p.add_argument("--force", action="store_true", help="Rebuild days that are already current.")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                   help="Number of days built concurrently. Default: CPU count.")
+    args = p.parse_args()
+
+    days = [
+        d for d in precompressed_store.list_days()
+        if (not args.from_date or d >= args.from_date) and (not args.to_date or d <= args.to_date)
+    ]
+    started = time.perf_counter()
+    result = build_site(days, force=args.force, workers=args.workers)
+    print(
+        f"📦 {len(result['built'])} built, {len(result['skipped'])} unchanged, "
+        f"{len(result['failed'])} failed in {time.perf_counter() - started:.1f}s "
+        f"→ {precompressed_store.root / 'manifest.json'}"
+    )
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,46 @@
 # scripts/daily_summary_job.py
+"""
+daily_summary_job.py — Daily NewsLite pipeline (fetch → summarize → synthesize → merge → attach URLs → publish)
 
+Each day is run as a DAG of stages (see app/pipeline.py). fetch, summarize and
+synthesize are streaming stages connected by bounded asyncio queues: every topic
+is fetched concurrently, each article is summarized as soon as it arrives, and
+Polly starts on each summary as soon as it is ready. Downstream stages
+(indexing, merge, publish) start once their inputs are complete.
+
+Per-article checkpoints live under data/pipeline/<date>/, so a failed run can be
+resumed without redoing finished work:
+
+    python -m scripts.daily_summary_job                       # today
+    python -m scripts.daily_summary_job --resume              # redo only missing/failed work
+    python -m scripts.daily_summary_job --force               # start today over
+    python -m scripts.daily_summary_job --from 2025-08-01 --to 2025-08-07 --parallel-days 3
+"""
+
+import argparse
+import asyncio
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
-from datetime import date
-from app.guardian_client import fetch_guardian_articles
-from app.summary_llm import summarize_article
-from app.amazon_polly_client import merge_daily_audio_files, summaries_to_mp3
+from typing import Optional
+from app.guardian_client import AsyncGuardianClient
+from app.summary_llm import OPENAI_CONCURRENCY, SUMMARY_UNAVAILABLE, summarize_article_async
+from app.amazon_polly_client import (
+    POLLY_LONG_TEXT_MODE,
+    POLLY_MAX_CONCURRENCY,
+    create_polly_client,
+    create_s3_client,
+    merge_daily_audio_files,
+    save_polly_settings,
+    synthesize_articles,
+)
+from app.archive_store import archive_store
+from app.search_index import search_index
+from app.dedup_index import dedup_index
+from app.http_cache import precompressed_store
+from app.metrics import registry, run_summary
+from app.pipeline import Checkpoints, Stage, run_dag, write_json_atomic
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,77 +48,432 @@ load_dotenv()
 OUTPUT_DIR = Path("data")
 OUTPUT_DIR.mkdir(exist_ok=True)
 AUDIO_DIR = Path("output/audio")
-today_str = date.today().isoformat()
-output_file = OUTPUT_DIR / f"daily_summary_{today_str}.json"
-output_file_full = OUTPUT_DIR / f"daily_full_article_{today_str}.json"
 
+TOPICS = ["technology", "climate", "education"]
+ARTICLES_PER_TOPIC = 3
+
+# Max items buffered between streaming stages
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+
+
+class DayRun:
+    """State shared by the stages of one day's run."""
+
+    def __init__(self, day: str, checkpoints: Checkpoints, guardian: AsyncGuardianClient, args):
+        self.day = day
+        self.checkpoints = checkpoints
+        self.guardian = guardian
+        self.args = args
+        self.topics = args.topics
+        self.summary_file = OUTPUT_DIR / f"daily_summary_{day}.json"
+        self.full_file = OUTPUT_DIR / f"daily_full_article_{day}.json"
+        self.cost_file = OUTPUT_DIR / f"summary_costs_{day}.json"
+        self.audio_dir = AUDIO_DIR / day
+        # Stages that did work in this run (downstream stages use it to decide whether to redo)
+        self.changed: set = set()
+
+        # fetch → summarize → synthesize stream articles through bounded queues
+        # (backpressure: a slow stage makes the upstream stage wait)
+        self.to_summarize: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.to_synthesize: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+
+# Marks the end of a stream; each consumer worker puts it back for its siblings
+_END = object()
+
+
+async def _consume(queue: asyncio.Queue, workers: int, handle) -> None:
+    """
+    Run `workers` tasks that call `await handle(item)` until the stream ends.
+
+    If `handle` raises, the workers keep draining the queue (without handling)
+    so the producer never blocks on a full queue; the first error is re-raised
+    once the stream has ended.
+    """
+    errors: list = []
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is _END:
+                await queue.put(_END)
+                return
+            if errors:
+                continue
+            try:
+                await handle(item)
+            except Exception as e:
+                errors.append(e)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    if errors:
+        raise errors[0]
 
-if output_file.exists():
-    print(f"⛔ Summary already exists for {today_str}")
-    exit(0)
 
+# ────────────────────────────────────────────────────────────────
+# Stages
+# ────────────────────────────────────────────────────────────────
 
-seen_urls = set()
-all_articles = []
+async def stage_fetch(run: DayRun) -> int:
+    """
+    Fetch all topics concurrently and stream each accepted article downstream.
 
-topics = ["technology", "climate", "education"]
-summaries = []
-full_articles = []
+    Positions (article_01, 02, ...) are assigned in arrival order and checkpointed
+    immediately, so they stay stable when a resumed run fetches the remaining topics.
+    """
+    ckpt = run.checkpoints
+    # Past days are fetched with a publication-date window so backfills are reproducible
+    window: dict = {} if run.day == date.today().isoformat() else {"from_date": run.day, "to_date": run.day}
 
-for topic in topics:
-    articles = fetch_guardian_articles(query=topic, page_size=3)
+    selected = ckpt.load("articles", [])
+    seen_urls = {a["url"] for a in selected}
+    failed = []
 
-    for a in articles:
-        if a["url"] in seen_urls:
-            continue
-        seen_urls.add(a["url"])
-        all_articles.append(a)
+    try:
+        # Articles accepted by an earlier (interrupted) run still flow downstream;
+        # later stages skip whatever they already checkpointed.
+        for article in selected:
+            await run.to_summarize.put(article)
 
-        # print(json.dumps(article, indent=2)) # debug
-        body = a.get("fields", {}).get("bodyText", "")
+        async def fetch(topic: str):
+            try:
+                return topic, await run.guardian.fetch_articles(
+                    query=topic, page_size=ARTICLES_PER_TOPIC, **window
+                )
+            except Exception as e:
+                return topic, e
 
-        if not body:
-            continue
+        missing = [t for t in run.topics if not ckpt.has(f"fetch/{t}")]
+        for next_done in asyncio.as_completed([fetch(t) for t in missing]):
+            topic, articles = await next_done
+            if isinstance(articles, Exception):
+                print(f"⚠️ [{run.day}] fetch failed for {topic}: {articles!r}")
+                failed.append(topic)
+                continue
 
-        result = summarize_article(body)
+            run.changed.add("fetch")
+            accepted: list = []
+            for a in articles:
+                if a["url"] in seen_urls:
+                    continue
+                seen_urls.add(a["url"])
+
+                body = a.get("fields", {}).get("bodyText", "")
+                if not body:
+                    continue
+
+                # Skip stories already covered today (another topic) or on recent days
+                guardian_id = a.get("id") or a["url"]
+                duplicate = dedup_index.find_duplicate(guardian_id, body, run.day)
+                if duplicate:
+                    print(f"♻️  [{run.day}] {topic}: skipping duplicate of "
+                          f"{duplicate['date']} {duplicate['topic']} \"{duplicate['title']}\"")
+                    continue
+                dedup_index.add(guardian_id, body, run.day, url=a["url"], title=a.get("title", ""), topic=topic)
+
+                accepted.append({
+                    "position": len(selected) + len(accepted) + 1,
+                    "topic": topic,
+                    "title": a.get("title", "(No title)"),
+                    "url": a.get("url", "#"),
+                    "body": body,
+                })
+
+            selected.extend(accepted)
+            ckpt.save("articles", selected)
+            ckpt.save(f"fetch/{topic}", articles)
+            print(f"✅ [{run.day}] {topic}: {len(articles)} fetched, {len(accepted)} new")
+
+            for article in accepted:
+                await run.to_summarize.put(article)
+    finally:
+        await run.to_summarize.put(_END)
+
+    # Save Full Articles (for a full backup)
+    full_articles = []
+    for topic in run.topics:
+        full_articles.extend(ckpt.load(f"fetch/{topic}", []))
+    write_json_atomic(run.full_file, full_articles)
+
+    if failed:
+        raise RuntimeError(f"fetch failed for topics: {failed}")
+    return 0
+
+
+async def stage_summarize(run: DayRun) -> int:
+    """Summarize articles as they arrive and hand each summary straight to synthesis."""
+    ckpt = run.checkpoints
+
+    async def handle(article: dict) -> None:
+        name = f"summaries/{article['position']:02}"
+        result = ckpt.load(name)
+        if result is None:
+            try:
+                result = await summarize_article_async(article["body"])
+            except Exception as e:
+                print(f"⚠️ [{run.day}] summary failed for article {article['position']}: {e!r}")
+                return
+            run.changed.add("summarize")
+            # Failed summaries are not checkpointed, so --resume retries them
+            if result.get("summary", SUMMARY_UNAVAILABLE) == SUMMARY_UNAVAILABLE:
+                return
+            ckpt.save(name, result)
+        await run.to_synthesize.put((article, result["summary"]))
+
+    try:
+        await _consume(run.to_summarize, OPENAI_CONCURRENCY, handle)
+    finally:
+        await run.to_synthesize.put(_END)
+
+    failed = 0
+    summaries = []
+    costs = []
+    for a in ckpt.load("articles", []):
+        result = ckpt.load(f"summaries/{a['position']:02}")
+        if result is None:
+            failed += 1
         summaries.append({
-            "title": a.get("title", "(No title)"),
-            "url": a.get("url", "#"),
-            "topic": topic,
-            "summary": result.get("summary", "(Summary unavailable)")
+            "title": a["title"],
+            "url": a["url"],
+            "topic": a["topic"],
+            "summary": (result or {}).get("summary", SUMMARY_UNAVAILABLE)
         })
+        if result is not None and "usage" in result:
+            costs.append({"position": a["position"], "topic": a["topic"], "title": a["title"], **result["usage"]})
 
-    full_articles.extend(articles) # for a full backup
+    if "summarize" in run.changed or "fetch" in run.changed or not run.summary_file.exists():
+        # Save Summaries
+        write_json_atomic(run.summary_file, summaries)
+        print(f"✅ Saved daily summary to {run.summary_file}")
+        report_summary_costs(run, costs)
+    return failed
 
-    print(f"✅ {topic}: {len(articles)} fetched, {len(summaries)} total summarized")
 
-# Save Full Articles
-with open(output_file_full, "w", encoding="utf-8") as f:
-    json.dump(full_articles, f, ensure_ascii=False, indent=2)
+def report_summary_costs(run: DayRun, costs: list) -> None:
+    """Print per-article tokens / cost / latency and save them to data/summary_costs_<date>.json."""
+    if not costs:
+        return
+    write_json_atomic(run.cost_file, {
+        "date": run.day,
+        "total_usd": round(sum(c.get("cost_usd", 0.0) for c in costs), 6),
+        "articles": costs,
+    })
+    print(f"💰 [{run.day}] Summary cost per article:")
+    for c in sorted(costs, key=lambda c: c.get("cost_usd", 0.0), reverse=True):
+        if c.get("cached"):
+            tokens = "cached"
+        else:
+            trimmed = f" (trimmed from {c['input_tokens']})" if c.get("trimmed") else ""
+            tokens = f"{c['sent_tokens']}{trimmed} in, {c['completion_tokens']} out"
+            if "chunks" in c:
+                tokens += f", map-reduce {c['chunks']} chunks ({c['cached_chunks']} cached)"
+        print(f"   #{c['position']:02} {c['topic']:<11} ${c.get('cost_usd', 0.0):.5f} "
+              f"{c.get('latency_sec', 0.0):6.2f}s  {tokens}  {c['title'][:50]}")
+    total = sum(c.get("cost_usd", 0.0) for c in costs)
+    print(f"   total ${total:.5f} → {run.cost_file}")
 
-# Save Summaries
-with open(output_file, "w", encoding="utf-8") as f:
-    json.dump(summaries, f, ensure_ascii=False, indent=2)
 
-print(f"✅ Saved daily summary to {output_file}")
+async def stage_synthesize(run: DayRun) -> int:
+    """
+    Synthesize each summary as soon as it is ready.
 
-# Amazon Polly (text-to-mp3)
-audio_output_dir = AUDIO_DIR / today_str
-audio_output_dir.mkdir(parents=True, exist_ok=True)
+    The Polly client, the S3 client ("task" mode) and the request pool are
+    created once for the stage (on the first article that needs audio) and
+    shared by every article; rate limits are process-wide.
+    """
+    voice_id = os.getenv("AWS_POLLY_VOICE_ID", "Ruth")
+    engine = os.getenv("AWS_POLLY_ENGINE", "neural")
+    shared: dict = {}
+    failed = 0
 
-summaries_to_mp3(
-    json_path=output_file,
-    output_dir=audio_output_dir,
-    voice_id=os.getenv("AWS_POLLY_VOICE_ID", "Ruth"),
-    engine=os.getenv("AWS_POLLY_ENGINE", "neural")
-)
+    async def handle(item) -> None:
+        nonlocal failed
+        article, summary = item
+        if (run.audio_dir / f"article_{article['position']:02}.mp3").exists():
+            return
+
+        # Amazon Polly (text-to-mp3)
+        if not shared:
+            shared["polly"] = create_polly_client(POLLY_MAX_CONCURRENCY)
+            shared["s3"] = create_s3_client() if POLLY_LONG_TEXT_MODE == "task" else None
+            shared["executor"] = ThreadPoolExecutor(max_workers=POLLY_MAX_CONCURRENCY)
+        results = await asyncio.to_thread(
+            synthesize_articles, [(article["position"], summary)], run.audio_dir,
+            voice_id=voice_id, engine=engine, **shared,
+        )
+        run.changed.add("synthesize")
+        failed += sum(1 for ok in results.values() if not ok)
+
+    try:
+        await _consume(run.to_synthesize, POLLY_MAX_CONCURRENCY, handle)
+    finally:
+        if shared:
+            shared["executor"].shutdown(wait=False)
+
+    if "synthesize" in run.changed:
+        save_polly_settings(run.audio_dir, rate="90%", engine=engine, voice_id=voice_id)
+    return failed
+
+
+async def stage_index(run: DayRun) -> int:
+    # Index the day's summaries for /daily, /archive and /search
+    await asyncio.to_thread(archive_store.ingest_day, run.day)
+    await asyncio.to_thread(search_index.index_day, run.day)
+    return 0
+
+
+async def stage_precompress(run: DayRun) -> int:
+    # Render + gzip/brotli the day's pages once, so /daily and /archive serve files
+    await asyncio.to_thread(precompressed_store.build_day, run.day, "summarize" in run.changed)
+    await asyncio.to_thread(precompressed_store.update_manifest, [run.day])
+    return 0
+
+
+async def stage_merge(run: DayRun) -> int:
+    # Merge daily audio file (+ full_day.json chapter index)
+    await asyncio.to_thread(merge_daily_audio_files, AUDIO_DIR, run.day, run.summary_file)
+    return 0
+
+
+async def stage_attach_urls(run: DayRun) -> int:
+    from scripts.attach_audio_urls import attach_audio_urls
+
+    path = await asyncio.to_thread(attach_audio_urls, run.day, True)
+    if path is None:
+        raise RuntimeError("attach_audio_urls did not write *_with_audio.json")
+    return 0
+
+
+async def stage_publish(run: DayRun) -> int:
+    from scripts.newslite_ui_daily_job import put_day_to_kv
+
+    upstream = {"summarize", "synthesize"}
+    if run.checkpoints.stage_status("publish") == "done" and not (run.changed & upstream):
+        print(f"⏭️  [{run.day}] publish: nothing changed since the last upload")
+        return 0
+
+    src_json = OUTPUT_DIR / f"daily_summary_{run.day}_with_audio.json"
+    returncode = await asyncio.to_thread(
+        put_day_to_kv, run.day, src_json, Path(run.args.ui_dir).expanduser(), run.args.binding, run.args.prod
+    )
+    if returncode != 0:
+        raise RuntimeError(f"KV upload failed (exit {returncode})")
+    return 0
+
+
+def build_stages(args) -> list:
+    stages = [
+        # fetch, summarize and synthesize run at the same time, connected by queues
+        Stage("fetch", stage_fetch),
+        Stage("summarize", stage_summarize),
+        Stage("synthesize", stage_synthesize),
+        Stage("index", stage_index, deps=("summarize",)),
+        Stage("precompress", stage_precompress, deps=("index",)),
+        Stage("merge", stage_merge, deps=("synthesize",)),
+    ]
+    if os.getenv("R2_BASE_URL"):
+        stages.append(Stage("attach_urls", stage_attach_urls, deps=("summarize", "synthesize")))
+        if args.publish:
+            stages.append(Stage("publish", stage_publish, deps=("attach_urls", "merge")))
+    elif args.publish:
+        print("⚠️ --publish ignored: R2_BASE_URL is not set, so audio URLs cannot be attached")
+    return stages
+
+
+# ────────────────────────────────────────────────────────────────
+# Runner
+# ────────────────────────────────────────────────────────────────
+
+async def run_day(day: str, guardian: AsyncGuardianClient, args) -> bool:
+    checkpoints = Checkpoints(day)
+    summary_file = OUTPUT_DIR / f"daily_summary_{day}.json"
+
+    if args.force:
+        checkpoints.clear()
+        dedup_index.remove_day(day)
+        for mp3 in (AUDIO_DIR / day).glob("article_*.mp3"):
+            mp3.unlink()
+    elif not args.resume:
+        if summary_file.exists():
+            print(f"⛔ Summary already exists for {day} (use --resume to finish it or --force to redo it)")
+            return True
+        checkpoints.clear()
+
+    run = DayRun(day, checkpoints, guardian, args)
+    statuses = await run_dag(build_stages(args), run, checkpoints)
+    print(f"📋 [{day}] " + ", ".join(f"{name}={status}" for name, status in statuses.items()))
+    # "partial" still exits non-zero so cron surfaces it; rerun with --resume
+    return all(status == "done" for status in statuses.values())
+
+
+def parse_days(args) -> list:
+    days = list(args.date or [])
+    if args.from_date:
+        start = date.fromisoformat(args.from_date)
+        end = date.fromisoformat(args.to_date) if args.to_date else date.today()
+        while start <= end:
+            days.append(start.isoformat())
+            start += timedelta(days=1)
+    return sorted(set(days)) or [date.today().isoformat()]
+
+
+async def main_async(args) -> int:
+    days = parse_days(args)
+    guardian = AsyncGuardianClient(cache_ttl=0)
+    semaphore = asyncio.Semaphore(max(1, args.parallel_days))
+
+    async def bounded(day: str) -> bool:
+        async with semaphore:
+            return await run_day(day, guardian, args)
+
+    try:
+        results = await asyncio.gather(*(bounded(day) for day in days))
+    finally:
+        await guardian.aclose()
+        report_metrics(args.metrics_file)
+    return 0 if all(results) else 1
+
+
+def report_metrics(metrics_file: Optional[str] = None) -> None:
+    """Print the run's latency / throughput summary; optionally write the Prometheus text too."""
+    summary = run_summary()
+    if summary:
+        print("📊 Run metrics\n" + summary)
+    if metrics_file:
+        # e.g. node_exporter's textfile collector directory
+        path = Path(metrics_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        tmp.write_text(registry.render(), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Run the daily NewsLite pipeline.")
+    p.add_argument("--date", action="append",
+                   help="Target date in YYYY-MM-DD (repeatable). Default: today.")
+    p.add_argument("--from", dest="from_date", help="Backfill start date (inclusive).")
+    p.add_argument("--to", dest="to_date", help="Backfill end date (inclusive). Default: today.")
+    p.add_argument("--parallel-days", type=int, default=2,
+                   help="Number of days processed concurrently. Default: 2.")
+    p.add_argument("--resume", action="store_true",
+                   help="Reuse checkpoints and redo only missing or failed work.")
+    p.add_argument("--force", action="store_true",
+                   help="Discard checkpoints and audio for the day(s) and start over.")
+    p.add_argument("--metrics-file",
+                   help="Also write the run's metrics in Prometheus text format to this file.")
+    p.add_argument("--topics", nargs="+", default=TOPICS,
+                   help=f"Topics to fetch. Default: {' '.join(TOPICS)}")
+
+    # publish (KV upload through wrangler, see scripts/newslite_ui_daily_job.py)
+    p.add_argument("--publish", action="store_true", help="Upload the day to KV when done.")
+    p.add_argument("--prod", action="store_true", help="Publish to production KV. Default: preview.")
+    p.add_argument("--ui-dir", default="~/dev/newslite-ui", help="UI repo root for wrangler.")
+    p.add_argument("--binding", default="newslite_kv", help="Wrangler KV binding name.")
+
+    args = p.parse_args()
+    return asyncio.run(main_async(args))
 
-# Merge daily audio file
-merge_daily_audio_files()
 
-# Note:
-# This module is designed to be self-contained.
-# It constructs its own output paths (date-based) to allow both
-# - standalone execution, and
-# - orchestration via daily_summary_job.py
-# without requiring explicit path arguments.
\ No newline at end of file
+if __name__ == "__main__":
+    raise SystemExit(main())
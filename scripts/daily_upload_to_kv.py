@@ -1,47 +1,65 @@
 # scripts/daily_upload_to_kv.py
-import subprocess
-from datetime import date
-import json
+"""
+Publish daily_summary_<date>_with_audio.json files to KV (articles/<date>).
+
+Only days whose content changed since the last publish are uploaded, all in
+one bulk put (see app/kv_publisher.py). Default: today, preview namespace.
+
+    python -m scripts.daily_upload_to_kv
+    python -m scripts.daily_upload_to_kv --from 2025-08-01 --to 2025-08-31   # backfill
+    python -m scripts.daily_upload_to_kv --prod --force
+    KV_BACKEND=fs python -m scripts.daily_upload_to_kv --from 2025-08-01      # offline (data/fake_kv)
+"""
+import argparse
 import pathlib
+from datetime import date, timedelta
+
+from app.kv_publisher import DEFAULT_BINDING, KV_BACKEND, KVPublishError, KVPublisher, create_backend
 
 NEWSLITE_UI_DIR = pathlib.Path("~/dev/newslite-ui").expanduser()
+DATA_DIR = pathlib.Path("data")
 
-today = date.today().strftime("%Y-%m-%d")
 
-# Load today's JSON with audio URLs
-json_path = pathlib.Path(f"data/daily_summary_{today}_with_audio.json")
+def date_range(from_date: str, to_date: str) -> list:
+    start, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
 
-if not json_path.exists():
-    print(f"❌ File not found: {json_path}")
-    exit(1)
 
-payload = json_path.read_text().strip()
+def main() -> int:
+    today = date.today().strftime("%Y-%m-%d")
 
-cmd = [
-    "npx", "wrangler", "kv", "key", "put",
-    f"articles/{today}",
-    payload,
-    "--binding=newslite_kv",
-    "--preview",
-    "--remote",
-]
+    p = argparse.ArgumentParser(description="Publish daily summaries to KV.")
+    p.add_argument("--date", action="append", help="Target date YYYY-MM-DD (repeatable). Default: today.")
+    p.add_argument("--from", dest="from_date", help="Backfill start date (inclusive).")
+    p.add_argument("--to", dest="to_date", default=today, help="Backfill end date (inclusive). Default: today.")
+    p.add_argument("--prod", action="store_true", help="Publish to production KV. Default: preview.")
+    p.add_argument("--ui-dir", default=str(NEWSLITE_UI_DIR), help="UI repo root for wrangler.")
+    p.add_argument("--binding", default=DEFAULT_BINDING, help=f"Wrangler KV binding. Default: {DEFAULT_BINDING}")
+    p.add_argument("--backend", default=KV_BACKEND, choices=["wrangler", "fs"],
+                   help=f"KV backend. Default: {KV_BACKEND} (KV_BACKEND)")
+    p.add_argument("--force", action="store_true", help="Upload even unchanged days.")
+    args = p.parse_args()
 
-print("[EXEC]", " ".join(cmd))
+    if args.from_date:
+        days = date_range(args.from_date, args.to_date)
+    else:
+        days = args.date or [today]
 
-print("[EXEC]", " ".join(cmd))
+    publisher = KVPublisher(create_backend(args.backend, args.binding, pathlib.Path(args.ui_dir), args.prod))
+    try:
+        result = publisher.publish_days(days, data_dir=DATA_DIR, force=args.force)
+    except KVPublishError as e:
+        print(f"❌ KV upload failed: {e}")
+        return 1
 
-# 🟢 super important: run wrangler INSIDE newslite-ui directory
-result = subprocess.run(
-    cmd,
-    capture_output=True,
-    text=True,
-    cwd=NEWSLITE_UI_DIR # run inside newslite-ui repo
-)
+    print(f"✅ {len(result['uploaded'])} uploaded, {len(result['unchanged'])} unchanged "
+          f"→ {publisher.backend.label}")
+    if result["missing"] and not args.from_date:
+        # backfill ranges may contain days without data; explicit dates must exist
+        print(f"❌ File not found for: {', '.join(result['missing'])}")
+        return 1
+    return 0
 
 
-if result.returncode != 0:
-    print("❌ KV upload failed:")
-    print(result.stderr)
-else:
-    print("✅ KV upload success")
-    print("STDOUT:", result.stdout)
\ No newline at end of file
+if __name__ == "__main__":
+    raise SystemExit(main())
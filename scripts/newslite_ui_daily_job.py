@@ -10,36 +10,66 @@ Repo layout (expected):
 Flow:
   1) Run attach_audio_urls.py in newslite repo (creates *_with_audio.json in newslite/data)
   2) Copy *_with_audio.json into newslite-ui/data (staging)
-  3) Put to KV (preview by default, prod with --prod) by running wrangler in newslite-ui repo
+  3) Put to KV (preview by default, prod with --prod) through app/kv_publisher.py:
+     skipped when the day's content is unchanged since the last publish
+
+Run from the newslite repo: python -m scripts.newslite_ui_daily_job [--prod]
 """
 
 from __future__ import annotations
 
 import argparse
+import os
 import pathlib
 import shutil
 import subprocess
 import sys
 from datetime import date
 
+from app.kv_publisher import DEFAULT_BINDING, KVPublishError, KVPublisher, create_backend
 
 DEFAULT_NEWSLITE_DIR = pathlib.Path("~/dev/newslite").expanduser()
 DEFAULT_UI_DIR = pathlib.Path("~/dev/newslite-ui").expanduser()
 
-DEFAULT_BINDING = "newslite_kv"
 DEFAULT_ATTACH_SCRIPT_REL = pathlib.Path("scripts/attach_audio_urls.py")
 
 
-def run(cmd: list[str], cwd: pathlib.Path) -> subprocess.CompletedProcess:
+def run(cmd: list[str], cwd: pathlib.Path, env: dict | None = None) -> subprocess.CompletedProcess:
     print("[EXEC]", " ".join(cmd))
-    return subprocess.run(cmd, cwd=str(cwd), capture_output=True, text=True)
-
+    return subprocess.run(cmd, cwd=str(cwd), capture_output=True, text=True, env=env)
+
+
+def put_day_to_kv(
+    day: str,
+    src_json: pathlib.Path,
+    ui_dir: pathlib.Path = DEFAULT_UI_DIR,
+    binding: str = DEFAULT_BINDING,
+    prod: bool = False,
+    force: bool = False,
+) -> int:
+    """
+    Publish one day's *_with_audio.json (or its .nlb bundle, see KV_PAYLOAD_FORMAT)
+    to KV under `articles/<day>`, unless it is unchanged since the last publish.
+
+    Returns:
+        int: 0 on success (or nothing to do), 1 on failure.
+    """
+    mode_label = "PROD" if prod else "PREVIEW"
+    publisher = KVPublisher(create_backend(binding=binding, ui_dir=ui_dir, prod=prod))
+    try:
+        result = publisher.publish_days([day], data_dir=src_json.parent, force=force)
+    except KVPublishError as e:
+        print(f"❌ KV upload failed ({mode_label}): {e}")
+        return 1
 
-def read_payload(json_path: pathlib.Path) -> str:
-    payload = json_path.read_text(encoding="utf-8").strip()
-    if not payload:
-        raise RuntimeError(f"JSON is empty: {json_path}")
-    return payload
+    if result["missing"]:
+        print(f"❌ KV payload not found for {day} in {src_json.parent}")
+        return 1
+    if result["uploaded"]:
+        print(f"✅ KV upload success ({mode_label}): {', '.join(result['uploaded'])}")
+    else:
+        print(f"⏭️  KV unchanged ({mode_label}): {', '.join(result['unchanged'])}")
+    return 0
 
 
 def main() -> int:
@@ -66,9 +96,12 @@ def main() -> int:
     p.add_argument("--attach-script", default=str(DEFAULT_ATTACH_SCRIPT_REL),
                    help="Path to attach_audio_urls.py relative to newslite-dir.")
 
+    p.add_argument("--force", action="store_true",
+                   help="Upload even if the content is unchanged since the last publish.")
+
     # staging/copy
     p.add_argument("--no-copy", action="store_true",
-                   help="Do not copy JSON into newslite-ui/data (wrangler can still put from payload read).")
+                   help="Do not copy JSON into newslite-ui/data (wrangler still puts from the newslite file).")
 
     args = p.parse_args()
 
@@ -92,7 +125,9 @@ def main() -> int:
             print(f"❌ attach script not found: {attach_script}")
             return 1
 
-        r = run([sys.executable, str(attach_script)], cwd=newslite_dir)
+        # PYTHONPATH: the script imports app.bundle from the newslite repo
+        env = {**os.environ, "PYTHONPATH": str(newslite_dir)}
+        r = run([sys.executable, str(attach_script)], cwd=newslite_dir, env=env)
         if r.returncode != 0:
             print("❌ attach_audio_urls.py failed")
             if r.stdout:
@@ -116,37 +151,9 @@ def main() -> int:
         print(f"✅ Copied to UI repo: {dst_json}")
 
     # --- Step C: Put to KV (run wrangler from UI repo) ---
-    key = f"articles/{args.date}"
-
-    payload = read_payload(src_json)  # read from source-of-truth (newslite)
-    cmd = [
-        "npx", "wrangler", "kv", "key", "put",
-        key,
-        payload,
-        "--binding", args.binding,
-        "--remote",
-    ]
-
-    if args.prod:
-        cmd += ["--preview=false"]
-        mode_label = "PROD"
-    else:
-        cmd += ["--preview"]
-        mode_label = "PREVIEW"
-
-    result = run(cmd, cwd=ui_dir)
-
-    if result.returncode != 0:
-        print(f"❌ KV upload failed ({mode_label})")
-        if result.stdout:
-            print("STDOUT:\n", result.stdout)
-        if result.stderr:
-            print("STDERR:\n", result.stderr)
-        return result.returncode
-
-    print(f"✅ KV upload success ({mode_label})")
-    if result.stdout.strip():
-        print("STDOUT:\n", result.stdout.strip())
+    returncode = put_day_to_kv(args.date, src_json, ui_dir, args.binding, args.prod, args.force)
+    if returncode != 0:
+        return returncode
 
     # Verify hints
     if args.prod:
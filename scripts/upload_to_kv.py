@@ -1,29 +1,16 @@
 # scripts/upload_to_kv.py
-import subprocess
 from pathlib import Path
 
+from app.kv_publisher import KVPublisher, WranglerKV
+
 # --- Config ---
 NEWSLITE_UI_DIR = Path("~/dev/newslite-ui").expanduser()
 JSON_FILE = Path("data/daily_summary_2025-12-06.json")
 KV_KEY = "articles/2025-12-06"
 
-# --- Read JSON ---
-payload = JSON_FILE.read_text(encoding="utf-8")
-
-# --- Execute Wrangler Command ---
-result = subprocess.run(
-    [
-        "npx", "wrangler", "kv", "key", "put",
-        KV_KEY,
-        payload,
-        "--binding=test_kv",
-        "--remote",
-        "--preview"
-    ],
-    cwd=NEWSLITE_UI_DIR,
-    text=True,
-    capture_output=True
-)
+# --- Publish (skipped if the file is unchanged since the last upload) ---
+publisher = KVPublisher(WranglerKV(binding="test_kv", ui_dir=NEWSLITE_UI_DIR, prod=False))
+result = publisher.publish({KV_KEY: JSON_FILE.read_bytes()})
 
-print("STDOUT:", result.stdout)
-print("STDERR:", result.stderr)
\ No newline at end of file
+print("UPLOADED:", result["uploaded"])
+print("UNCHANGED:", result["unchanged"])